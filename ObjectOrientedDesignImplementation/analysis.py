@@ -0,0 +1,202 @@
+"""
+Module for analysing how each question of a quiz performed.
+
+Statistics are kept as running counters for each question, so quizzes are
+analysed in one streaming pass and memory does not grow with the number of
+responses.
+"""
+from math import sqrt
+
+from exceptions import (
+    InvalidQuestionException,
+    InvalidQuizException,
+    UngradedQuizException
+)
+from solution import Quiz
+
+
+class ItemAnalysis(object):
+    __slots__ = (
+        "questions",
+        "question_index",
+        "responses",
+        "grade_total",
+        "grade_squares",
+        "correct",
+        "correct_grade_total",
+        "choice_counts"
+    )
+
+    def __init__(self, questions):
+        """
+        Initialize an item analysis object for the questions of a quiz.
+
+        Every graded quiz of the questions counts as one response to each of
+        them. For each question the analysis counts the correct responses,
+        the grade total of the students who answered correctly and how often
+        each choice was picked, with unanswered questions counted after the
+        last choice. The grade total and sum of squared grades of all
+        responses are shared by the questions.
+        """
+        self.questions, self.question_index = Quiz._intern_questions(
+            questions
+        )
+        self.responses = 0
+        self.grade_total = 0
+        self.grade_squares = 0
+        self.correct = [0] * len(self.questions)
+        self.correct_grade_total = [0] * len(self.questions)
+        self.choice_counts = [
+            [0] * (len(question.choices) + 1)
+            for question in self.questions
+        ]
+
+    def add(self, quiz):
+        """
+        Add a graded quiz to the analysis.
+
+        params:
+            - quiz
+
+        Adding each quiz once it is graded keeps the analysis up to date
+        while a course is being marked.
+        """
+        self._update(quiz, 1)
+
+    def remove(self, quiz):
+        """
+        Remove a quiz added earlier from the analysis.
+
+        params:
+            - quiz
+
+        A quiz that is about to be regraded is removed first and added again
+        afterwards, which updates the analysis without going over the other
+        quizzes again.
+        """
+        self._update(quiz, -1)
+
+    def difficulty(self, number):
+        """Return the share of responses answering the question correctly."""
+        if not self.responses:
+            return None
+        return self.correct[self._find_question(number)]/self.responses
+
+    def discrimination(self, number):
+        """
+        Return the point-biserial discrimination of a question.
+
+        params:
+            - number
+
+        This function correlates answering the question correctly with the
+        quiz grade. It returns None while everyone or no one answered the
+        question correctly, or when all grades are the same.
+        """
+        index = self._find_question(number)
+        responses = self.responses
+        correct = self.correct[index]
+        if not 0 < correct < responses:
+            return None
+        mean_grade = self.grade_total/responses
+        grade_variance = self.grade_squares/responses - mean_grade ** 2
+        if grade_variance <= 0:
+            return None
+        proportion = correct/responses
+        mean_correct_grade = self.correct_grade_total[index]/correct
+        return (
+            (mean_correct_grade - mean_grade) / sqrt(grade_variance) *
+            sqrt(proportion / (1 - proportion))
+        )
+
+    def choice_distribution(self, number):
+        """
+        Return how often each choice of a question was picked.
+
+        params:
+            - number
+
+        Unanswered responses are counted under None.
+        """
+        index = self._find_question(number)
+        choices = self.questions[index].choices + (None,)
+        return dict(zip(choices, self.choice_counts[index]))
+
+    def report(self):
+        """Return the statistics of every question, in question order."""
+        return [
+            {
+                "number": question.number,
+                "responses": self.responses,
+                "difficulty": self.difficulty(question.number),
+                "discrimination": self.discrimination(question.number),
+                "choices": self.choice_distribution(question.number)
+            }
+            for question in self.questions
+        ]
+
+    def _update(self, quiz, sign):
+        """
+        Add the responses of a quiz to the counters, or take them away.
+
+        params:
+            - quiz
+            - sign
+        """
+        if not isinstance(quiz, Quiz):
+            raise InvalidQuizException("Please provide valid Quiz")
+        if quiz.questions is not self.questions:
+            raise InvalidQuizException(
+                "The quiz does not have the analysed questions."
+            )
+        if not quiz.teacher_graded:
+            raise UngradedQuizException("Please grade this quiz first")
+
+        grade = quiz.grade * sign
+        self.responses += sign
+        self.grade_total += grade
+        self.grade_squares += grade * quiz.grade
+        correct = self.correct
+        correct_grade_total = self.correct_grade_total
+        choice_counts = self.choice_counts
+        submission = quiz.submission
+        for index, (code, result) in enumerate(
+            zip(submission.answers, submission.answer_results)
+        ):
+            choice_counts[index][code] += sign
+            if result:
+                correct[index] += sign
+                correct_grade_total[index] += grade
+
+    def _find_question(self, number):
+        """Return the position of the question number."""
+        index = self.question_index.get(number)
+        if index is None:
+            raise InvalidQuestionException(
+                "The question is not part of this analysis."
+            )
+        return index
+
+
+def analyse_quizzes(quizzes):
+    """
+    Return the item analysis of a batch of graded quizzes.
+
+    params:
+        - quizzes
+
+    Quizzes are analysed in one pass and grouped by their questions.
+    Returns an ItemAnalysis for each distinct list of questions, in the
+    order they were first seen.
+    """
+    analyses = {}
+    for quiz in quizzes:
+        if not isinstance(quiz, Quiz):
+            raise InvalidQuizException("Please provide valid Quiz")
+        analysis = analyses.get(id(quiz.questions))
+        if analysis is None:
+            analysis = analyses[id(quiz.questions)] = ItemAnalysis(
+                quiz.questions
+            )
+        analysis.add(quiz)
+    return list(analyses.values())
@@ -0,0 +1,199 @@
+"""
+Module for archiving answers, answer results and grades of past semesters.
+
+An archive is a directory of fixed-width columnar files:
+    - answers.bin: one answer code per question per quiz, as signed bytes
+    - results.bin: one answer result (0 or 1) per question per quiz
+    - grades.bin: one grade per quiz, -1 when the quiz was not graded
+    - students.bin: the student number of each quiz, padded with NUL bytes
+    - index.json: the segments of quizzes sharing a course, quiz and
+      questions, with their first row and the question numbers and choices
+
+Rows are written grouped by course, so the rows of a course are contiguous
+and can be read through mmap without copying or building domain objects.
+"""
+from array import array
+import json
+import mmap
+import os
+
+
+COLUMNS = ("answers", "results", "grades", "students")
+UNGRADED = -1
+
+
+def write_archive(path, courses):
+    """
+    Write the assigned quizzes of courses to an archive directory.
+
+    params:
+        - path
+        - courses
+
+    Quizzes are written grouped by course and, within a course, by quiz
+    code, quiz name and questions.
+    """
+    segments = []
+    for course in sorted(courses, key=lambda course: course.course_key):
+        groups = {}
+        for quiz in course.quizzes:
+            if quiz.student:
+                groups.setdefault(
+                    (quiz.quiz_code, quiz.quiz_name, id(quiz.questions)),
+                    []
+                ).append(quiz)
+        for quizzes in groups.values():
+            segments.append((course, quizzes))
+
+    student_number_width = max(
+        [
+            len(quiz.student.student_number.encode())
+            for _, quizzes in segments
+            for quiz in quizzes
+        ] or [1]
+    )
+
+    os.makedirs(path, exist_ok=True)
+    files = {
+        column: open(os.path.join(path, column + ".bin"), "wb")
+        for column in COLUMNS
+    }
+    index = []
+    row = 0
+    offset = 0
+    try:
+        for course, quizzes in segments:
+            questions = quizzes[0].questions
+            grades = array("b")
+            for quiz in quizzes:
+                files["answers"].write(quiz.submission.answers.tobytes())
+                files["results"].write(
+                    quiz.submission.answer_results.tobytes()
+                )
+                grades.append(
+                    UNGRADED if not quiz.teacher_graded else quiz.grade
+                )
+                files["students"].write(
+                    quiz.student.student_number.encode().ljust(
+                        student_number_width,
+                        b"\0"
+                    )
+                )
+            files["grades"].write(grades.tobytes())
+            index.append({
+                "course_code": course.course_code,
+                "semester": course.semester,
+                "quiz_code": quizzes[0].quiz_code,
+                "quiz_name": quizzes[0].quiz_name,
+                "question_numbers": [
+                    question.number for question in questions
+                ],
+                "choices": [list(question.choices) for question in questions],
+                "row": row,
+                "rows": len(quizzes),
+                "offset": offset
+            })
+            row += len(quizzes)
+            offset += len(quizzes) * len(questions)
+    finally:
+        for archive_file in files.values():
+            archive_file.close()
+
+    with open(os.path.join(path, "index.json"), "w") as index_file:
+        json.dump({
+            "student_number_width": student_number_width,
+            "segments": index
+        }, index_file)
+
+
+class Archive(object):
+    def __init__(self, path):
+        """
+        Initialize an archive object.
+
+        The column files of the archive at path are mapped into memory and
+        every query returns a memoryview over the mapping, so nothing is
+        copied until the caller reads it. Views must be released before the
+        archive is closed.
+        """
+        with open(os.path.join(path, "index.json")) as index_file:
+            index = json.load(index_file)
+        self.segments = index["segments"]
+        self.student_number_width = index["student_number_width"]
+        self._maps = []
+        self._columns = {}
+        for column in COLUMNS:
+            column_path = os.path.join(path, column + ".bin")
+            with open(column_path, "rb") as column_file:
+                if os.fstat(column_file.fileno()).st_size:
+                    column_map = mmap.mmap(
+                        column_file.fileno(),
+                        0,
+                        access=mmap.ACCESS_READ
+                    )
+                    self._maps.append(column_map)
+                    self._columns[column] = memoryview(column_map)
+                else:
+                    self._columns[column] = memoryview(b"")
+
+    def close(self):
+        """Unmap the column files."""
+        for view in self._columns.values():
+            view.release()
+        for column_map in self._maps:
+            column_map.close()
+        self._maps = []
+
+    def find_segments(self, course_code, semester, quiz_code=None):
+        """Return the segments of a course, optionally of one quiz code."""
+        return [
+            segment for segment in self.segments
+            if segment["course_code"] == course_code and
+            segment["semester"] == semester and
+            quiz_code in (None, segment["quiz_code"])
+        ]
+
+    def grades(self, course_code, semester):
+        """
+        Return the grades of every archived quiz of a course.
+
+        params:
+            - course_code
+            - semester
+
+        The rows of a course are contiguous, so this is one view over the
+        grades column.
+        """
+        segments = self.find_segments(course_code, semester)
+        if not segments:
+            return memoryview(b"").cast("b")
+        start = segments[0]["row"]
+        end = segments[-1]["row"] + segments[-1]["rows"]
+        return self._columns["grades"][start:end].cast("b")
+
+    def answers(self, segment):
+        """Return the answer codes of a segment as rows x questions."""
+        return self._segment_matrix("answers", segment)
+
+    def answer_results(self, segment):
+        """Return the answer results of a segment as rows x questions."""
+        return self._segment_matrix("results", segment)
+
+    def student_numbers(self, segment):
+        """Return the student numbers of a segment's rows."""
+        width = self.student_number_width
+        start = segment["row"] * width
+        students = self._columns["students"][
+            start:start + segment["rows"] * width
+        ]
+        return [
+            bytes(students[offset:offset + width]).rstrip(b"\0").decode()
+            for offset in range(0, len(students), width)
+        ]
+
+    def _segment_matrix(self, column, segment):
+        """Return a column of a segment shaped as rows x questions."""
+        width = len(segment["question_numbers"])
+        start = segment["offset"]
+        view = self._columns[column][start:start + segment["rows"] * width]
+        return view.cast("b", (segment["rows"], width))
@@ -0,0 +1,272 @@
+"""
+Module for benchmarking the grading workflow at scale.
+
+Runs each stage of the workflow on synthetic cohorts and reports the time
+and peak memory of every stage. The workflow is run twice for each cohort,
+once timed and once traced, as tracing allocations slows stages down
+unevenly. Results are saved as JSON and can be compared with the results of
+an earlier run.
+
+usage:
+    python benchmark_grading.py [--students 1000 10000] [--questions 10 100]
+        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import random
+import subprocess
+import time
+import tracemalloc
+
+from solution import Course, Question, Student, Teacher
+
+
+DEFAULT_STUDENTS = [1000, 10000, 100000, 1000000]
+DEFAULT_QUESTIONS = [10, 100, 500]
+CHOICES = ["a", "b", "c", "d"]
+
+# Number of distinct answer sheets the synthetic students share
+ANSWER_SHEETS = 1000
+
+
+def generate_cohort(students, questions, seed=0):
+    """
+    Return a synthetic cohort.
+
+    params:
+        - students
+        - questions
+        - seed
+
+    Returns a teacher, a course, a quiz with the given number of
+    questions, the students, an answer sheet for each student and the
+    marking guide. Students share ANSWER_SHEETS random answer sheets so
+    generating them does not dominate large runs.
+    """
+    choices = random.Random(seed)
+    teacher = Teacher("John", "Doe", "TR25")
+    course = Course("Math", "HBZ5", 1, teacher)
+    quiz = teacher.create_quiz(
+        quiz_name="Mid-term",
+        quiz_code="MT-1",
+        course=course,
+        questions=[
+            Question(number, choices=CHOICES)
+            for number in range(questions)
+        ]
+    )
+    cohort = [
+        Student("John", "Snow", "HB{}".format(number))
+        for number in range(students)
+    ]
+    sheets = [
+        {number: choices.choice(CHOICES) for number in range(questions)}
+        for _ in range(min(students, ANSWER_SHEETS))
+    ]
+    answers = [sheets[number % len(sheets)] for number in range(students)]
+    guide = {number: choices.choice(CHOICES) for number in range(questions)}
+    return teacher, course, quiz, cohort, answers, guide
+
+
+def time_stage(stage):
+    """Return the seconds taken running stage."""
+    started = time.perf_counter()
+    stage()
+    return time.perf_counter() - started
+
+
+def trace_stage(stage):
+    """Return the peak bytes allocated while running stage."""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - start
+
+
+def run_workflow(students, questions):
+    """
+    Return the measurements of every workflow stage for one cohort size.
+
+    params:
+        - students
+        - questions
+
+    The stages are timed on one cohort and traced on a second, identical
+    one, so tracing does not inflate the times.
+    """
+    timings = run_stages(students, questions, time_stage)
+    peaks = run_stages(students, questions, trace_stage)
+    return [
+        {
+            "stage": name,
+            "students": students,
+            "questions": questions,
+            "seconds": seconds,
+            "peak_bytes": peaks[name]
+        }
+        for name, seconds in timings.items()
+    ]
+
+
+def run_stages(students, questions, measure):
+    """
+    Return the measurement of every workflow stage keyed by stage name.
+
+    params:
+        - students
+        - questions
+        - measure
+
+    A new cohort is generated and measure is called with each stage in
+    workflow order.
+    """
+    teacher, course, quiz, cohort, answers, guide = generate_cohort(
+        students,
+        questions
+    )
+    quizzes = []
+
+    def enroll():
+        for student in cohort:
+            student.enroll_into_course(course)
+
+    def assign():
+        quizzes.extend(teacher.assign_quiz_to_cohort(quiz, cohort))
+
+    def answer():
+        for student, student_quiz, sheet in zip(cohort, quizzes, answers):
+            student.answer_quiz(student_quiz, sheet)
+            student.submit_quiz(student_quiz)
+
+    def mark():
+        for student_quiz in quizzes:
+            teacher.mark_quiz(student_quiz, guide)
+
+    def grade():
+        for student_quiz in quizzes:
+            teacher.grade_quiz(student_quiz)
+
+    def total():
+        for student in cohort:
+            teacher.calculate_total_grade(student, course)
+
+    def mark_batch():
+        teacher.mark_quizzes(quizzes, guide)
+
+    def total_batch():
+        teacher.calculate_total_grades(course)
+
+    stages = (
+        ("enroll_into_course", enroll),
+        ("assign_quiz_to_cohort", assign),
+        ("answer_quiz", answer),
+        ("mark_quiz", mark),
+        ("grade_quiz", grade),
+        ("calculate_total_grade", total),
+        ("mark_quizzes", mark_batch),
+        ("calculate_total_grades", total_batch)
+    )
+    return {name: measure(stage) for name, stage in stages}
+
+
+def current_commit():
+    """Return the current git commit, or None outside a git checkout."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Return the time and peak memory ratios against a baseline run.
+
+    params:
+        - results
+        - baseline
+
+    Returns (stage, students, questions, time ratio, memory ratio) rows for
+    the measurements present in both runs. Ratios above 1 are regressions.
+    """
+    earlier = {
+        (row["stage"], row["students"], row["questions"]): row
+        for row in baseline["results"]
+    }
+    rows = []
+    for row in results["results"]:
+        key = (row["stage"], row["students"], row["questions"])
+        if key in earlier:
+            rows.append(key + (
+                row["seconds"] / max(earlier[key]["seconds"], 1e-9),
+                row["peak_bytes"] / max(earlier[key]["peak_bytes"], 1)
+            ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--students",
+        nargs="+",
+        type=int,
+        default=DEFAULT_STUDENTS
+    )
+    parser.add_argument(
+        "--questions",
+        nargs="+",
+        type=int,
+        default=DEFAULT_QUESTIONS
+    )
+    parser.add_argument(
+        "--max-answers",
+        type=int,
+        default=50000000,
+        help="skip cohorts with more students x questions than this"
+    )
+    parser.add_argument("--output", default="benchmark_grading.json")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    results = {"commit": current_commit(), "results": []}
+    print("{:<24}{:>10}{:>10}{:>12}{:>14}".format(
+        "stage", "students", "questions", "seconds", "peak MB"
+    ))
+    for students in args.students:
+        for questions in args.questions:
+            if students * questions > args.max_answers:
+                print("skipping {} students x {} questions".format(
+                    students, questions
+                ))
+                continue
+            for row in run_workflow(students, questions):
+                results["results"].append(row)
+                print("{:<24}{:>10}{:>10}{:>12.3f}{:>14.1f}".format(
+                    row["stage"],
+                    row["students"],
+                    row["questions"],
+                    row["seconds"],
+                    row["peak_bytes"] / 1e6
+                ))
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            rows = compare(results, json.load(baseline))
+        print("\n{:<24}{:>10}{:>10}{:>12}{:>14}".format(
+            "stage", "students", "questions", "time x", "memory x"
+        ))
+        for stage, students, questions, time_ratio, memory_ratio in rows:
+            print("{:<24}{:>10}{:>10}{:>12.2f}{:>14.2f}".format(
+                stage, students, questions, time_ratio, memory_ratio
+            ))
+
+
+if __name__ == "__main__":
+    main()
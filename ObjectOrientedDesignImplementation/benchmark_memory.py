@@ -0,0 +1,172 @@
+"""
+Module for benchmarking the memory used by the domain model.
+
+Reports the bytes used per student, question and quiz for the classes in
+solution.py against the plain __dict__ classes they replaced. Legacy quizzes
+share their questions and hold no answers of their own, while compact
+quizzes include the Submission holding their answers and answer results.
+
+usage:
+    python benchmark_memory.py [--scales 10000 100000 1000000]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from solution import Course, Question, Quiz, Student, Teacher
+
+
+DEFAULT_SCALES = [10000, 100000, 1000000]
+CHOICES = ["a", "b", "c", "d"]
+QUESTIONS_PER_QUIZ = 10
+
+
+class LegacyCourse(object):
+    def __init__(self, course_name, course_code, semester, course_teacher):
+        """Initialize a course object as it was before __slots__."""
+        self.course_name = course_name
+        self.course_code = course_code
+        self.semester = semester
+        self.quizzes = []
+        self.course_grade = None
+        self.course_teacher = course_teacher
+
+
+class LegacyQuestion(object):
+    def __init__(self, number, answer=None, choices=[]):
+        """Initialize a question object that holds its own answer."""
+        self.number = number
+        self.answer = answer
+        self.answer_result = False
+        self.choices = choices
+
+
+class LegacyQuiz(object):
+    def __init__(self, quiz_name, quiz_code, course, questions=[]):
+        """Initialize a quiz object as it was before submissions."""
+        self.quiz_name = quiz_name
+        self.quiz_code = quiz_code
+        self.course = course
+        self.student = None
+        self.submitted = False
+        self.marked = False
+        self.grade = None
+        self.teacher_graded = False
+        self.questions = questions
+
+
+class LegacyStudent(object):
+    def __init__(self, first_name, last_name, student_number):
+        """Initialize a student object as it was before __slots__."""
+        self.first_name = first_name
+        self.last_name = last_name
+        self.student_number = student_number
+        self.grades = {}
+        self.enrolled_courses = []
+        self.assigned_quizzes = []
+
+
+def measure(factory, count):
+    """
+    Return the bytes allocated per object.
+
+    params:
+        - factory
+        - count
+
+    This function builds count objects with factory and divides the memory
+    still allocated afterwards by count. The list holding the objects is
+    included, which adds one pointer per object.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    objects = [factory(index) for index in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    gc.collect()
+    return (end - start) / count
+
+
+def legacy_factories():
+    """Return object factories for the legacy classes."""
+    course = LegacyCourse("Math", "HBZ5", 1, None)
+    questions = [
+        LegacyQuestion(number, choices=list(CHOICES))
+        for number in range(QUESTIONS_PER_QUIZ)
+    ]
+    return {
+        "student": lambda index: LegacyStudent(
+            "John", "Snow", "HB{}".format(index)
+        ),
+        "question": lambda index: LegacyQuestion(
+            index, choices=list(CHOICES)
+        ),
+        "quiz": lambda index: LegacyQuiz(
+            "Mid-term", "MT-1", course, questions
+        ),
+    }
+
+
+def compact_factories():
+    """Return object factories for the classes in solution.py."""
+    course = Course("Math", "HBZ5", 1, Teacher("John", "Doe", "TR25"))
+    questions = [
+        Question(number, choices=CHOICES)
+        for number in range(QUESTIONS_PER_QUIZ)
+    ]
+    return {
+        "student": lambda index: Student(
+            "John", "Snow", "HB{}".format(index)
+        ),
+        "question": lambda index: Question(index, choices=CHOICES),
+        "quiz": lambda index: Quiz("Mid-term", "MT-1", course, questions),
+    }
+
+
+def run(scales):
+    """
+    Return benchmark rows for each scale.
+
+    params:
+        - scales
+
+    Each row holds the object kind, the scale and the bytes per object for
+    the legacy and the compact classes.
+    """
+    legacy = legacy_factories()
+    compact = compact_factories()
+    rows = []
+    for scale in scales:
+        for kind in ("student", "question", "quiz"):
+            rows.append((
+                kind,
+                scale,
+                measure(legacy[kind], scale),
+                measure(compact[kind], scale)
+            ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=int,
+        default=DEFAULT_SCALES
+    )
+    args = parser.parse_args()
+
+    print("{:<10}{:>10}{:>14}{:>14}{:>10}".format(
+        "object", "count", "legacy B/obj", "compact B/obj", "saved"
+    ))
+    for kind, scale, legacy, compact in run(args.scales):
+        print("{:<10}{:>10}{:>14.1f}{:>14.1f}{:>9.0%}".format(
+            kind, scale, legacy, compact, 1 - compact / legacy
+        ))
+
+
+if __name__ == "__main__":
+    main()
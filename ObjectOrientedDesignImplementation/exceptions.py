@@ -21,6 +21,11 @@ class InvalidCourseTeacherException(Exception):
     pass
 
 
+class InvalidGradingStandardException(Exception):
+    """Error if the grading standard provided is an invalid value."""
+    pass
+
+
 class InvalidQuestionException(Exception):
     """Error if the Question provided is an invalid value."""
     pass
@@ -51,6 +56,11 @@ class MultipleChoicesException(Exception):
     pass
 
 
+class TooManyChoicesException(Exception):
+    """Error when the choices provided are more than can be encoded."""
+    pass
+
+
 class UnassignedQuizException(Exception):
     """Error when the Quiz provided hasnt been assigned."""
     pass
@@ -61,6 +71,11 @@ class UnEnrolledCourseException(Exception):
     pass
 
 
+class UngradedQuizException(Exception):
+    """Error when the Quiz provided hasnt been graded."""
+    pass
+
+
 class UnmarkedQuizException(Exception):
     """Error when the Quiz provided hasnt been marked."""
     pass
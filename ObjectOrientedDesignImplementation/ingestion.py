@@ -0,0 +1,114 @@
+"""Module for streaming answer sheets into quizzes."""
+import csv
+import json
+import time
+from itertools import islice
+
+from exceptions import UnassignedQuizException
+
+
+# Fields of an answer record, in CSV column order
+ANSWER_FIELDS = ("student_number", "quiz_code", "question_number", "choice")
+
+
+def read_answer_records(path, file_format=None):
+    """
+    Yield answer records from a CSV or JSONL file.
+
+    params:
+        - path
+        - file_format
+
+    Each record is a (student_number, quiz_code, question_number, choice)
+    tuple. The file format is taken from the file extension unless given as
+    "csv" or "jsonl". CSV files need a header row naming the ANSWER_FIELDS
+    and their question numbers are read as integers.
+    """
+    if file_format is None:
+        file_format = "csv" if path.endswith(".csv") else "jsonl"
+
+    with open(path, newline="") as answer_file:
+        if file_format == "csv":
+            for row in csv.DictReader(answer_file):
+                yield (
+                    row["student_number"],
+                    row["quiz_code"],
+                    int(row["question_number"]),
+                    row["choice"]
+                )
+        else:
+            for line in answer_file:
+                if line.strip():
+                    row = json.loads(line)
+                    yield tuple(row[field] for field in ANSWER_FIELDS)
+
+
+def ingest_answers(
+    records,
+    quizzes,
+    chunk_size=10000,
+    submit=False,
+    progress=None
+):
+    """
+    Answer quizzes from a stream of answer records.
+
+    params:
+        - records
+        - quizzes
+        - chunk_size
+        - submit
+        - progress
+
+    Records are read chunk_size at a time and the answers in each chunk are
+    grouped per quiz and passed to Student.answer_quiz, which checks every
+    choice against the question choices. Only one chunk is held in memory,
+    so memory stays flat however many records there are. The quizzes must be
+    assigned and are matched to records by student number and quiz code.
+
+    When submit is True every answered quiz is submitted at the end. When
+    progress is given it is called after each chunk with the number of
+    records read so far and the records per second.
+
+    Returns the number of records read, the seconds taken and the records
+    per second.
+    """
+    assigned_quizzes = {
+        (quiz.student.student_number, quiz.quiz_code): quiz
+        for quiz in quizzes if quiz.student
+    }
+    answered_quizzes = set()
+    records = iter(records)
+    rows = 0
+    started = time.perf_counter()
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        chunk_answers = {}
+        for student_number, quiz_code, question_number, choice in chunk:
+            quiz = assigned_quizzes.get((student_number, quiz_code))
+            if quiz is None:
+                raise UnassignedQuizException(
+                    "Quiz {} is not assigned to student {}.".format(
+                        quiz_code, student_number
+                    )
+                )
+            chunk_answers.setdefault(quiz, {})[question_number] = choice
+
+        for quiz, answers in chunk_answers.items():
+            quiz.student.answer_quiz(quiz, answers)
+        answered_quizzes.update(chunk_answers)
+
+        rows += len(chunk)
+        if progress is not None:
+            progress(rows, rows / max(time.perf_counter() - started, 1e-9))
+
+    if submit:
+        for quiz in answered_quizzes:
+            quiz.student.submit_quiz(quiz)
+
+    seconds = time.perf_counter() - started
+    return rows, seconds, rows / max(seconds, 1e-9)
@@ -0,0 +1,223 @@
+"""
+Module for taking in quiz submissions during timed exams.
+
+Running this module generates a local load against the intake and reports
+the p50/p99 submit latency and the throughput.
+
+usage:
+    python intake.py [--students 5000] [--questions 20] [--queue-size 1000]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from solution import _answer_items, Course, Question, Student, Teacher
+
+
+class SubmissionIntake(object):
+    def __init__(self, max_queue_size=1000, batch_size=100):
+        """
+        Initialize a submission intake object.
+
+        Accepted submissions wait in a bounded queue until drain applies
+        them to the quizzes in batches of up to batch_size. A submission
+        that fails when applied, for instance because its quiz was assigned
+        to another student after it was queued, is kept in errors as a
+        (student, quiz, exception) tuple. The intake must be created inside
+        the running event loop.
+        """
+        self.batch_size = batch_size
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.applied = 0
+        self.errors = []
+
+    @property
+    def full(self):
+        """Return whether new submissions have to wait for the drain."""
+        return self.queue.full()
+
+    async def submit(self, student, quiz, answers):
+        """
+        Accept a submission, waiting while the queue is full.
+
+        params:
+            - student
+            - quiz
+            - answers
+
+        The submission is checked as Student.answer_quiz and
+        Student.submit_quiz would check it before it is queued, so a bad
+        submission raises here instead of in the drain.
+        """
+        answers = self._verify_submission(student, quiz, answers)
+        await self.queue.put((student, quiz, answers))
+
+    def offer(self, student, quiz, answers):
+        """
+        Accept a submission if the queue has room.
+
+        params:
+            - student
+            - quiz
+            - answers
+
+        Returns False without queueing the submission when the queue is
+        full, so the caller can slow down or retry later.
+        """
+        answers = self._verify_submission(student, quiz, answers)
+        if self.queue.full():
+            return False
+        self.queue.put_nowait((student, quiz, answers))
+        return True
+
+    async def drain(self):
+        """
+        Apply queued submissions to their quizzes in batches, forever.
+
+        A submission that fails is recorded in errors and draining goes on,
+        so one bad submission neither loses the rest of its batch nor leaves
+        join waiting forever.
+        """
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            for student, quiz, answers in batch:
+                try:
+                    student.answer_quiz(quiz, answers)
+                    student.submit_quiz(quiz)
+                except Exception as error:
+                    self.errors.append((student, quiz, error))
+                else:
+                    self.applied += 1
+                finally:
+                    self.queue.task_done()
+            # let submitters waiting on a full queue run between batches
+            await asyncio.sleep(0)
+
+    async def join(self):
+        """Wait until every accepted submission has been applied."""
+        await self.queue.join()
+
+    def _verify_submission(self, student, quiz, answers):
+        """
+        Verify a submission.
+
+        params:
+            - student
+            - quiz
+            - answers
+
+        This function checks that the quiz is assigned to the student and
+        that every answer is one of its question's choices, and returns the
+        answers as a mapping of question number to choice.
+        """
+        student._verify_quiz(quiz)
+        answers = dict(_answer_items(answers))
+        question_index = quiz.question_index
+        for number, choice in answers.items():
+            index = question_index.get(number)
+            if index is not None:
+                student._verify_choice(choice, quiz.questions[index])
+        return answers
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of sorted values."""
+    index = max(0, -(-len(values) * percent // 100) - 1)
+    return values[index]
+
+
+async def generate_load(intake, submissions, concurrency=100):
+    """
+    Submit many submissions concurrently and measure them.
+
+    params:
+        - intake
+        - submissions
+        - concurrency
+
+    submissions is a list of (student, quiz, answers) tuples which are
+    submitted by concurrency tasks while the intake drains. Returns the p50
+    and p99 submit latency in seconds and the submissions per second.
+    """
+    drain = asyncio.ensure_future(intake.drain())
+    pending = iter(submissions)
+    latencies = []
+
+    async def submitter():
+        for student, quiz, answers in pending:
+            started = time.perf_counter()
+            await intake.submit(student, quiz, answers)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submitter() for _ in range(concurrency)))
+    await intake.join()
+    seconds = time.perf_counter() - started
+    drain.cancel()
+
+    latencies.sort()
+    return (
+        percentile(latencies, 50),
+        percentile(latencies, 99),
+        len(latencies) / seconds
+    )
+
+
+def create_submissions(students, questions):
+    """Return (student, quiz, answers) tuples for a synthetic exam."""
+    teacher = Teacher("John", "Doe", "TR25")
+    course = Course("Math", "HBZ5", 1, teacher)
+    quiz = teacher.create_quiz(
+        quiz_name="Mid-term",
+        quiz_code="MT-1",
+        course=course,
+        questions=[
+            Question(number, choices=["a", "b", "c", "d"])
+            for number in range(questions)
+        ]
+    )
+    cohort = [
+        Student("John", "Snow", "HB{}".format(number))
+        for number in range(students)
+    ]
+    quizzes = teacher.assign_quiz_to_cohort(quiz, cohort)
+    choices = random.Random(students)
+    return [
+        (student, quiz, {
+            number: choices.choice("abcd") for number in range(questions)
+        })
+        for student, quiz in zip(cohort, quizzes)
+    ]
+
+
+async def run_load(students, questions, queue_size, concurrency):
+    """Generate a load against a new intake and return its measurements."""
+    intake = SubmissionIntake(max_queue_size=queue_size)
+    submissions = create_submissions(students, questions)
+    return await generate_load(intake, submissions, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    p50, p99, throughput = asyncio.run(run_load(
+        args.students,
+        args.questions,
+        args.queue_size,
+        args.concurrency
+    ))
+    print("p50 {:.3f} ms, p99 {:.3f} ms, {:.0f} submissions/s".format(
+        p50 * 1000, p99 * 1000, throughput
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,973 @@
+"""
+Module for journaling the operations of students and teachers.
+
+A journal is an append-only binary file of events. Each event is an event
+code and a payload of plain values. Teachers and students are referenced by
+their number, and courses, question sets and quizzes by the position they
+were given when the journal first saw them. Each is defined by its own event
+before the first event referencing it, with the state it had then: a course
+with its roster, course grades and quizzes, and a quiz with its answers,
+results and grade. So a model loaded, built or changed before the journal
+saw it is replayed as it was.
+
+Journaled calls are recorded in the order they take effect. Each call holds
+the ordering locks of the students, courses and quizzes it is given while it
+runs and appends its event before releasing them, so calls touching the same
+object are recorded in the order they ran, while calls on other objects run
+alongside it. The journal lock itself is only held to encode a call and to
+append its event.
+
+Events are buffered and committed as a group, once max_batch_events are
+buffered or every max_delay seconds, so journaled calls do not pay for an
+fsync each. Every commit appends one frame: a header packed as FRAME,
+holding the length and CRC32 of the body, followed by the body, the pickled
+list of the buffered events. A frame torn by a crash fails its checksum and
+is dropped whole.
+
+Replaying a journal runs the journaled calls again to rebuild the model.
+Once checkpoint_events events are committed, the model is checkpointed: a
+replica of it is rebuilt from the committed events, apart from the live
+model, and pickled to a snapshot next to the journal along with the length
+of the journal it reflects. Replaying then loads the snapshot and runs only the
+calls committed after it, while the journal itself keeps every event. An
+event that does not replay as recorded, such as a call that succeeded but
+raises on replay as the model was changed around the journal, is reported
+rather than stopping the replay. Bodies and snapshots are pickled, so only
+replay journals written by this module.
+"""
+from array import array
+from functools import partial, wraps
+import gc
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+import parallel
+from solution import (
+    _CHOICES,
+    _QUESTION_SETS,
+    COURSE_GRADING_STANDARD,
+    Course,
+    GradingStandard,
+    Question,
+    Quiz,
+    Student,
+    Teacher
+)
+import validation
+from wrapping import original_method, unwrap_methods, wrap_method
+
+
+FRAME = struct.Struct("<II")
+PICKLE_PROTOCOL = 4
+ORDERING_LOCKS = 64
+
+DEFINE_TEACHER = 1
+DEFINE_STUDENT = 2
+DEFINE_COURSE = 3
+DEFINE_QUESTIONS = 4
+DEFINE_QUIZ = 5
+
+# Methods and batch functions whose calls are journaled. A call is recorded
+# with the event code FIRST_CALL plus the position of its method here.
+JOURNALED_METHODS = (
+    (Student, "enroll_into_course"),
+    (Student, "answer_quiz"),
+    (Student, "submit_quiz"),
+    (Teacher, "create_quiz"),
+    (Teacher, "assign_quiz"),
+    (Teacher, "assign_quiz_to_cohort"),
+    (Teacher, "enroll_many"),
+    (Teacher, "mark_quiz"),
+    (Teacher, "mark_quizzes"),
+    (Teacher, "grade_quiz"),
+    (Teacher, "regrade_quizzes"),
+    (Teacher, "calculate_total_grade"),
+    (Teacher, "calculate_total_grades"),
+    (validation, "enroll_batch"),
+    (validation, "assign_batch"),
+    (validation, "answer_batch"),
+    (parallel, "mark_quizzes_parallel")
+)
+FIRST_CALL = 16
+
+EVENT_NAMES = dict(
+    [
+        (DEFINE_TEACHER, "define_teacher"),
+        (DEFINE_STUDENT, "define_student"),
+        (DEFINE_COURSE, "define_course"),
+        (DEFINE_QUESTIONS, "define_questions"),
+        (DEFINE_QUIZ, "define_quiz")
+    ] + [
+        (FIRST_CALL + index, "{}.{}".format(cls.__name__, name))
+        for index, (cls, name) in enumerate(JOURNALED_METHODS)
+    ]
+)
+
+
+def _mark_quizzes_in_process(
+    teacher,
+    quizzes,
+    marking_guide,
+    workers=None,
+    shard_size=None
+):
+    """Mark quizzes as mark_quizzes_parallel does, without workers."""
+    return _MARK_QUIZZES(teacher, quizzes, marking_guide)
+
+
+# The methods as defined, called directly when replaying. Parallel marking
+# is replayed in process, as it gives the same results.
+_MARK_QUIZZES = original_method(Teacher, "mark_quizzes")
+_MARK_QUIZZES_PARALLEL = JOURNALED_METHODS.index(
+    (parallel, "mark_quizzes_parallel")
+)
+_METHODS = tuple(
+    _mark_quizzes_in_process if index == _MARK_QUIZZES_PARALLEL else
+    original_method(cls, name)
+    for index, (cls, name) in enumerate(JOURNALED_METHODS)
+)
+_CREATE_QUIZ = JOURNALED_METHODS.index((Teacher, "create_quiz"))
+_ASSIGN_QUIZ_TO_COHORT = JOURNALED_METHODS.index(
+    (Teacher, "assign_quiz_to_cohort")
+)
+_ASSIGN_BATCH = JOURNALED_METHODS.index((validation, "assign_batch"))
+_CREATING_METHODS = (_CREATE_QUIZ, _ASSIGN_QUIZ_TO_COHORT, _ASSIGN_BATCH)
+# Methods that also update the courses of the quizzes they are given, by
+# grading them or adding quizzes to them
+_COURSE_METHODS = frozenset(
+    JOURNALED_METHODS.index(method)
+    for method in (
+        (Teacher, "assign_quiz_to_cohort"),
+        (Teacher, "mark_quizzes"),
+        (Teacher, "grade_quiz"),
+        (Teacher, "regrade_quizzes"),
+        (validation, "assign_batch"),
+        (parallel, "mark_quizzes_parallel")
+    )
+)
+
+
+def read_events(path):
+    """
+    Return the (event name, payload) of every committed event of a journal.
+
+    params:
+        - path
+
+    Reading stops at the first torn or corrupted frame.
+    """
+    with open(path, "rb") as journal:
+        data = journal.read()
+    return [
+        (EVENT_NAMES[code], payload)
+        for start, stop in _find_frames(data)
+        for code, payload in pickle.loads(data[start:stop])
+    ]
+
+
+def _as_list(value):
+    """
+    Return an iterable argument as a list, and other arguments as they are.
+
+    params:
+        - value
+
+    Strings, bytes and dictionaries are kept, as are lists and tuples.
+    Every other iterable, such as a generator, a set or dictionary values,
+    is listed so it can be both encoded and passed to the call.
+    """
+    if (
+        isinstance(value, (str, bytes, dict, list, tuple)) or
+        not hasattr(value, "__iter__")
+    ):
+        return value
+    return list(value)
+
+
+def _ordered_objects(value, objects):
+    """
+    Add the students, courses and quizzes found in a value to objects.
+
+    params:
+        - value
+        - objects
+
+    Lists and tuples are searched item by item.
+    """
+    kind = type(value)
+    if kind is Student or kind is Course or kind is Quiz:
+        objects.append(value)
+    elif kind is list or kind is tuple:
+        for item in value:
+            _ordered_objects(item, objects)
+
+
+def _find_frames(data, offset=0):
+    """
+    Yield the start and stop of the body of every intact frame in data.
+
+    params:
+        - data
+        - offset
+
+    A frame is intact when it is complete and its body matches its
+    checksum. Frames after the first one that is not are ignored, and so
+    are the frames before offset.
+    """
+    end = len(data)
+    header_size = FRAME.size
+    while offset + header_size <= end:
+        size, checksum = FRAME.unpack_from(data, offset)
+        start = offset + header_size
+        stop = start + size
+        if stop > end or zlib.crc32(data[start:stop]) != checksum:
+            break
+        yield start, stop
+        offset = stop
+
+
+class Journal(object):
+    def __init__(
+        self,
+        path,
+        max_batch_events=10000,
+        max_delay=0.01,
+        checkpoint_events=1000000
+    ):
+        """
+        Initialize a journal object.
+
+        An existing journal at path is replayed first, from its last
+        checkpoint if it has one, and a torn frame left at its end by a
+        crash is cut off. The rebuilt teachers and students are kept by
+        number and the courses by course key, as SQLiteRepository.load_term
+        returns them. Nothing is journaled until enable is called. A
+        checkpoint_events of None turns automatic checkpoints off.
+
+        errors holds an (event name, error) pair for each event that could
+        not be pickled and was left out of its frame, and a (None, error)
+        pair for each commit or checkpoint that failed in the background.
+        replay_errors holds an (event name, payload, error) tuple for each
+        replayed event that raised, other than calls recorded as failed.
+        """
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.max_batch_events = max_batch_events
+        self.max_delay = max_delay
+        self.checkpoint_events = checkpoint_events
+        self.commits = 0
+        self.errors = []
+        self._reset_model()
+        self._events = []
+        # Guards the buffer, the positions and the encoding of calls. It is
+        # never held across a journaled call, and commits take the write
+        # lock first and then this one, so a journaled call never waits for
+        # an fsync.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._ordering_locks = tuple(
+            threading.Lock() for _ in range(ORDERING_LOCKS)
+        )
+        # Depth of the journaled calls running on each thread
+        self._local = threading.local()
+        self._enabled = False
+
+        self.replayed_events, self._size = self._replay()
+        self._uncheckpointed_events = self.replayed_events
+        self._file = open(path, "ab", buffering=0)
+        self._closed = threading.Event()
+        self._committer = threading.Thread(
+            target=self._commit_periodically,
+            daemon=True
+        )
+        self._committer.start()
+
+    def _reset_model(self):
+        """Start the journal with an empty model and no positions."""
+        self.teachers = {}
+        self.students = {}
+        self.courses = {}
+        self._course_ids = {}
+        self._courses = []
+        self._question_set_ids = {}
+        self._question_sets = {}
+        self._quiz_ids = {}
+        self._quizzes = []
+        self._references = {
+            "s": self.students,
+            "t": self.teachers,
+            "c": self._courses,
+            "q": self._quizzes
+        }
+        self.replay_errors = []
+
+    @property
+    def enabled(self):
+        """Return whether the journaled methods are currently wrapped."""
+        return self._enabled
+
+    def enable(self):
+        """Wrap the journaled methods so their calls are recorded."""
+        if self._enabled:
+            return
+        for index, (cls, name) in enumerate(JOURNALED_METHODS):
+            wrap_method(cls, name, self, partial(self._wrap, index))
+        self._enabled = True
+
+    def disable(self):
+        """Remove the wrappers of the journaled methods."""
+        unwrap_methods(self)
+        self._enabled = False
+
+    def commit(self):
+        """
+        Write and fsync the buffered events now.
+
+        If the write fails, the events are put back at the front of the
+        buffer and the error is raised.
+        """
+        with self._write_lock:
+            with self._lock:
+                events, self._events = self._events, []
+            self._write(events)
+
+    def checkpoint(self):
+        """
+        Commit the buffered events and write a snapshot of the model.
+
+        The snapshot is pickled from a replica of the model rebuilt from
+        the last snapshot and the events committed since, so journaled calls
+        keep running on the live model meanwhile. The snapshot is written
+        beside the journal and then moved over the previous one, so a crash
+        leaves either snapshot whole.
+        """
+        with self._checkpoint_lock:
+            with self._write_lock:
+                with self._lock:
+                    events, self._events = self._events, []
+                self._write(events)
+                length = self._size
+                uncheckpointed_events = self._uncheckpointed_events
+                self._uncheckpointed_events = 0
+            try:
+                replica = Journal.__new__(Journal)
+                replica.path = self.path
+                replica.snapshot_path = self.snapshot_path
+                replica._reset_model()
+                replica._replay(length)
+                snapshot = pickle.dumps(
+                    (
+                        length,
+                        replica.teachers,
+                        replica.students,
+                        replica._courses,
+                        replica._question_sets,
+                        replica._quizzes
+                    ),
+                    PICKLE_PROTOCOL
+                )
+                temporary_path = self.snapshot_path + ".tmp"
+                with open(temporary_path, "wb") as temporary:
+                    temporary.write(snapshot)
+                    temporary.flush()
+                    os.fsync(temporary.fileno())
+                os.replace(temporary_path, self.snapshot_path)
+            except Exception:
+                with self._write_lock:
+                    self._uncheckpointed_events += uncheckpointed_events
+                raise
+
+    def close(self):
+        """Stop journaling, commit the buffered events and close the file."""
+        self.disable()
+        self._closed.set()
+        self._committer.join()
+        self.commit()
+        self._file.close()
+
+    def _wrap(self, index, method):
+        """
+        Return method wrapped to record its calls.
+
+        params:
+            - index
+            - method
+
+        Iterable arguments are listed first, so they can be both encoded
+        and passed to the call. The arguments are encoded under the journal
+        lock, defining any object the journal has not seen yet. The call
+        then runs under the ordering locks of its objects alone, and its
+        event is appended before they are released, so calls on the same
+        objects are recorded in the order they took effect. Calls made by a
+        journaled call are not recorded again. The call is recorded with
+        whether it raised, so a call that failed part way is replayed up to
+        the same failure. Quizzes created by the call are then given their
+        positions.
+        """
+        code = FIRST_CALL + index
+        local = self._local
+
+        @wraps(method)
+        def journaled(obj, *args, **kwargs):
+            if getattr(local, "depth", 0):
+                return method(obj, *args, **kwargs)
+            obj = _as_list(obj)
+            args = tuple(map(_as_list, args))
+            kwargs = {
+                name: _as_list(value) for name, value in kwargs.items()
+            }
+            ordering_locks = self._ordering_locks_of(
+                index,
+                obj,
+                args,
+                kwargs
+            )
+            for lock in ordering_locks:
+                lock.acquire()
+            local.depth = 1
+            try:
+                with self._lock:
+                    call = (
+                        self._encode(obj),
+                        self._encode(args),
+                        {
+                            name: self._encode(value)
+                            for name, value in kwargs.items()
+                        } if kwargs else None
+                    )
+                try:
+                    result = method(obj, *args, **kwargs)
+                except Exception:
+                    with self._lock:
+                        self._events.append((code, call + (True,)))
+                    raise
+                with self._lock:
+                    self._events.append((code, call + (False,)))
+                    if index in _CREATING_METHODS:
+                        self._register_results(index, result)
+                    full = len(self._events) >= self.max_batch_events
+            finally:
+                local.depth = 0
+                for lock in reversed(ordering_locks):
+                    lock.release()
+            if full:
+                self.commit()
+            return result
+        return journaled
+
+    def _ordering_locks_of(self, index, obj, args, kwargs):
+        """
+        Return the ordering locks a journaled call takes, in lock order.
+
+        params:
+            - index
+            - obj
+            - args
+            - kwargs
+
+        The call takes the lock of every student, course and quiz it is
+        given, and of the course of every quiz it grades or adds quizzes
+        to. The locks are always taken in the same order, so calls cannot
+        deadlock on them.
+        """
+        objects = []
+        _ordered_objects(obj, objects)
+        _ordered_objects(args, objects)
+        _ordered_objects(list(kwargs.values()), objects)
+        if index in _COURSE_METHODS:
+            objects.extend([
+                value.course for value in objects if type(value) is Quiz
+            ])
+        ordering_locks = self._ordering_locks
+        return [
+            ordering_locks[position]
+            for position in sorted(set(
+                hash(value) % len(ordering_locks) for value in objects
+            ))
+        ]
+
+    def _write(self, events):
+        """
+        Write events as a frame and fsync it.
+
+        params:
+            - events
+
+        Events that cannot be pickled are left out and reported in errors,
+        so they do not lose the rest of the frame. If writing fails, what
+        was written of the frame is cut off again and the events are put
+        back at the front of the buffer before the error is raised. The
+        write lock must be held.
+        """
+        if not events:
+            return
+        try:
+            body = pickle.dumps(events, PICKLE_PROTOCOL)
+        except Exception:
+            events = self._picklable_events(events)
+            if not events:
+                return
+            body = pickle.dumps(events, PICKLE_PROTOCOL)
+        frame = memoryview(FRAME.pack(len(body), zlib.crc32(body)) + body)
+        try:
+            while frame:
+                frame = frame[self._file.write(frame):]
+            os.fsync(self._file.fileno())
+        except OSError:
+            os.ftruncate(self._file.fileno(), self._size)
+            with self._lock:
+                self._events[:0] = events
+            raise
+        self._size += FRAME.size + len(body)
+        self._uncheckpointed_events += len(events)
+        self.commits += 1
+
+    def _commit_periodically(self):
+        """
+        Commit the buffer every max_delay seconds until closed.
+
+        The model is checkpointed here too once checkpoint_events events
+        were committed since the last checkpoint.
+        """
+        while not self._closed.wait(self.max_delay):
+            try:
+                self.commit()
+                if (
+                    self.checkpoint_events and
+                    self._uncheckpointed_events >= self.checkpoint_events
+                ):
+                    self.checkpoint()
+            except Exception as error:
+                self.errors.append((None, error))
+
+    def _picklable_events(self, events):
+        """
+        Return the events that can be pickled.
+
+        params:
+            - events
+
+        Each event left out is reported in errors with its error.
+        """
+        picklable_events = []
+        for event in events:
+            try:
+                pickle.dumps(event, PICKLE_PROTOCOL)
+            except Exception as error:
+                self.errors.append((EVENT_NAMES[event[0]], error))
+            else:
+                picklable_events.append(event)
+        return picklable_events
+
+    def _encode(self, value):
+        """
+        Return a value with its objects replaced by references.
+
+        params:
+            - value
+
+        References are tuples. Lists and tuples of questions are question
+        sets, referenced like other objects. Other lists and tuples are
+        encoded item by item as lists, so they may hold objects, while
+        dictionaries such as answers and marking guides are copied as they
+        are. A question outside a question set is encoded by value. Objects
+        the journal has not seen yet are defined first. The journal lock
+        must be held.
+        """
+        kind = type(value)
+        if kind is list or kind is tuple:
+            if value and all(type(item) is Question for item in value):
+                questions, question_index = Quiz._intern_questions(value)
+                if questions not in self._question_set_ids:
+                    self._define_question_set(question_index)
+                return ("S", self._question_set_ids[questions])
+            return [self._encode(item) for item in value]
+        if kind is Student:
+            if value.student_number not in self.students:
+                self.students[value.student_number] = value
+                self._events.append((DEFINE_STUDENT, (
+                    value.student_number,
+                    value.first_name,
+                    value.last_name
+                )))
+            return ("s", value.student_number)
+        if kind is Teacher:
+            if value.teacher_number not in self.teachers:
+                self.teachers[value.teacher_number] = value
+                self._events.append((DEFINE_TEACHER, (
+                    value.teacher_number,
+                    value.first_name,
+                    value.last_name
+                )))
+            return ("t", value.teacher_number)
+        if kind is Course:
+            if value not in self._course_ids:
+                self._define_course(value)
+            return ("c", self._course_ids[value])
+        if kind is Quiz:
+            if value not in self._quiz_ids:
+                self._define_quiz(value)
+            return ("q", self._quiz_ids[value])
+        if kind is Question:
+            return ("Q", value.number, list(value.choices))
+        if isinstance(value, dict):
+            return dict(value)
+        return value
+
+    def _decode(self, value):
+        """
+        Return an encoded reference or list with the objects restored.
+
+        params:
+            - value
+        """
+        if type(value) is tuple:
+            if value[0] == "S":
+                return self._question_sets[value[1]].questions
+            if value[0] == "Q":
+                return Question(value[1], choices=value[2])
+            return self._references[value[0]][value[1]]
+        return [
+            self._decode(item) if type(item) in (tuple, list) else item
+            for item in value
+        ]
+
+    def _define_course(self, course):
+        """
+        Record the definition of a course with its state.
+
+        params:
+            - course
+
+        The teacher and the students on the roster are defined first, and
+        the quizzes of the course after it, so a course first seen with
+        students enrolled, quizzes created or grades recorded is replayed
+        with them. Course grades are kept for the students on the roster.
+        """
+        teacher = course.course_teacher
+        self._encode(teacher)
+        roster = list(course.roster.values())
+        for student in roster:
+            self._encode(student)
+        grading_standard = None
+        if course.grading_standard is not COURSE_GRADING_STANDARD:
+            grading_standard = (
+                course.grading_standard.bands,
+                course.grading_standard.maximum
+            )
+        self._register_course(course)
+        self._events.append((DEFINE_COURSE, (
+            self._course_ids[course],
+            course.course_name,
+            course.course_code,
+            course.semester,
+            teacher.teacher_number,
+            grading_standard,
+            [student.student_number for student in roster],
+            [
+                (student_number, grade)
+                for student_number, grade in
+                teacher.gradebook.course_grades(course).items()
+                if student_number in course.roster
+            ]
+        )))
+        for quiz in list(course.quizzes):
+            self._encode(quiz)
+
+    def _define_question_set(self, question_index):
+        """Record the definition of an interned question set."""
+        self._register_question_set(
+            len(self._question_sets),
+            question_index
+        )
+        self._events.append((DEFINE_QUESTIONS, (
+            self._question_set_ids[question_index.questions],
+            [
+                (question.number, list(question.choices))
+                for question in question_index.questions
+            ]
+        )))
+
+    def _define_quiz(self, quiz):
+        """
+        Record the definition of a quiz with its questions and state.
+
+        params:
+            - quiz
+
+        Defining the course of the quiz defines the quiz too if the course
+        holds it, in which case it is not defined again.
+        """
+        self._encode(quiz.course)
+        if quiz in self._quiz_ids:
+            return
+        student_number = None
+        if quiz.student:
+            self._encode(quiz.student)
+            student_number = quiz.student.student_number
+        question_set = self._encode(quiz.questions)[1]
+        self._register_quiz(quiz)
+        submission = quiz.submission
+        self._events.append((DEFINE_QUIZ, (
+            self._quiz_ids[quiz],
+            self._course_ids[quiz.course],
+            quiz.quiz_name,
+            quiz.quiz_code,
+            question_set,
+            student_number,
+            quiz.submitted,
+            quiz.marked,
+            quiz.grade,
+            quiz.teacher_graded,
+            submission.answers.tobytes(),
+            submission.answer_results.tobytes()
+        )))
+
+    def _register_course(self, course):
+        """Give a course the next course position."""
+        self._course_ids[course] = len(self._courses)
+        self._courses.append(course)
+        self.courses[course.course_key] = course
+
+    def _register_question_set(self, question_set, question_index):
+        """
+        Keep an interned question set under its position.
+
+        params:
+            - question_set
+            - question_index
+
+        The journal keeps the question index, so the set stays interned and
+        quizzes created from it later share it.
+        """
+        self._question_set_ids[question_index.questions] = question_set
+        self._question_sets[question_set] = question_index
+
+    def _register_quiz(self, quiz):
+        """Give a quiz the next quiz position."""
+        self._quiz_ids[quiz] = len(self._quizzes)
+        self._quizzes.append(quiz)
+
+    def _register_results(self, index, result):
+        """
+        Give the quizzes created by a journaled call their positions.
+
+        params:
+            - index
+            - result
+
+        Recording and replaying a call both register its new quizzes here,
+        in the same order, so they get the same positions.
+        """
+        if index == _CREATE_QUIZ:
+            self._register_quiz(result)
+        elif index == _ASSIGN_QUIZ_TO_COHORT:
+            for quiz in result:
+                self._register_quiz(quiz)
+        elif index == _ASSIGN_BATCH:
+            for quiz in result.accepted:
+                self._register_quiz(quiz)
+
+    def _replay(self, length=None):
+        """
+        Replay the journal at path and return the events and its length.
+
+        params:
+            - length
+
+        The model is loaded from the snapshot first if there is one, and
+        only the events committed after it are replayed and counted. A torn
+        frame at the end of the journal is cut off. The garbage collector is
+        paused while replaying, as the rebuilt model only grows and
+        collecting would scan it again and again. Events that raise are
+        reported in replay_errors and the replay goes on. Given a length,
+        only the journal up to it is replayed and the journal is left as it
+        is, as a replica is built while the journal is written.
+        """
+        if length is None:
+            if not os.path.exists(self.path):
+                return 0, 0
+            size = os.path.getsize(self.path)
+        else:
+            size = length
+        if not size:
+            return 0, 0
+        events = 0
+        collecting = gc.isenabled() and length is None
+        if collecting:
+            gc.disable()
+        try:
+            offset = self._load_snapshot()
+            with open(self.path, "rb" if length else "r+b") as journal:
+                with mmap.mmap(
+                    journal.fileno(),
+                    size,
+                    access=mmap.ACCESS_READ
+                ) as data:
+                    view = memoryview(data)
+                    try:
+                        for start, stop in _find_frames(view, offset):
+                            frame = pickle.loads(view[start:stop])
+                            for code, payload in frame:
+                                try:
+                                    self._apply(code, payload)
+                                except Exception as error:
+                                    self.replay_errors.append(
+                                        (EVENT_NAMES[code], payload, error)
+                                    )
+                            events += len(frame)
+                            offset = stop
+                    finally:
+                        view.release()
+                if length is None:
+                    journal.truncate(offset)
+        finally:
+            if collecting:
+                gc.enable()
+        return events, offset
+
+    def _load_snapshot(self):
+        """
+        Load the model from the snapshot and return the length it reflects.
+
+        The positions are rebuilt from the loaded objects, and the loaded
+        question sets and choices are interned again so quizzes created
+        later share them. Without a snapshot nothing is loaded and 0 is
+        returned.
+        """
+        if not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path, "rb") as snapshot:
+            (length, teachers, students, courses, question_sets,
+             quizzes) = pickle.load(snapshot)
+        self.teachers.update(teachers)
+        self.students.update(students)
+        for course in courses:
+            self._register_course(course)
+        for question_set, question_index in question_sets.items():
+            for question in question_index.questions:
+                question.choice_codes = _CHOICES.setdefault(
+                    question.choices,
+                    question.choice_codes
+                )
+                question.choices = question.choice_codes.choices
+            _QUESTION_SETS[question_index.questions] = question_index
+            self._register_question_set(question_set, question_index)
+        self._quizzes.extend(quizzes)
+        self._quiz_ids.update(zip(quizzes, range(len(quizzes))))
+        return length
+
+    def _apply(self, code, payload):
+        """
+        Apply a replayed event.
+
+        params:
+            - code
+            - payload
+
+        Calls recorded as failed are expected to raise again, while the
+        error of a call recorded as succeeding is raised. Question sets are
+        kept under the position they were recorded with. Graded quizzes are
+        recorded through their course teacher, as SQLiteRepository.load_term
+        records them, so the course grade totals are rebuilt.
+        """
+        if code >= FIRST_CALL:
+            index = code - FIRST_CALL
+            obj, args, kwargs, failed = payload
+            decode = self._decode
+            if kwargs:
+                kwargs = {
+                    name: decode(value) if type(value) in (tuple, list)
+                    else value
+                    for name, value in kwargs.items()
+                }
+            else:
+                kwargs = {}
+            try:
+                result = _METHODS[index](
+                    decode(obj),
+                    *[
+                        decode(argument) if type(argument) in (tuple, list)
+                        else argument
+                        for argument in args
+                    ],
+                    **kwargs
+                )
+            except Exception:
+                if failed:
+                    return
+                raise
+            if index in _CREATING_METHODS:
+                self._register_results(index, result)
+        elif code == DEFINE_STUDENT:
+            student_number, first_name, last_name = payload
+            self.students[student_number] = Student(
+                first_name,
+                last_name,
+                student_number
+            )
+        elif code == DEFINE_TEACHER:
+            teacher_number, first_name, last_name = payload
+            self.teachers[teacher_number] = Teacher(
+                first_name,
+                last_name,
+                teacher_number
+            )
+        elif code == DEFINE_COURSE:
+            (_, course_name, course_code, semester, teacher_number,
+             grading_standard, roster, course_grades) = payload
+            teacher = self.teachers[teacher_number]
+            course = Course(
+                course_name,
+                course_code,
+                semester,
+                teacher,
+                GradingStandard(*grading_standard) if grading_standard else
+                COURSE_GRADING_STANDARD
+            )
+            for student_number in roster:
+                student = self.students[student_number]
+                student.enrolled_courses[course.course_key] = course
+                course.roster[student_number] = student
+            for student_number, grade in course_grades:
+                teacher._record_course_grade(
+                    self.students[student_number],
+                    course,
+                    grade
+                )
+            self._register_course(course)
+        elif code == DEFINE_QUESTIONS:
+            question_set, questions = payload
+            _, question_index = Quiz._intern_questions([
+                Question(number, choices=choices)
+                for number, choices in questions
+            ])
+            self._register_question_set(question_set, question_index)
+        elif code == DEFINE_QUIZ:
+            (_, course_id, quiz_name, quiz_code, question_set, student_number,
+             submitted, marked, grade, teacher_graded, answers,
+             answer_results) = payload
+            course = self._courses[course_id]
+            quiz = Quiz(
+                quiz_name,
+                quiz_code,
+                course,
+                self._question_sets[question_set].questions
+            )
+            if student_number is not None:
+                quiz.student = self.students[student_number]
+            quiz.submitted = submitted
+            quiz.marked = marked
+            quiz.submission.answers = array("b", answers)
+            quiz.submission.answer_results = array("b", answer_results)
+            if teacher_graded:
+                course.course_teacher._record_quiz_grade(quiz, grade)
+            else:
+                quiz.grade = grade
+            course.quizzes.append(quiz)
+            self._register_quiz(quiz)
@@ -0,0 +1,186 @@
+"""Module for instrumenting the public methods of Student and Teacher."""
+from functools import partial, wraps
+import json
+import random
+from threading import Lock
+import time
+from types import FunctionType
+
+from solution import Student, Teacher
+from wrapping import unwrap_methods, wrap_method
+
+
+# Quantiles reported for method latencies
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class MethodStats(object):
+    __slots__ = ("calls", "seconds", "items", "latencies", "_random", "_lock")
+
+    def __init__(self, sample_size):
+        """
+        Initialize a method stats object.
+
+        Latencies are kept as a uniform random sample of at most sample_size
+        calls, so memory stays bounded however often the method is called.
+        The stats are updated under a lock, as instrumented methods may be
+        called from many threads.
+        """
+        self.calls = 0
+        self.seconds = 0.0
+        self.items = 0
+        self.latencies = []
+        self._random = random.Random(sample_size)
+        self._lock = Lock()
+
+    def record(self, seconds, items, sample_size):
+        """Record one call taking seconds that processed items."""
+        with self._lock:
+            self.calls += 1
+            self.seconds += seconds
+            self.items += items
+            if len(self.latencies) < sample_size:
+                self.latencies.append(seconds)
+            else:
+                index = self._random.randrange(self.calls)
+                if index < sample_size:
+                    self.latencies[index] = seconds
+
+    def quantiles(self):
+        """Return the sampled latency at each of the QUANTILES."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return {quantile: 0.0 for quantile in QUANTILES}
+        return {
+            quantile: latencies[min(
+                len(latencies) - 1,
+                int(quantile * len(latencies))
+            )]
+            for quantile in QUANTILES
+        }
+
+
+class Instrumentation(object):
+    def __init__(self, classes=(Student, Teacher), sample_size=10000):
+        """
+        Initialize an instrumentation object.
+
+        Nothing is measured until enable is called, which wraps every public
+        method of classes. disable removes the wrappers again, so a
+        disabled instrumentation costs nothing. Methods are wrapped through
+        wrapping, so other wrappers such as a Journal's are left in place.
+        """
+        self.classes = classes
+        self.sample_size = sample_size
+        self.stats = {}
+        self._enabled = False
+
+    @property
+    def enabled(self):
+        """Return whether the methods are currently wrapped."""
+        return self._enabled
+
+    def enable(self):
+        """Wrap the public methods of the instrumented classes."""
+        if self.enabled:
+            return
+        for cls in self.classes:
+            for name, method in list(vars(cls).items()):
+                if name.startswith("_") or type(method) is not FunctionType:
+                    continue
+                label = "{}.{}".format(cls.__name__, name)
+                self.stats.setdefault(label, MethodStats(self.sample_size))
+                wrap_method(
+                    cls,
+                    name,
+                    self,
+                    partial(self._wrap, stats=self.stats[label])
+                )
+        self._enabled = True
+
+    def disable(self):
+        """Remove the wrappers of the instrumented methods."""
+        unwrap_methods(self)
+        self._enabled = False
+
+    def reset(self):
+        """Forget everything measured so far."""
+        for label in self.stats:
+            self.stats[label] = MethodStats(self.sample_size)
+        if self.enabled:
+            self.disable()
+            self.enable()
+
+    def snapshot(self):
+        """Return the stats of every called method as a dictionary."""
+        return {
+            label: {
+                "calls": stats.calls,
+                "seconds": stats.seconds,
+                "items": stats.items,
+                "quantiles": {
+                    str(quantile): seconds
+                    for quantile, seconds in stats.quantiles().items()
+                }
+            }
+            for label, stats in sorted(self.stats.items())
+            if stats.calls
+        }
+
+    def to_json(self):
+        """Return the snapshot as a JSON document."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Return the snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, field in (
+            ("submission_method_calls_total", "calls"),
+            ("submission_method_seconds_total", "seconds"),
+            ("submission_method_items_total", "items")
+        ):
+            lines.append("# TYPE {} counter".format(name))
+            for label, stats in snapshot.items():
+                lines.append('{}{{method="{}"}} {}'.format(
+                    name, label, stats[field]
+                ))
+        lines.append("# TYPE submission_method_latency_seconds summary")
+        for label, stats in snapshot.items():
+            for quantile, seconds in stats["quantiles"].items():
+                lines.append(
+                    'submission_method_latency_seconds'
+                    '{{method="{}",quantile="{}"}} {}'.format(
+                        label, quantile, seconds
+                    )
+                )
+        return "\n".join(lines) + "\n"
+
+    def _wrap(self, method, stats):
+        """
+        Return method wrapped to record its stats.
+
+        params:
+            - method
+            - stats
+
+        The items processed by a call are the length of its first list,
+        tuple or dictionary argument, such as the answers of answer_quiz or
+        the quizzes of mark_quizzes, or 1 when there is none.
+        """
+        sample_size = self.sample_size
+
+        @wraps(method)
+        def instrumented(*args, **kwargs):
+            items = 1
+            for argument in args[1:]:
+                if isinstance(argument, (list, tuple, dict)):
+                    items = len(argument)
+                    break
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.record(time.perf_counter() - started, items, sample_size)
+        return instrumented
@@ -0,0 +1,125 @@
+"""Module for marking and grading large cohorts across processes."""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+import os
+
+from solution import _answer_items, _hold_quiz_locks, _mark_submissions
+from wrapping import wrappable
+
+
+@wrappable
+def mark_quizzes_parallel(
+    teacher,
+    quizzes,
+    marking_guide,
+    workers=None,
+    shard_size=None
+):
+    """
+    Mark and grade a batch of submitted quizzes across processes.
+
+    params:
+        - teacher
+        - quizzes
+        - marking_guide
+        - workers
+        - shard_size
+
+    This function gives the same results as Teacher.mark_quizzes. Quizzes
+    are grouped by their questions and the answer codes and answer results
+    of each group are packed into one buffer each while the quiz locks are
+    held. The buffers are cut into shards of shard_size quizzes, and each
+    shard is marked and graded by a worker process which returns its answer
+    results and grades as bytes. The results of a group are joined and
+    written back in bulk as Teacher.mark_quizzes writes them, so the work
+    left in this process is copying buffers and setting quiz attributes.
+    That work cannot leave the process holding the quizzes, so the speed-up
+    is bounded by the share of the time spent marking, which grows with the
+    number of questions.
+
+    The quiz locks are not held while the workers mark, so the buffers of a
+    group are packed again before its results are written. If a quiz was
+    answered or marked meanwhile, the group is marked again here from the
+    current buffers under the locks, so no change is overwritten.
+    """
+    quizzes = list(quizzes)
+    for quiz in quizzes:
+        teacher._verify_quiz(quiz)
+        teacher._verify_quiz_submission(quiz)
+
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(1, -(-len(quizzes) // (workers * 4)))
+
+    guide = dict(_answer_items(marking_guide))
+    groups = {}
+    for quiz in quizzes:
+        groups.setdefault(id(quiz.questions), []).append(quiz)
+
+    get_submission = attrgetter("submission")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        marked_groups = []
+        for group in groups.values():
+            questions = group[0].questions
+            key = teacher._encode_marking_guide(questions, guide).tobytes()
+            unmarked = teacher._find_unmarked_questions(questions, guide)
+            submissions = list(map(get_submission, group))
+            with _hold_quiz_locks():
+                answers, answer_results = _pack_submissions(submissions)
+            shard_length = shard_size * len(questions)
+            marked_groups.append((
+                group,
+                key,
+                unmarked,
+                answers,
+                answer_results,
+                [
+                    executor.submit(
+                        _mark_submissions,
+                        key,
+                        unmarked,
+                        answers[start:start + shard_length],
+                        answer_results[start:start + shard_length]
+                    )
+                    for start in range(0, len(answers), shard_length)
+                ]
+            ))
+
+        for (group, key, unmarked, answers, answer_results,
+             shards) in marked_groups:
+            shards = [shard.result() for shard in shards]
+            with _hold_quiz_locks():
+                packed = _pack_submissions(list(map(get_submission, group)))
+                if packed == (answers, answer_results):
+                    marked_results = b"".join(
+                        shard_results for shard_results, _ in shards
+                    )
+                    grades = b"".join(grades for _, grades in shards)
+                else:
+                    marked_results, grades = _mark_submissions(
+                        key,
+                        unmarked,
+                        *packed
+                    )
+                teacher._write_marking(group, marked_results, grades)
+    return quizzes
+
+
+def _pack_submissions(submissions):
+    """
+    Return the answer codes and answer results of submissions as bytes.
+
+    params:
+        - submissions
+
+    The codes of the submissions are laid end to end. The quiz locks must be
+    held.
+    """
+    return (
+        b"".join(map(array.tobytes, map(attrgetter("answers"), submissions))),
+        b"".join(map(
+            array.tobytes,
+            map(attrgetter("answer_results"), submissions)
+        ))
+    )
@@ -0,0 +1,409 @@
+"""Module for persisting a term of courses, quizzes and grades to SQLite."""
+from array import array
+from contextlib import contextmanager
+import json
+import queue
+import sqlite3
+
+from solution import (
+    COURSE_GRADING_STANDARD,
+    Course,
+    GradingStandard,
+    Question,
+    Quiz,
+    Student,
+    Teacher
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teachers (
+    teacher_number TEXT PRIMARY KEY,
+    first_name TEXT,
+    last_name TEXT
+);
+CREATE TABLE IF NOT EXISTS students (
+    student_number TEXT PRIMARY KEY,
+    first_name TEXT,
+    last_name TEXT
+);
+CREATE TABLE IF NOT EXISTS courses (
+    course_code TEXT,
+    semester,
+    course_name TEXT,
+    teacher_number TEXT,
+    grading_standard TEXT,
+    PRIMARY KEY (course_code, semester)
+);
+CREATE TABLE IF NOT EXISTS enrollments (
+    course_code TEXT,
+    semester,
+    student_number TEXT,
+    PRIMARY KEY (course_code, semester, student_number)
+);
+CREATE INDEX IF NOT EXISTS enrollments_by_student
+    ON enrollments (student_number);
+CREATE TABLE IF NOT EXISTS questions (
+    question_set INTEGER,
+    position INTEGER,
+    number,
+    choices TEXT,
+    PRIMARY KEY (question_set, position)
+);
+CREATE TABLE IF NOT EXISTS quizzes (
+    quiz_id INTEGER PRIMARY KEY,
+    course_code TEXT,
+    semester,
+    quiz_name TEXT,
+    quiz_code TEXT,
+    question_set INTEGER,
+    student_number TEXT,
+    submitted INTEGER,
+    marked INTEGER,
+    grade INTEGER,
+    teacher_graded INTEGER,
+    answers BLOB,
+    answer_results BLOB
+);
+CREATE INDEX IF NOT EXISTS quizzes_by_course
+    ON quizzes (course_code, semester);
+CREATE INDEX IF NOT EXISTS quizzes_by_student
+    ON quizzes (student_number);
+CREATE TABLE IF NOT EXISTS course_grades (
+    student_number TEXT,
+    course_code TEXT,
+    semester,
+    grade TEXT,
+    PRIMARY KEY (student_number, course_code, semester)
+);
+"""
+
+TABLES = (
+    "teachers",
+    "students",
+    "courses",
+    "enrollments",
+    "questions",
+    "quizzes",
+    "course_grades"
+)
+
+# Statements are kept as constants so sqlite reuses their prepared form
+FIND_STUDENT = (
+    "SELECT student_number, first_name, last_name FROM students "
+    "WHERE student_number = ?"
+)
+FIND_COURSE = (
+    "SELECT course_code, semester, course_name, teacher_number "
+    "FROM courses WHERE course_code = ? AND semester = ?"
+)
+FIND_STUDENT_GRADES = (
+    "SELECT course_code, semester, grade FROM course_grades "
+    "WHERE student_number = ?"
+)
+FIND_COURSE_GRADES = (
+    "SELECT student_number, grade FROM course_grades "
+    "WHERE course_code = ? AND semester = ?"
+)
+
+
+class SQLiteRepository(object):
+    def __init__(self, path, pool_size=4):
+        """
+        Initialize a SQLite repository object.
+
+        The database at path is opened in WAL mode with a pool of pool_size
+        connections that may be shared between threads, one thread at a
+        time per connection.
+        """
+        self.path = path
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            connection = sqlite3.connect(path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._pool.put(connection)
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection from the pool for one transaction."""
+        connection = self._pool.get()
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._pool.put(connection)
+
+    def close(self):
+        """Close every connection in the pool."""
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    def save_term(self, teachers, students, courses):
+        """
+        Save a term, replacing any term already stored.
+
+        params:
+            - teachers
+            - students
+            - courses
+
+        Courses are saved with their enrollments, quizzes, questions,
+        answers and the course grades in their course teacher's gradebook.
+        Every table is written with one executemany in a single transaction.
+        """
+        courses = list(courses)
+        question_sets = {}
+        with self.connection() as connection:
+            for table in TABLES:
+                connection.execute("DELETE FROM {}".format(table))
+            connection.executemany(
+                "INSERT INTO teachers VALUES (?, ?, ?)",
+                (
+                    (t.teacher_number, t.first_name, t.last_name)
+                    for t in teachers
+                )
+            )
+            connection.executemany(
+                "INSERT INTO students VALUES (?, ?, ?)",
+                (
+                    (s.student_number, s.first_name, s.last_name)
+                    for s in students
+                )
+            )
+            connection.executemany(
+                "INSERT INTO courses VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        course.course_code,
+                        course.semester,
+                        course.course_name,
+                        course.course_teacher.teacher_number,
+                        self._dump_grading_standard(course.grading_standard)
+                    )
+                    for course in courses
+                )
+            )
+            connection.executemany(
+                "INSERT INTO enrollments VALUES (?, ?, ?)",
+                (
+                    (course.course_code, course.semester, student_number)
+                    for course in courses
+                    for student_number in course.roster
+                )
+            )
+            connection.executemany(
+                "INSERT INTO quizzes VALUES "
+                "(NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        course.course_code,
+                        course.semester,
+                        quiz.quiz_name,
+                        quiz.quiz_code,
+                        question_sets.setdefault(
+                            id(quiz.questions),
+                            (len(question_sets), quiz.questions)
+                        )[0],
+                        quiz.student.student_number if quiz.student else None,
+                        quiz.submitted,
+                        quiz.marked,
+                        quiz.grade,
+                        quiz.teacher_graded,
+                        quiz.submission.answers.tobytes(),
+                        quiz.submission.answer_results.tobytes()
+                    )
+                    for course in courses
+                    for quiz in course.quizzes
+                )
+            )
+            connection.executemany(
+                "INSERT INTO questions VALUES (?, ?, ?, ?)",
+                (
+                    (question_set, position, question.number,
+                     json.dumps(question.choices))
+                    for question_set, questions in question_sets.values()
+                    for position, question in enumerate(questions)
+                )
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO course_grades VALUES (?, ?, ?, ?)",
+                (
+                    (student_number, course.course_code, course.semester,
+                     grade)
+                    for course in courses
+                    for student_number, grade in (
+                        course.course_teacher.gradebook.course_grades(
+                            course
+                        ).items()
+                    )
+                )
+            )
+
+    def load_term(self, gradebook=None):
+        """
+        Load the stored term.
+
+        params:
+            - gradebook
+
+        Returns dictionaries of teachers by teacher number, students by
+        student number and courses by course key, with enrollments, quizzes,
+        answers, grade totals and course grades restored. Course grades are
+        recorded in the course teacher's gradebook as when they were saved.
+        The loaded teachers share gradebook if one is given.
+        """
+        with self.connection() as connection:
+            teachers = {
+                row[0]: Teacher(row[1], row[2], row[0], gradebook)
+                for row in connection.execute("SELECT * FROM teachers")
+            }
+            students = {
+                row[0]: Student(row[1], row[2], row[0])
+                for row in connection.execute("SELECT * FROM students")
+            }
+            courses = {}
+            for code, semester, name, teacher_number, standard in (
+                connection.execute("SELECT * FROM courses")
+            ):
+                course = Course(
+                    name,
+                    code,
+                    semester,
+                    teachers[teacher_number],
+                    self._load_grading_standard(standard)
+                )
+                courses[course.course_key] = course
+
+            for code, semester, student_number in connection.execute(
+                "SELECT * FROM enrollments"
+            ):
+                course = courses[(code, semester)]
+                student = students[student_number]
+                student.enrolled_courses[course.course_key] = course
+                course.roster[student_number] = student
+
+            question_sets = {}
+            for question_set, _, number, choices in connection.execute(
+                "SELECT * FROM questions ORDER BY question_set, position"
+            ):
+                question_sets.setdefault(question_set, []).append(
+                    Question(number, choices=json.loads(choices))
+                )
+
+            templates = {}
+            for row in connection.execute(
+                "SELECT * FROM quizzes ORDER BY quiz_id"
+            ):
+                self._load_quiz(row, courses, students, question_sets,
+                                templates)
+
+            for student_number, code, semester, grade in connection.execute(
+                "SELECT * FROM course_grades"
+            ):
+                course = courses[(code, semester)]
+                course.course_teacher._record_course_grade(
+                    students[student_number],
+                    course,
+                    grade
+                )
+        return teachers, students, courses
+
+    def find_student(self, student_number):
+        """Return the stored (student_number, first_name, last_name)."""
+        with self.connection() as connection:
+            return connection.execute(
+                FIND_STUDENT,
+                (student_number,)
+            ).fetchone()
+
+    def find_course(self, course_code, semester):
+        """Return the stored course row for a course code and semester."""
+        with self.connection() as connection:
+            return connection.execute(
+                FIND_COURSE,
+                (course_code, semester)
+            ).fetchone()
+
+    def find_student_grades(self, student_number):
+        """Return a student's grades keyed by course key."""
+        with self.connection() as connection:
+            return {
+                (code, semester): grade
+                for code, semester, grade in connection.execute(
+                    FIND_STUDENT_GRADES,
+                    (student_number,)
+                )
+            }
+
+    def find_course_grades(self, course_code, semester):
+        """Return a course's grades keyed by student number."""
+        with self.connection() as connection:
+            return dict(connection.execute(
+                FIND_COURSE_GRADES,
+                (course_code, semester)
+            ))
+
+    def _load_quiz(self, row, courses, students, question_sets, templates):
+        """
+        Rebuild a quiz from a stored row.
+
+        params:
+            - row
+            - courses
+            - students
+            - question_sets
+            - templates
+
+        Quizzes with the same course, name, code and questions are copied
+        from one template quiz, so questions are only validated once. Graded
+        quizzes are recorded through their course teacher so the course
+        grade index and totals are rebuilt.
+        """
+        (_, code, semester, quiz_name, quiz_code, question_set,
+         student_number, submitted, marked, grade, teacher_graded,
+         answers, answer_results) = row
+        course = courses[(code, semester)]
+        template_key = (code, semester, quiz_name, quiz_code, question_set)
+        template = templates.get(template_key)
+        if template is None:
+            template = templates[template_key] = Quiz(
+                quiz_name,
+                quiz_code,
+                course,
+                question_sets[question_set]
+            )
+
+        quiz = template.assignment_for(
+            students[student_number] if student_number else None
+        )
+        quiz.submitted = bool(submitted)
+        quiz.marked = bool(marked)
+        quiz.submission.answers = array("b", answers)
+        quiz.submission.answer_results = array("b", answer_results)
+        if teacher_graded:
+            course.course_teacher._record_quiz_grade(quiz, grade)
+        else:
+            quiz.grade = grade
+        course.quizzes.append(quiz)
+
+    def _dump_grading_standard(self, grading_standard):
+        """Return a grading standard as JSON, or None for the default."""
+        if grading_standard is COURSE_GRADING_STANDARD:
+            return None
+        return json.dumps({
+            "bands": grading_standard.bands,
+            "maximum": grading_standard.maximum
+        })
+
+    def _load_grading_standard(self, grading_standard):
+        """Return the grading standard stored as JSON."""
+        if grading_standard is None:
+            return COURSE_GRADING_STANDARD
+        grading_standard = json.loads(grading_standard)
+        return GradingStandard(
+            grading_standard["bands"],
+            grading_standard["maximum"]
+        )
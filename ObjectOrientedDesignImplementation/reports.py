@@ -0,0 +1,152 @@
+"""
+Module for summarising the grades of one or many courses.
+
+Quiz grades are whole numbers between 0 and 100, so they are pulled into an
+array and counted into a histogram once. Every summary is then computed from
+the histogram, in time that does not depend on the number of students.
+"""
+from bisect import bisect_right
+from collections import Counter
+from math import sqrt
+
+from exceptions import InvalidCourseException
+from solution import Course
+
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class GradeHistogram(object):
+    __slots__ = ("grades", "cumulative_counts", "count")
+
+    def __init__(self, counts):
+        """
+        Initialize a grade histogram object.
+
+        counts maps each grade to the number of times it was given. Grades
+        are kept in order with the running count of grades up to each one,
+        so the grade at any rank is found by bisecting the running counts.
+        """
+        self.grades = sorted(grade for grade in counts if counts[grade])
+        self.cumulative_counts = []
+        self.count = 0
+        for grade in self.grades:
+            self.count += counts[grade]
+            self.cumulative_counts.append(self.count)
+
+    def counts(self):
+        """Return the number of times each grade was given."""
+        return {
+            grade: cumulative - previous
+            for grade, cumulative, previous in zip(
+                self.grades,
+                self.cumulative_counts,
+                [0] + self.cumulative_counts
+            )
+        }
+
+    def mean(self):
+        """Return the mean grade, or None without grades."""
+        if not self.count:
+            return None
+        return sum(
+            grade * count for grade, count in self.counts().items()
+        ) / self.count
+
+    def stdev(self):
+        """Return the population standard deviation, or None without grades."""
+        if not self.count:
+            return None
+        mean = self.mean()
+        return sqrt(sum(
+            count * (grade - mean) ** 2
+            for grade, count in self.counts().items()
+        ) / self.count)
+
+    def percentile(self, percent):
+        """
+        Return the grade at a percentile, or None without grades.
+
+        params:
+            - percent
+
+        Percentiles interpolate linearly between the two closest ranks, so
+        the 50th percentile is the median.
+        """
+        if not self.count:
+            return None
+        position = (self.count - 1) * percent / 100
+        rank = int(position)
+        lower = self._grade_at(rank)
+        upper = self._grade_at(min(rank + 1, self.count - 1))
+        return lower + (upper - lower) * (position - rank)
+
+    def _grade_at(self, rank):
+        """Return the grade at a rank counted from 0 for the lowest grade."""
+        return self.grades[bisect_right(self.cumulative_counts, rank)]
+
+
+def grade_statistics(courses, percentiles=DEFAULT_PERCENTILES):
+    """
+    Return a summary of the grades of many courses.
+
+    params:
+        - courses
+        - percentiles
+
+    The quiz grades of all courses are counted into one histogram, giving
+    their count, mean, median, population standard deviation and the
+    requested percentiles. Each student's average grade in each course is
+    matched to the grading standard of that course and the students in
+    each grade band are counted. Bands are listed best grade first, empty
+    bands included, and averages outside every band are counted under
+    None.
+    """
+    courses = list(courses)
+    quiz_grade_counts = Counter()
+    band_counts = {}
+    for course in courses:
+        if not isinstance(course, Course):
+            raise InvalidCourseException("Please provide valid Course")
+        quiz_grade_counts.update(course.quiz_grades())
+        with course.lock:
+            averages = [
+                total_grade/graded_quizzes
+                for total_grade, graded_quizzes in course.grade_totals.values()
+            ]
+        grading_standard = course.grading_standard
+        for grade in grading_standard.bands:
+            band_counts.setdefault(grade, 0)
+        for grade, count in Counter(
+            grading_standard.grades(averages)
+        ).items():
+            band_counts[grade] = band_counts.get(grade, 0) + count
+
+    histogram = GradeHistogram(quiz_grade_counts)
+    return {
+        "courses": [course.course_key for course in courses],
+        "students": sum(band_counts.values()),
+        "quizzes": histogram.count,
+        "mean": histogram.mean(),
+        "median": histogram.percentile(50),
+        "stdev": histogram.stdev(),
+        "percentiles": {
+            percent: histogram.percentile(percent)
+            for percent in percentiles
+        },
+        "bands": band_counts
+    }
+
+
+def course_statistics(course, percentiles=DEFAULT_PERCENTILES):
+    """
+    Return a summary of the grades of a course.
+
+    params:
+        - course
+        - percentiles
+
+    This function summarises the course the same way grade_statistics
+    summarises many courses.
+    """
+    return grade_statistics([course], percentiles)
@@ -0,0 +1,352 @@
+"""
+Module for partitioning courses, quizzes and grades into shards.
+
+Each shard holds one course, keyed by (semester, course_code), with its
+teacher, students, quizzes and grades, and is stored in its own SQLite
+database. A ShardRouter keeps a bounded number of shards in memory and
+sends operations to the shard that owns the course, so a term can grow past
+what one process holds, and shards can be processed by worker processes.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+
+from exceptions import (
+    InvalidCourseException,
+    InvalidQuizException,
+    UnassignedQuizException
+)
+from persistence import SQLiteRepository
+from solution import Course
+
+
+MANIFEST = "shards.json"
+
+
+class GradebookShard(object):
+    __slots__ = ("path", "course", "_repository", "_quizzes")
+
+    def __init__(self, path, course, repository=None):
+        """
+        Initialize a gradebook shard object.
+
+        The shard owns course and is stored in the SQLite database at path.
+        Students and teachers of the course are copies local to the shard:
+        a student enrolled into many courses is held by each of their shards.
+        """
+        if not isinstance(course, Course):
+            raise InvalidCourseException("Please provide valid Course")
+        self.path = path
+        self.course = course
+        self._repository = repository or SQLiteRepository(path, pool_size=1)
+        self._quizzes = {
+            (quiz.student.student_number, quiz.quiz_code): quiz
+            for quiz in course.quizzes
+            if quiz.student
+        }
+
+    @classmethod
+    def load(cls, path):
+        """Return the shard stored in the SQLite database at path."""
+        repository = SQLiteRepository(path, pool_size=1)
+        _, _, courses = repository.load_term()
+        course, = courses.values()
+        return cls(path, course, repository)
+
+    @property
+    def shard_key(self):
+        """Return the (semester, course_code) the shard is keyed by."""
+        return self.course.semester, self.course.course_code
+
+    @property
+    def teacher(self):
+        """Return the teacher of the shard course."""
+        return self.course.course_teacher
+
+    def save(self):
+        """Store the shard, replacing what was stored before."""
+        students = dict(self.course.roster)
+        for (student_number, _), quiz in self._quizzes.items():
+            students.setdefault(student_number, quiz.student)
+        self._repository.save_term(
+            [self.teacher],
+            list(students.values()),
+            [self.course]
+        )
+
+    def close(self):
+        """Close the shard database."""
+        self._repository.close()
+
+    def create_quiz(self, quiz_name, quiz_code, questions):
+        """Create a quiz of the shard course."""
+        return self.teacher.create_quiz(
+            quiz_name,
+            quiz_code,
+            self.course,
+            questions
+        )
+
+    def enroll(self, students):
+        """Enrol students into the shard course."""
+        return self.teacher.enroll_many(students, self.course)
+
+    def assign_quiz(self, quiz_code):
+        """
+        Assign a quiz to every enrolled student without it.
+
+        params:
+            - quiz_code
+
+        The quiz created with quiz_code is copied for each student, as
+        Teacher.assign_quiz_to_cohort does. Returns the new copies.
+        """
+        template = None
+        for quiz in self.course.quizzes:
+            if quiz.quiz_code == quiz_code and not quiz.student:
+                template = quiz
+                break
+        if template is None:
+            raise InvalidQuizException("Please provide valid Quiz")
+
+        students = [
+            student
+            for student_number, student in self.course.roster.items()
+            if (student_number, quiz_code) not in self._quizzes
+        ]
+        quizzes = self.teacher.assign_quiz_to_cohort(template, students)
+        for quiz in quizzes:
+            self._quizzes[quiz.student.student_number, quiz_code] = quiz
+        return quizzes
+
+    def find_quiz(self, student_number, quiz_code):
+        """Return the quiz with quiz_code assigned to a student."""
+        quiz = self._quizzes.get((student_number, quiz_code))
+        if quiz is None:
+            raise UnassignedQuizException(
+                "Please ensure this quiz is assigned to the student first."
+            )
+        return quiz
+
+    def answer_quiz(self, student_number, quiz_code, answers):
+        """Answer a student's quiz as Student.answer_quiz does."""
+        quiz = self.find_quiz(student_number, quiz_code)
+        quiz.student.answer_quiz(quiz, answers)
+
+    def submit_quiz(self, student_number, quiz_code):
+        """Submit a student's quiz as Student.submit_quiz does."""
+        quiz = self.find_quiz(student_number, quiz_code)
+        quiz.student.submit_quiz(quiz)
+
+    def mark_quizzes(self, quiz_code, marking_guide):
+        """
+        Mark and grade the submitted quizzes with quiz_code.
+
+        params:
+            - quiz_code
+            - marking_guide
+
+        Returns the marked quizzes as Teacher.mark_quizzes does.
+        """
+        return self.teacher.mark_quizzes(
+            [
+                quiz
+                for (_, code), quiz in self._quizzes.items()
+                if code == quiz_code and quiz.submitted
+            ],
+            marking_guide
+        )
+
+    def calculate_total_grades(self):
+        """Return the total grade of every graded student by number."""
+        return {
+            student.student_number: grade
+            for student, grade in self.teacher.calculate_total_grades(
+                self.course
+            ).items()
+        }
+
+    def student_grades(self, student_number):
+        """Return a student's recorded grades keyed by course key."""
+        student = self.course.roster.get(student_number)
+        grade = student and self.teacher.gradebook.get(student, self.course)
+        if grade is None:
+            return {}
+        return {self.course.course_key: grade}
+
+
+def _process_shard(path, function, args):
+    """
+    Load a shard, apply function to it and store it again.
+
+    params:
+        - path
+        - function
+        - args
+
+    Runs in a worker process. Returns what function returned.
+    """
+    shard = GradebookShard.load(path)
+    try:
+        result = function(shard, *args)
+        shard.save()
+    finally:
+        shard.close()
+    return result
+
+
+class ShardRouter(object):
+    def __init__(self, directory, max_loaded_shards=8):
+        """
+        Initialize a shard router object.
+
+        Shards are stored in directory, listed in a JSON manifest mapping
+        each (semester, course_code) to its database file. At most
+        max_loaded_shards are held in memory: loading another one stores
+        and unloads the least recently used.
+        """
+        self.directory = directory
+        self.max_loaded_shards = max_loaded_shards
+        self._paths = {}
+        self._loaded = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+        manifest = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest) as shards:
+                for semester, course_code, filename in json.load(shards):
+                    self._paths[semester, course_code] = os.path.join(
+                        directory,
+                        filename
+                    )
+
+    @property
+    def shard_keys(self):
+        """Return the (semester, course_code) of every shard."""
+        return sorted(self._paths, key=repr)
+
+    def add_course(self, course):
+        """
+        Create the shard of a course and return it.
+
+        params:
+            - course
+
+        The course, with everything already recorded on it, moves into the
+        new shard, which is stored straight away.
+        """
+        if not isinstance(course, Course):
+            raise InvalidCourseException("Please provide valid Course")
+        shard_key = (course.semester, course.course_code)
+        if shard_key in self._paths:
+            raise InvalidCourseException("This course already has a shard.")
+
+        path = os.path.join(
+            self.directory,
+            "{}-{}.db".format(course.semester, course.course_code)
+        )
+        shard = GradebookShard(path, course)
+        shard.save()
+        self._paths[shard_key] = path
+        self._write_manifest()
+        self._hold(shard)
+        return shard
+
+    def shard(self, course_code, semester):
+        """Return the shard of a course, loading it if needed."""
+        shard_key = (semester, course_code)
+        shard = self._loaded.get(shard_key)
+        if shard is None:
+            path = self._paths.get(shard_key)
+            if path is None:
+                raise InvalidCourseException("No shard holds this course.")
+            shard = GradebookShard.load(path)
+            self._hold(shard)
+        else:
+            self._loaded.move_to_end(shard_key)
+        return shard
+
+    def student_grades(self, student_number):
+        """
+        Return a student's grades across all shards keyed by course key.
+
+        params:
+            - student_number
+
+        Loaded shards are read in memory and the others straight from their
+        databases, without loading them.
+        """
+        grades = {}
+        for shard_key, path in self._paths.items():
+            shard = self._loaded.get(shard_key)
+            if shard is not None:
+                grades.update(shard.student_grades(student_number))
+                continue
+            repository = SQLiteRepository(path, pool_size=1)
+            try:
+                grades.update(repository.find_student_grades(student_number))
+            finally:
+                repository.close()
+        return grades
+
+    def process_shards(self, function, *args, workers=None):
+        """
+        Apply function to every shard in worker processes.
+
+        params:
+            - function
+            - args
+            - workers
+
+        Loaded shards are stored and unloaded first, then each worker loads
+        a shard, calls function with it and args, and stores it again.
+        function must be importable by the workers. Returns what function
+        returned for each shard keyed by (semester, course_code).
+        """
+        self.close()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                shard_key: executor.submit(
+                    _process_shard,
+                    path,
+                    function,
+                    args
+                )
+                for shard_key, path in self._paths.items()
+            }
+            return {
+                shard_key: future.result()
+                for shard_key, future in futures.items()
+            }
+
+    def flush(self):
+        """Store every loaded shard."""
+        for shard in self._loaded.values():
+            shard.save()
+
+    def close(self):
+        """Store and unload every loaded shard."""
+        while self._loaded:
+            _, shard = self._loaded.popitem(last=False)
+            shard.save()
+            shard.close()
+
+    def _hold(self, shard):
+        """Keep a shard loaded, unloading the least recently used ones."""
+        self._loaded[shard.shard_key] = shard
+        self._loaded.move_to_end(shard.shard_key)
+        while len(self._loaded) > self.max_loaded_shards:
+            _, evicted = self._loaded.popitem(last=False)
+            evicted.save()
+            evicted.close()
+
+    def _write_manifest(self):
+        """Write the manifest listing every shard and its database file."""
+        with open(os.path.join(self.directory, MANIFEST), "w") as shards:
+            json.dump(
+                [
+                    [semester, course_code, os.path.basename(path)]
+                    for (semester, course_code), path in self._paths.items()
+                ],
+                shards
+            )
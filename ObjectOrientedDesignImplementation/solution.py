@@ -1,14 +1,24 @@
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+from itertools import repeat
+from operator import attrgetter, le
+from threading import Lock
+from weakref import WeakValueDictionary
+
 from exceptions import (
     AlreadyEnrolledException,
     InvalidChoiceException,
     InvalidCourseException,
     InvalidCourseTeacherException,
+    InvalidGradingStandardException,
     InvalidNumberOfQuestionsException,
     InvalidQuestionException,
     InvalidQuizException,
     InvalidVerificationException,
     InvalidStudentException,
     MultipleChoicesException,
+    TooManyChoicesException,
     UnassignedQuizException,
     UnEnrolledCourseException,
     UnmarkedQuizException,
@@ -16,25 +26,278 @@ from exceptions import (
     )
 
 
+# Answer code stored for a question that has not been answered
+UNANSWERED = -1
+
+# Code for a correct answer that is missing from a marking guide or is not
+# one of the question's choices; it never equals a stored answer code
+_NOT_A_CHOICE = -2
+
+# Translation table mapping a zero byte to 1 and every other byte to 0
+_ZERO_TO_ONE = bytes([1]) + bytes(255)
+
+# Translation table adding 1 to an answer code byte, so UNANSWERED becomes 0
+# and valid codes become 1 up to the number of choices
+_SHIFT_CODE = bytes(range(1, 256)) + bytes(1)
+
+# Answer codes are stored as signed bytes
+MAXIMUM_CHOICES = 127
+
+# Interned answer codes keyed by choice tuple, shared by all questions with
+# the same choices. Entries are dropped once no question uses them.
+_CHOICES = WeakValueDictionary()
+
+# Interned question number indexes keyed by question tuple, shared by all
+# quizzes with the same questions. Entries are dropped once no quiz uses
+# them, so questions are freed with the quizzes of an unloaded term.
+_QUESTION_SETS = WeakValueDictionary()
+
+# Locks guarding the answers, results and state of quizzes. Each quiz uses
+# the lock picked by its hash, so a quiz needs no lock of its own and
+# quizzes of different students rarely wait on each other.
+# NOTE: A quiz lock may be held while taking a course lock and a course lock
+# while taking a gradebook lock, never the other way round.
+_QUIZ_LOCKS = tuple(Lock() for _ in range(64))
+
+
+class _ChoiceCodes(dict):
+    """Answer codes of interned choices, keyed by choice."""
+    __slots__ = ("choices", "__weakref__")
+
+
+class _QuestionIndex(dict):
+    """Positions of interned questions, keyed by question number."""
+    __slots__ = ("questions", "__weakref__")
+
+
+class GradingStandard(object):
+    __slots__ = ("maximum", "_grades", "_lower_bounds", "_table")
+
+    def __init__(self, bands, maximum=100):
+        """
+        Initialize a grading standard object.
+
+        params:
+            - bands
+            - maximum
+
+        bands maps each grade to the lowest average that earns it, and an
+        average earns the grade with the highest lower bound not above it.
+        Grades for whole number averages are precomputed into a lookup table
+        while other averages are matched by bisecting the lower bounds.
+        """
+        if not bands:
+            raise InvalidGradingStandardException(
+                "Please provide at least one grade band."
+            )
+        ordered_bands = sorted(bands.items(), key=lambda band: band[1])
+        if ordered_bands[0][1] < 0 or ordered_bands[-1][1] > maximum:
+            raise InvalidGradingStandardException(
+                "Please provide bands between 0 and the maximum average."
+            )
+        self.maximum = maximum
+        self._grades = tuple(grade for grade, _ in ordered_bands)
+        self._lower_bounds = tuple(bound for _, bound in ordered_bands)
+        self._table = tuple(
+            self._find_grade(average) for average in range(int(maximum) + 1)
+        )
+
+    @property
+    def bands(self):
+        """Return the lowest average for each grade, best grade first."""
+        return dict(zip(reversed(self._grades), reversed(self._lower_bounds)))
+
+    def grade(self, average):
+        """Return the grade for an average, or None if it is out of range."""
+        if type(average) is int and 0 <= average < len(self._table):
+            return self._table[average]
+        return self._find_grade(average)
+
+    def grades(self, averages):
+        """Return the grades for a sequence of averages."""
+        return list(map(self.grade, averages))
+
+    def _find_grade(self, average):
+        """Return the grade for an average by bisecting the lower bounds."""
+        if average < self._lower_bounds[0] or average > self.maximum:
+            return None
+        return self._grades[bisect_right(self._lower_bounds, average) - 1]
+
+    def __reduce__(self):
+        """Pickle the course grading standard by name, others by bands."""
+        if self is COURSE_GRADING_STANDARD:
+            return "COURSE_GRADING_STANDARD"
+        return (GradingStandard, (self.bands, self.maximum))
+
+
 # Course Grading
-COURSE_GRADING_STANDARD = {
-    "A": [x for x in range(80, 101)],
-    "B": [x for x in range(70, 80)],
-    "C": [x for x in range(60, 70)],
-    "D": [x for x in range(50, 60)],
-    "E": [x for x in range(40, 50)],
-    "F": [x for x in range(0, 40)]
-}
+COURSE_GRADING_STANDARD = GradingStandard({
+    "A": 80,
+    "B": 70,
+    "C": 60,
+    "D": 50,
+    "E": 40,
+    "F": 0
+})
+
+
+def _answer_items(answers):
+    """
+    Return (question number, choice) pairs from answers.
+
+    params:
+        - answers
+
+    Answers may be given either as a mapping of question number to choice
+    or as a list of dictionaries each holding one question number as the key
+    and the choice as the value.
+    """
+    if isinstance(answers, dict):
+        return answers.items()
+    return (item for answer in answers for item in answer.items())
+
+
+def _mark_answer_codes(answers, key, answer_results, unmarked):
+    """
+    Return answer results marked against the encoded correct answers.
+
+    params:
+        - answers
+        - key
+        - answer_results
+        - unmarked
+
+    All four are bytes holding one code per question. The answer and key
+    codes are compared as whole integers: their exclusive or has a zero byte
+    wherever the codes match, which becomes 1 in the returned results.
+    Questions flagged 1 in unmarked are not in the marking guide and keep
+    their previous answer result.
+    """
+    size = len(answers)
+    matches = (
+        int.from_bytes(answers, "little") ^ int.from_bytes(key, "little")
+    ).to_bytes(size, "little").translate(_ZERO_TO_ONE)
+    return (
+        int.from_bytes(matches, "little") | (
+            int.from_bytes(answer_results, "little") &
+            int.from_bytes(unmarked, "little")
+        )
+    ).to_bytes(size, "little")
+
+
+def _mark_submissions(key, unmarked, answers, answer_results):
+    """
+    Mark and grade many submissions of the same questions at once.
+
+    params:
+        - key
+        - unmarked
+        - answers
+        - answer_results
+
+    answers and answer_results hold the codes of the submissions laid end
+    to end, key holds the code of the correct answer for each question and
+    unmarked flags the questions left out of the marking guide. The whole
+    matrix is marked in one operation and every row is counted without a
+    Python loop. Returns the new answer results and the grade of each
+    submission as bytes, the grades computed as Teacher.grade_quiz does.
+    """
+    number_of_questions = len(key)
+    size = len(answers)
+    repeats = size // number_of_questions
+    answer_results = _mark_answer_codes(
+        answers,
+        key * repeats,
+        answer_results,
+        unmarked * repeats
+    )
+    grades = bytes(
+        int(correct_answers/number_of_questions*100)
+        for correct_answers in range(number_of_questions + 1)
+    )
+    return answer_results, bytes(map(
+        grades.__getitem__,
+        map(
+            answer_results.count,
+            repeat(1),
+            range(0, size, number_of_questions),
+            range(number_of_questions, size + number_of_questions,
+                  number_of_questions)
+        )
+    ))
+
+
+def _quiz_lock(quiz):
+    """Return the lock guarding a quiz."""
+    return _QUIZ_LOCKS[hash(quiz) % len(_QUIZ_LOCKS)]
+
+
+@contextmanager
+def _hold_quiz_locks():
+    """
+    Hold every quiz lock while updating many quizzes at once.
+
+    The locks are taken in the same order every time and each one is only
+    ever held alone by other operations, so holding them all cannot
+    deadlock.
+    """
+    for lock in _QUIZ_LOCKS:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in _QUIZ_LOCKS:
+            lock.release()
+
+
+def _raise_error(error):
+    """Raise an error given as an exception class and message, if any."""
+    if error is not None:
+        exception_class, message = error
+        raise exception_class(message)
 
 
 class Course(object):
-    def __init__(self, course_name, course_code, semester, course_teacher):
+    __slots__ = (
+        "course_name",
+        "course_code",
+        "semester",
+        "course_key",
+        "roster",
+        "quizzes",
+        "course_teacher",
+        "grading_standard",
+        "graded_quizzes",
+        "grade_totals",
+        "lock"
+    )
+
+    def __init__(
+        self,
+        course_name,
+        course_code,
+        semester,
+        course_teacher,
+        grading_standard=COURSE_GRADING_STANDARD
+    ):
         """Initialize course object."""
         self.course_name = course_name
         self.course_code = course_code
         self.semester = semester
+        self.course_key = (course_code, semester)
+
+        # enrolled students keyed by student number
+        self.roster = {}
         self.quizzes = []
-        self.course_grade = None
+
+        # graded quizzes of the course for each student
+        self.graded_quizzes = {}
+
+        # running [sum, count] of quiz grades for each student
+        self.grade_totals = {}
+
+        # guards the roster, graded quizzes and grade totals
+        self.lock = Lock()
 
         if not isinstance(course_teacher, Teacher):
             raise InvalidCourseTeacherException(
@@ -42,24 +305,110 @@ class Course(object):
             )
         self.course_teacher = course_teacher
 
+        if not isinstance(grading_standard, GradingStandard):
+            raise InvalidGradingStandardException(
+                "Please provide a valid GradingStandard."
+            )
+        self.grading_standard = grading_standard
+
+    def quiz_grades(self):
+        """Return the grades of every graded quiz of the course."""
+        with self.lock:
+            return array("b", [
+                quiz.grade
+                for quizzes in self.graded_quizzes.values()
+                for quiz in quizzes
+            ])
+
+    def average_grade(self, student):
+        """Return the student's average quiz grade, or None if ungraded."""
+        with self.lock:
+            total = self.grade_totals.get(student)
+            if not total:
+                return None
+            return total[0]/total[1]
+
+    def current_grade(self, student):
+        """Return the student's current course grade, or None if ungraded."""
+        average_grade = self.average_grade(student)
+        if average_grade is None:
+            return None
+        return self.grading_standard.grade(average_grade)
+
+    def __getstate__(self):
+        """Return the state of the course without its lock."""
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name != "lock"
+        }
+
+    def __setstate__(self, state):
+        """Restore the state of the course with a new lock."""
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.lock = Lock()
+
 
 class Question(object):
-    def __init__(self, number, answer=None, choices=[]):
-        """Initialize question object."""
-        self.number = number
-        self.answer = answer
+    __slots__ = ("number", "choices", "choice_codes")
 
+    def __init__(self, number, choices=[]):
         """
-        NOTE: The assumption is an answer is wrong by default hence using
-        False to denote that the answer is wrong
+        Initialize question object.
+
+        NOTE: A question is shared by every quiz it is added to, so it holds
+        no answers. Each student's answers are kept on the quiz Submission.
+        Choices are compiled once into a tuple and a dictionary mapping each
+        choice to its answer code, both shared by all questions that have
+        the same choices.
         """
-        self.answer_result = False
+        self.number = number
         if len(choices) < 2:
             raise MultipleChoicesException("Pls provide multiple choices.")
-        self.choices = choices
+        if len(choices) > MAXIMUM_CHOICES:
+            raise TooManyChoicesException(
+                "Pls provide at most {} choices.".format(MAXIMUM_CHOICES)
+            )
+        choices = tuple(choices)
+        choice_codes = _CHOICES.get(choices)
+        if choice_codes is None:
+            choice_codes = _ChoiceCodes(
+                (choice, code) for code, choice in enumerate(choices)
+            )
+            choice_codes.choices = choices
+            _CHOICES[choices] = choice_codes
+        self.choices = choice_codes.choices
+        self.choice_codes = choice_codes
+
+    def encode_choice(self, choice):
+        """
+        Return the position of choice among the question's choices.
+
+        A choice that is not one of them, including one that cannot be
+        hashed, is encoded as _NOT_A_CHOICE.
+        """
+        try:
+            return self.choice_codes.get(choice, _NOT_A_CHOICE)
+        except TypeError:
+            return _NOT_A_CHOICE
 
 
 class Quiz(object):
+    __slots__ = (
+        "quiz_name",
+        "quiz_code",
+        "course",
+        "student",
+        "submitted",
+        "marked",
+        "grade",
+        "teacher_graded",
+        "questions",
+        "question_index",
+        "submission"
+    )
+
     def __init__(self, quiz_name, quiz_code, course, questions=[]):
         """Initialize quiz object."""
         self.quiz_name = quiz_name
@@ -81,23 +430,253 @@ class Quiz(object):
                 raise InvalidQuestionException(
                     "Please provide only valid questions."
                 )
-        self.questions = questions
+        self.questions, self.question_index = self._intern_questions(
+            questions
+        )
+        self.submission = Submission(self)
+
+    def find_invalid_answers(self, answers):
+        """
+        Return the invalid codes in a matrix of encoded answers.
+
+        params:
+            - answers
+
+        answers holds the answer codes of many submissions of this quiz laid
+        end to end, as bytes or a signed byte array. All codes are checked
+        against the number of choices of their question in one pass and the
+        (row, question number) of every invalid code is returned. A matrix
+        whose last row is not complete is rejected.
+        """
+        answers = bytes(answers)
+        number_of_questions = len(self.questions)
+        if len(answers) % number_of_questions:
+            raise InvalidNumberOfQuestionsException(
+                "Please provide an answer code for every question of each "
+                "submission."
+            )
+        choice_counts = bytes(
+            len(question.choices) for question in self.questions
+        ) * (len(answers) // number_of_questions)
+        checks = bytes(map(le, answers.translate(_SHIFT_CODE), choice_counts))
+        invalid_answers = []
+        position = checks.find(0)
+        while position != -1:
+            row, index = divmod(position, number_of_questions)
+            invalid_answers.append((row, self.questions[index].number))
+            position = checks.find(0, position + 1)
+        return invalid_answers
+
+    def assignment_for(self, student):
+        """
+        Return a copy of the quiz assigned to a student.
+
+        params:
+            - student
+
+        The copy shares the questions and question index of this quiz and
+        gets its own Submission. The quiz was validated when it was created,
+        so the copy is built without validating it again.
+        """
+        quiz = Quiz.__new__(Quiz)
+        quiz.quiz_name = self.quiz_name
+        quiz.quiz_code = self.quiz_code
+        quiz.course = self.course
+        quiz.student = student
+        quiz.submitted = False
+        quiz.marked = False
+        quiz.grade = None
+        quiz.teacher_graded = False
+        quiz.questions = self.questions
+        quiz.question_index = self.question_index
+        quiz.submission = Submission(quiz)
+        return quiz
+
+    def __getstate__(self):
+        """
+        Return the state of the quiz with its submission as bytes.
+
+        Quizzes are the bulk of a pickled model, so the submission is folded
+        into the state of its quiz rather than pickled as objects of its own.
+        """
+        return (
+            self.quiz_name,
+            self.quiz_code,
+            self.course,
+            self.student,
+            self.submitted,
+            self.marked,
+            self.grade,
+            self.teacher_graded,
+            self.questions,
+            self.question_index,
+            self.submission.answers.tobytes(),
+            self.submission.answer_results.tobytes()
+        )
+
+    def __setstate__(self, state):
+        """Restore the state of the quiz and rebuild its submission."""
+        (self.quiz_name, self.quiz_code, self.course, self.student,
+         self.submitted, self.marked, self.grade, self.teacher_graded,
+         self.questions, self.question_index, answers,
+         answer_results) = state
+        submission = Submission.__new__(Submission)
+        submission.quiz = self
+        submission.answers = array("b", answers)
+        submission.answer_results = array("b", answer_results)
+        self.submission = submission
+
+    @staticmethod
+    def _intern_questions(questions):
+        """
+        Return the shared question tuple and question number index.
+
+        params:
+            - questions
+
+        Quizzes are usually created from the same questions for every
+        student, so the tuple of questions and the index mapping question
+        numbers to positions are built once and shared between them. The
+        cache only holds them weakly, so they are freed with the last quiz
+        sharing them.
+        """
+        questions = tuple(questions)
+        question_index = _QUESTION_SETS.get(questions)
+        if question_index is None:
+            question_index = _QuestionIndex(
+                (question.number, index)
+                for index, question in enumerate(questions)
+            )
+            question_index.questions = questions
+            _QUESTION_SETS[questions] = question_index
+        return question_index.questions, question_index
+
+
+class Submission(object):
+    __slots__ = ("quiz", "answers", "answer_results")
+
+    def __init__(self, quiz):
+        """
+        Initialize a submission object.
+
+        A submission holds one student's answers and answer results for a
+        quiz, stored in compact arrays by question position. Answers are
+        stored as the position of the choice among the question choices.
+
+        NOTE: The assumption is an answer is wrong by default hence using
+        0 (False) to denote that the answer is wrong
+        """
+        self.quiz = quiz
+        number_of_questions = len(quiz.questions)
+        self.answers = array("b", [UNANSWERED]) * number_of_questions
+        self.answer_results = array("b", [0]) * number_of_questions
+
+    def get_answer(self, number):
+        """Return the choice answered for the question number."""
+        index = self.quiz.question_index[number]
+        code = self.answers[index]
+        if code == UNANSWERED:
+            return None
+        return self.quiz.questions[index].choices[code]
+
+    def get_answer_result(self, number):
+        """Return whether the question number was answered correctly."""
+        return bool(self.answer_results[self.quiz.question_index[number]])
+
+    @property
+    def correct_answers(self):
+        """Return the number of correctly answered questions."""
+        return sum(self.answer_results)
+
+
+class Gradebook(object):
+    __slots__ = ("_by_student", "_by_course", "_lock")
+
+    def __init__(self):
+        """
+        Initialize a gradebook object.
+
+        A gradebook holds the course grade of every student for every course.
+        Grades are indexed both by student number and by course key, the
+        (course_code, semester) pair, so either lookup is a single access.
+        """
+        self._by_student = {}
+        self._by_course = {}
+        self._lock = Lock()
+
+    def record(self, student, course, grade):
+        """Record a student's grade for a course."""
+        with self._lock:
+            self._by_student.setdefault(
+                student.student_number, {}
+            )[course.course_key] = grade
+            self._by_course.setdefault(
+                course.course_key, {}
+            )[student.student_number] = grade
+
+    def get(self, student, course):
+        """Return a student's grade for a course, or None if ungraded."""
+        return self._by_course.get(course.course_key, {}).get(
+            student.student_number
+        )
+
+    def student_grades(self, student):
+        """Return a student's grades keyed by course key."""
+        return dict(self._by_student.get(student.student_number, {}))
+
+    def course_grades(self, course):
+        """Return a course's grades keyed by student number."""
+        return dict(self._by_course.get(course.course_key, {}))
+
+    def export(self):
+        """Return (student_number, course_code, semester, grade) rows."""
+        with self._lock:
+            return [
+                (student_number, course_code, semester, grade)
+                for (course_code, semester), grades in self._by_course.items()
+                for student_number, grade in grades.items()
+            ]
+
+    def __getstate__(self):
+        """Return the grades of the gradebook without its lock."""
+        with self._lock:
+            return (self._by_student, self._by_course)
+
+    def __setstate__(self, state):
+        """Restore the grades of the gradebook with a new lock."""
+        self._by_student, self._by_course = state
+        self._lock = Lock()
 
 
 class Student(object):
+    __slots__ = (
+        "first_name",
+        "last_name",
+        "student_number",
+        "grades",
+        "enrolled_courses",
+        "assigned_quizzes"
+    )
+
     def __init__(self, first_name, last_name, student_number):
         """Initialize a student object."""
         self.first_name = first_name
         self.last_name = last_name
         self.student_number = student_number
         self.grades = {}
-        self.enrolled_courses = []
+
+        # enrolled courses keyed by course key
+        self.enrolled_courses = {}
         self.assigned_quizzes = []
 
     def enroll_into_course(self, course):
         """Enrol a student into a course."""
         self._verify_course(course)
-        self.enrolled_courses.append(course)
+        with course.lock:
+            # check again as another thread may have enrolled the student
+            self._verify_course(course)
+            self.enrolled_courses[course.course_key] = course
+            course.roster[self.student_number] = self
 
     def answer_quiz(self, quiz, answers=[]):
         """Enable student to answer a quiz."""
@@ -105,74 +684,115 @@ class Student(object):
         """
         NOTE: We assume that the student provides a list of answers that
         with dictionaries that correspond to question number as a key and
-        students answer as a value.
+        students answer as a value. A single dictionary mapping question
+        numbers to answers is also accepted.
         """
 
         self._verify_quiz(quiz)
-        for answer in answers:
-            for question in quiz.questions:
-                if list(answer.keys())[0] == question.number:
-                    choice = answer.get(question.number)
-                    self._verify_choice(choice, question)
-                    question.answer = choice
+        question_index = quiz.question_index
+        with _quiz_lock(quiz):
+            submission = quiz.submission
+            for number, choice in _answer_items(answers):
+                index = question_index.get(number)
+                if index is not None:
+                    question = quiz.questions[index]
+                    code = question.encode_choice(choice)
+                    if code == _NOT_A_CHOICE:
+                        self._verify_choice(choice, question)
+                    submission.answers[index] = code
 
     def submit_quiz(self, quiz):
         """Enable a student to submit a quiz."""
         self._verify_quiz(quiz)
-        quiz.submitted = True
+        with _quiz_lock(quiz):
+            quiz.submitted = True
 
     def _verify_course(self, course):
+        """Raise the problem found by _check_course, if any."""
+        _raise_error(self._check_course(course))
+
+    def _check_course(self, course):
         """
-        Verify a course.
+        Check a course.
 
         This is by checking that the course provided is a valid Course object.
         It also check whether the Course has already been enrolled into.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not isinstance(course, Course):
-            raise InvalidCourseException("Please provide valid Course.")
-        if course in self.enrolled_courses:
-            raise AlreadyEnrolledException(
+            return InvalidCourseException, "Please provide valid Course."
+        if course.course_key in self.enrolled_courses:
+            return (
+                AlreadyEnrolledException,
                 "The student has already enrolled into this course."
             )
 
     def _verify_quiz(self, quiz):
+        """Raise the problem found by _check_quiz, if any."""
+        _raise_error(self._check_quiz(quiz))
+
+    def _check_quiz(self, quiz):
         """
-        Verify a quiz.
+        Check a quiz.
 
         This is by checking that the quiz provide is a valid Quiz object.
         It also checks that the student is assigned to this quiz.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not isinstance(quiz, Quiz):
-            raise InvalidQuizException("Please provide valid quiz.")
+            return InvalidQuizException, "Please provide valid quiz."
         if not quiz.student:
-            raise UnassignedQuizException(
+            return (
+                UnassignedQuizException,
                 "Please ensure this quiz is assigned to you first."
             )
         if self.student_number != quiz.student.student_number:
-            raise InvalidVerificationException(
+            return (
+                InvalidVerificationException,
                 "Please submit the quiz assigned to you."
             )
 
     def _verify_choice(self, choice, question):
+        """Raise the problem found by _check_choice, if any."""
+        _raise_error(self._check_choice(choice, question))
+
+    def _check_choice(self, choice, question):
         """
-        Verify a choice.
+        Check a choice.
 
         Verification is done by checking the choice provided is a valid
         choice for the question specified.
+
+        Returns the exception class and message of the first problem found,
+        or None. A choice that cannot be hashed is not a valid choice.
         """
-        if choice not in question.choices:
-            raise InvalidChoiceException(
+        if question.encode_choice(choice) == _NOT_A_CHOICE:
+            return (
+                InvalidChoiceException,
                 "Please provide an answer from available choices"
             )
 
 
 class Teacher(object):
-    def __init__(self, first_name, last_name, teacher_number):
-        """Initialize a teacher object."""
+    __slots__ = ("first_name", "last_name", "teacher_number", "gradebook")
+
+    def __init__(self, first_name, last_name, teacher_number, gradebook=None):
+        """
+        Initialize a teacher object.
+
+        The gradebook holds the course grades of the courses the teacher
+        teaches. Teachers given the same gradebook share it, so one gradebook
+        can hold every grade of a school.
+        """
 
         self.first_name = first_name
         self.last_name = last_name
         self.teacher_number = teacher_number
+        self.gradebook = Gradebook() if gradebook is None else gradebook
 
     def create_quiz(self, quiz_name, quiz_code, course, questions=[]):
         """Create a quiz."""
@@ -193,6 +813,61 @@ class Teacher(object):
         quiz.student = student
         return quiz
 
+    def assign_quiz_to_cohort(self, quiz, students):
+        """
+        Assign a quiz to a cohort of students.
+
+        params:
+            - quiz
+            - students
+
+        This function checks the quiz once and every student, then gives
+        each student their own copy of the quiz sharing its questions. The
+        copies are added to the course quizzes and returned in student order.
+        """
+        self._verify_quiz(quiz)
+        students = list(students)
+        for student in students:
+            self._verify_student(student)
+        quizzes = [quiz.assignment_for(student) for student in students]
+        quiz.course.quizzes.extend(quizzes)
+        return quizzes
+
+    def enroll_many(self, students, course):
+        """
+        Enrol many students into a course.
+
+        params:
+            - students
+            - course
+
+        This function checks every student before enrolling any of them, so
+        either all students are enrolled or none are.
+        """
+        self._verify_course(course)
+        students = list(students)
+        for student in students:
+            self._verify_student(student)
+
+        course_key = course.course_key
+        roster = course.roster
+        with course.lock:
+            batch = set()
+            for student in students:
+                if (
+                    student.student_number in roster or
+                    student.student_number in batch
+                ):
+                    raise AlreadyEnrolledException(
+                        "The student has already enrolled into this course."
+                    )
+                batch.add(student.student_number)
+
+            for student in students:
+                student.enrolled_courses[course_key] = course
+                roster[student.student_number] = student
+        return students
+
     def calculate_total_grade(self, student, course):
         """
         Calculate a students total grade.
@@ -203,21 +878,60 @@ class Teacher(object):
 
         This function calculates the total grade for the semester by
         matching the students average grade for all the quizzes the student did
-        for the course to the standard course grading.
+        for the course to the standard course grading. The grade is recorded
+        in the course teacher's gradebook and the student's grades.
         """
         self._verify_student(student)
         self._verify_course(course)
         self._verify_student_enrollment(student, course)
-        student_quizzes = [
-            quiz for quiz in course.quizzes if quiz.student == student and quiz.teacher_graded  # noqa: E501
-        ]
-        all_quiz_grades = [quiz.grade for quiz in student_quizzes]
+        with course.lock:
+            total_grade, graded_quizzes = course.grade_totals.get(
+                student,
+                (0, 0)
+            )
 
         # calculate the average grade
-        average_grade = sum(all_quiz_grades)/len(all_quiz_grades)
+        average_grade = total_grade/graded_quizzes
 
-        course_grade = self._get_course_grade(int(average_grade))
-        course.course_grade = course_grade
+        course_grade = self._get_course_grade(
+            average_grade,
+            course.grading_standard
+        )
+        self._record_course_grade(student, course, course_grade)
+        return course_grade
+
+    def calculate_total_grades(self, course):
+        """
+        Calculate the total grade of every graded student in a course.
+
+        params:
+            - course
+
+        This function returns a dictionary mapping each student with graded
+        quizzes in the course to their total grade, reading the running
+        grade totals of all students in one pass. Every grade is recorded as
+        calculate_total_grade would record it. Every student is checked to
+        be enrolled into the course before any grade is recorded, so either
+        all grades are recorded or none are.
+        """
+        self._verify_course(course)
+        with course.lock:
+            grade_totals = [
+                (student, total[0], total[1])
+                for student, total in course.grade_totals.items()
+            ]
+        for student, _, _ in grade_totals:
+            self._verify_student_enrollment(student, course)
+
+        course_grades = {}
+        for student, total_grade, count in grade_totals:
+            course_grade = self._get_course_grade(
+                total_grade/count,
+                course.grading_standard
+            )
+            self._record_course_grade(student, course, course_grade)
+            course_grades[student] = course_grade
+        return course_grades
 
     def grade_quiz(self, quiz):
         """
@@ -231,14 +945,11 @@ class Teacher(object):
         """
         self._verify_quiz(quiz)
         self._verify_quiz_marking(quiz)
-        correct_answers = 0
-        for question in quiz.questions:
-            if question.answer_result:
-                correct_answers += 1
+        with _quiz_lock(quiz):
+            correct_answers = quiz.submission.correct_answers
 
-        quiz_grade = int(correct_answers/len(quiz.questions)*100)
-        quiz.grade = quiz_grade
-        quiz.teacher_graded = True
+            quiz_grade = int(correct_answers/len(quiz.questions)*100)
+            self._record_quiz_grade(quiz, quiz_grade)
 
     def mark_quiz(self, quiz, marking_guide):
         """
@@ -248,56 +959,330 @@ class Teacher(object):
             - quiz
             - marking_guide
 
-        This func updates all quiz question answer_result value to determine
-        whether the answer submitted is correct(True) or wrong(False).
+        This func updates the answer result of every quiz question in the
+        marking guide on the quiz submission to determine whether the answer
+        submitted is correct(True) or wrong(False).
         By default this value is False as unanswered question if submitted is
         wrong.
         """
 
         """ NOTE: We assume that the teacher provides a marking guide that
         with dictionaries that correspond to question number as a key and
-        correct answer as a value.
+        correct answer as a value. A single dictionary mapping question
+        numbers to correct answers is also accepted.
         """
         self._verify_quiz(quiz)
         self._verify_quiz_submission(quiz)
-        for answer in marking_guide:
-            for question in quiz.questions:
-                qn_number = list(answer.keys())[0]
-                correct_answer = answer.get(qn_number)
-                if qn_number == question.number and correct_answer == question.answer:  # noqa: E501
-                    question.answer_result = True
-                quiz.marked = True
+        question_index = quiz.question_index
+        with _quiz_lock(quiz):
+            submission = quiz.submission
+            for qn_number, correct_answer in _answer_items(marking_guide):
+                index = question_index.get(qn_number)
+                if index is None:
+                    continue
+                question = quiz.questions[index]
+                submission.answer_results[index] = (
+                    question.encode_choice(correct_answer) ==
+                    submission.answers[index]
+                )
+            quiz.marked = True
+
+    def mark_quizzes(self, quizzes, marking_guide):
+        """
+        Mark and grade a batch of submitted quizzes.
+
+        params:
+            - quizzes
+            - marking_guide
+
+        This function marks every quiz against one marking guide and grades
+        it, giving the same results as calling mark_quiz and grade_quiz on
+        each quiz. The answer codes of all quizzes with the same questions
+        are laid end to end and marked against the encoded guide in one
+        operation. Every quiz lock is held while the quizzes are marked and
+        their results and grades are written back in bulk.
+        """
+        quizzes = list(quizzes)
+        if not (
+            all(map(isinstance, quizzes, repeat(Quiz))) and
+            all(map(attrgetter("submitted"), quizzes))
+        ):
+            for quiz in quizzes:
+                self._verify_quiz(quiz)
+                self._verify_quiz_submission(quiz)
+
+        guide = dict(_answer_items(marking_guide))
+        question_sets = list(map(attrgetter("questions"), quizzes))
+        if len(set(map(id, question_sets))) == 1:
+            groups = {None: quizzes}
+        else:
+            groups = {}
+            for quiz, questions in zip(quizzes, question_sets):
+                groups.setdefault(id(questions), []).append(quiz)
+
+        get_submission = attrgetter("submission")
+        with _hold_quiz_locks():
+            for group in groups.values():
+                questions = group[0].questions
+                submissions = list(map(get_submission, group))
+                answer_results, grades = _mark_submissions(
+                    self._encode_marking_guide(questions, guide).tobytes(),
+                    self._find_unmarked_questions(questions, guide),
+                    b"".join(map(
+                        array.tobytes,
+                        map(attrgetter("answers"), submissions)
+                    )),
+                    b"".join(map(
+                        array.tobytes,
+                        map(attrgetter("answer_results"), submissions)
+                    ))
+                )
+                self._write_marking(group, answer_results, grades)
+        return quizzes
+
+    def regrade_quizzes(self, quizzes, corrections):
+        """
+        Regrade marked quizzes after their marking guide is corrected.
+
+        params:
+            - quizzes
+            - corrections
+
+        corrections holds the corrected answers only, in the same form as a
+        marking guide. This function re-marks just the corrected questions of
+        every quiz, so it costs nothing for questions that did not change.
+        Graded quizzes whose answer results changed get their new grade,
+        which updates the course average of their student, and a
+        course grade already recorded for the student is recalculated.
+        Returns the quizzes whose answer results changed.
+        """
+        quizzes = list(quizzes)
+        for quiz in quizzes:
+            self._verify_quiz(quiz)
+            self._verify_quiz_marking(quiz)
+
+        corrections = dict(_answer_items(corrections))
+        encoded_corrections = {}
+        regraded_quizzes = []
+        regraded_students = set()
+        for quiz in quizzes:
+            questions = quiz.questions
+            corrected = encoded_corrections.get(id(questions))
+            if corrected is None:
+                corrected = encoded_corrections[id(questions)] = [
+                    (index, questions[index].encode_choice(correct_answer))
+                    for index, correct_answer in (
+                        (quiz.question_index.get(number), correct_answer)
+                        for number, correct_answer in corrections.items()
+                    )
+                    if index is not None
+                ]
+            with _quiz_lock(quiz):
+                submission = quiz.submission
+                answers = submission.answers
+                answer_results = submission.answer_results
+                changed = False
+                for index, code in corrected:
+                    result = answers[index] == code
+                    if result != answer_results[index]:
+                        answer_results[index] = result
+                        changed = True
+                if not changed:
+                    continue
+                regraded_quizzes.append(quiz)
+                if quiz.teacher_graded:
+                    self._record_quiz_grade(
+                        quiz,
+                        int(answer_results.count(1)/len(questions)*100)
+                    )
+                    regraded_students.add((quiz.student, quiz.course))
+
+        for student, course in regraded_students:
+            if course.course_key in student.grades:
+                self._record_course_grade(
+                    student,
+                    course,
+                    course.current_grade(student)
+                )
+        return regraded_quizzes
+
+    def _encode_marking_guide(self, questions, guide):
+        """
+        Return the marking guide as answer codes.
+
+        params:
+            - questions
+            - guide
+
+        This function returns an array holding the code of the correct
+        answer for each question, in question order, to be compared with the
+        answer codes of a submission. Questions left out of the guide get
+        _NOT_A_CHOICE without looking it up, as it may be one of the choices.
+        """
+        return array("b", [
+            question.encode_choice(guide[question.number])
+            if question.number in guide else _NOT_A_CHOICE
+            for question in questions
+        ])
+
+    def _find_unmarked_questions(self, questions, guide):
+        """
+        Return which questions the marking guide leaves out.
+
+        params:
+            - questions
+            - guide
+
+        This function returns bytes holding 1 for each question, in question
+        order, that has no correct answer in the guide and 0 for the rest.
+        """
+        return bytes(question.number not in guide for question in questions)
+
+    def _record_course_grade(self, student, course, course_grade):
+        """
+        Record a student's course grade.
+
+        params:
+            - student
+            - course
+            - course_grade
+
+        This function records the grade in the gradebook of the course
+        teacher, whichever teacher calculated it, and in the student's grades
+        keyed by course key.
+        """
+        course.course_teacher.gradebook.record(student, course, course_grade)
+        student.grades[course.course_key] = course_grade
+
+    def _record_quiz_grade(self, quiz, quiz_grade):
+        """
+        Record the grade of a quiz.
 
-    def _get_course_grade(self, average_grade):
+        params:
+            - quiz
+            - quiz_grade
+
+        This function sets the quiz grade and updates the running grade
+        total of its student in the course. The first time the quiz is graded
+        it is also added to the graded quizzes of the student, while a
+        regraded quiz replaces its previous grade in the total. The course
+        lock is held while the totals are updated.
+        """
+        self._record_quiz_grades((quiz,), (quiz_grade,))
+
+    def _record_quiz_grades(self, quizzes, quiz_grades):
+        """
+        Record the grades of many quizzes.
+
+        params:
+            - quizzes
+            - quiz_grades
+
+        This function records every grade as _record_quiz_grade does. The
+        lock of a course is taken once for each run of its quizzes, so a
+        batch from one course takes it once.
+        """
+        course = None
+        try:
+            for quiz, quiz_grade in zip(quizzes, quiz_grades):
+                if quiz.course is not course:
+                    if course is not None:
+                        course.lock.release()
+                        course = None
+                    quiz.course.lock.acquire()
+                    course = quiz.course
+                    graded_quizzes = course.graded_quizzes
+                    grade_totals = course.grade_totals
+                if quiz.teacher_graded:
+                    grade_totals[quiz.student][0] += quiz_grade - quiz.grade
+                else:
+                    student = quiz.student
+                    graded = graded_quizzes.get(student)
+                    if graded is None:
+                        graded_quizzes[student] = [quiz]
+                        grade_totals[student] = [quiz_grade, 1]
+                    else:
+                        graded.append(quiz)
+                        total = grade_totals[student]
+                        total[0] += quiz_grade
+                        total[1] += 1
+                    quiz.teacher_graded = True
+                quiz.grade = quiz_grade
+        finally:
+            if course is not None:
+                course.lock.release()
+
+    def _write_marking(self, quizzes, answer_results, quiz_grades):
+        """
+        Write marked answer results and grades back to their quizzes.
+
+        params:
+            - quizzes
+            - answer_results
+            - quiz_grades
+
+        answer_results holds the results of quizzes with the same questions
+        laid end to end and quiz_grades the grade of each quiz, as returned
+        by _mark_submissions. The quiz locks must be held.
+        """
+        if not quizzes:
+            return
+        number_of_questions = len(quizzes[0].questions)
+        answer_results = array("b", answer_results)
+        for quiz, start in zip(
+            quizzes,
+            range(0, len(answer_results), number_of_questions)
+        ):
+            quiz.submission.answer_results = answer_results[
+                start:start + number_of_questions
+            ]
+            quiz.marked = True
+        self._record_quiz_grades(quizzes, quiz_grades)
+
+    def _get_course_grade(
+        self,
+        average_grade,
+        grading_standard=COURSE_GRADING_STANDARD
+    ):
         """
         Return the matching course grade.
 
         params:
             - average_grade
+            - grading_standard
 
         This function matches the average grade of all quizzes for the course
-        to the standard course grading.
+        to the course grading standard.
         """
-        for score, range_of_grades in COURSE_GRADING_STANDARD.items():
-            if average_grade in range_of_grades:
-                return score
+        return grading_standard.grade(average_grade)
 
     def _verify_course(self, course):
+        """Raise the problem found by _check_course, if any."""
+        _raise_error(self._check_course(course))
+
+    def _check_course(self, course):
         """
-        Verify a course.
+        Check a course.
 
         params:
              - course
 
         This function checks whether course provided is a valid course
         object.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not isinstance(course, Course):
-            raise InvalidCourseException("Please provide valid Course")
+            return InvalidCourseException, "Please provide valid Course"
 
     def _verify_student_enrollment(self, student, course):
+        """Raise the problem found by _check_student_enrollment, if any."""
+        _raise_error(self._check_student_enrollment(student, course))
+
+    def _check_student_enrollment(self, student, course):
         """
-        Verify student enrollment.
+        Check student enrollment.
 
         params:
             - student
@@ -305,60 +1290,92 @@ class Teacher(object):
 
         This function checks if  student is enrolled into the specified
         course.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
-        if course not in student.enrolled_courses:
-            raise UnEnrolledCourseException(
+        if course.course_key not in student.enrolled_courses:
+            return (
+                UnEnrolledCourseException,
                 "Student not enrolled into the specified course"
             )
 
     def _verify_quiz(self, quiz):
+        """Raise the problem found by _check_quiz, if any."""
+        _raise_error(self._check_quiz(quiz))
+
+    def _check_quiz(self, quiz):
         """
-        Verify a quiz.
+        Check a quiz.
 
         params:
              - quiz
 
         This function checks whether quizprovided is a valid quiz
         object.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not isinstance(quiz, Quiz):
-            raise InvalidQuizException("Please provide valid Quiz")
+            return InvalidQuizException, "Please provide valid Quiz"
 
     def _verify_quiz_marking(self, quiz):
+        """Raise the problem found by _check_quiz_marking, if any."""
+        _raise_error(self._check_quiz_marking(quiz))
+
+    def _check_quiz_marking(self, quiz):
         """
-        Verify that a quiz is marked.
+        Check that a quiz is marked.
 
         params:
             - quiz
 
         This function checks if the quiz is marked by checking if the
         marked attribute is False.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not quiz.marked:
-            raise UnmarkedQuizException("Please mark this quiz first")
+            return UnmarkedQuizException, "Please mark this quiz first"
 
     def _verify_quiz_submission(self, quiz):
+        """Raise the problem found by _check_quiz_submission, if any."""
+        _raise_error(self._check_quiz_submission(quiz))
+
+    def _check_quiz_submission(self, quiz):
         """
-        Verify that a quiz is submitted.
+        Check that a quiz is submitted.
 
         params:
             - quiz
 
         This function checks if the quiz is submitted by checking if the
         submitted attribute is False.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not quiz.submitted:
-            raise UnsubmittedQuizException("This quiz has not been submitted")
+            return UnsubmittedQuizException, "This quiz has not been submitted"
 
     def _verify_student(self, student):
+        """Raise the problem found by _check_student, if any."""
+        _raise_error(self._check_student(student))
+
+    def _check_student(self, student):
         """
-        Verify a student.
+        Check a student.
 
         params:
              - student
 
         This function checks whether student provided is a valid student
         object.
+
+        Returns the exception class and message of the first problem found,
+        or None.
         """
         if not isinstance(student, Student):
-            raise InvalidStudentException("Please provide valid Student")
+            return InvalidStudentException, "Please provide valid Student"
@@ -0,0 +1,114 @@
+from unittest import TestCase
+
+from analysis import ItemAnalysis, analyse_quizzes
+from exceptions import (
+    InvalidQuestionException,
+    InvalidQuizException,
+    UngradedQuizException
+)
+from solution import Course, Question, Student, Teacher
+
+
+class TestAnalysis(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_course = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_questions = [
+            Question(1, choices=["a", "b", "c", "d"]),
+            Question(2, choices=["i", "ii", "iii"]),
+            Question(3, choices=["x", "y"])
+        ]
+        quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course,
+            questions=self.test_questions
+        )
+        students = [
+            Student("John", "Snow", "HB{}".format(number))
+            for number in range(4)
+        ]
+        self.test_quizzes = self.test_teacher.assign_quiz_to_cohort(
+            quiz,
+            students
+        )
+        for quiz, answers in zip(self.test_quizzes, (
+            {1: "a", 2: "i", 3: "x"},
+            {1: "a", 2: "i", 3: "y"},
+            {1: "a", 2: "ii"},
+            {1: "b", 2: "iii", 3: "y"}
+        )):
+            quiz.student.answer_quiz(quiz, answers)
+            quiz.student.submit_quiz(quiz)
+        self.test_guide = {1: "a", 2: "i", 3: "x"}
+        self.test_teacher.mark_quizzes(self.test_quizzes, self.test_guide)
+
+    def test_analyse_quizzes(self):
+        """Test that quizzes are analysed per question."""
+        with self.subTest("Test analysis fails on invalid quiz"):
+            self.assertRaises(InvalidQuizException, analyse_quizzes, ["Quiz"])
+
+        with self.subTest("Test question statistics are computed"):
+            analysis, = analyse_quizzes(self.test_quizzes)
+            self.assertEqual(analysis.responses, 4)
+            self.assertEqual(analysis.difficulty(1), 0.75)
+            self.assertEqual(analysis.difficulty(3), 0.25)
+            self.assertEqual(
+                analysis.choice_distribution(3),
+                {"x": 1, "y": 2, None: 1}
+            )
+            self.assertAlmostEqual(
+                analysis.discrimination(1),
+                0.7714743098301237
+            )
+            self.assertEqual(
+                [row["number"] for row in analysis.report()],
+                [1, 2, 3]
+            )
+
+        with self.subTest("Test analysis fails on unknown question"):
+            self.assertRaises(
+                InvalidQuestionException,
+                analysis.difficulty,
+                4
+            )
+
+    def test_item_analysis_updates(self):
+        """Test that the analysis follows added and removed quizzes."""
+        analysis = ItemAnalysis(self.test_questions)
+
+        with self.subTest("Test adding fails on ungraded quiz"):
+            quiz = self.test_teacher.create_quiz(
+                quiz_name="Mid-term",
+                quiz_code="MT-1",
+                course=self.test_course,
+                questions=self.test_questions
+            )
+            self.assertRaises(UngradedQuizException, analysis.add, quiz)
+
+        with self.subTest("Test adding fails on other questions"):
+            quiz = self.test_teacher.create_quiz(
+                quiz_name="Mid-term",
+                quiz_code="MT-1",
+                course=self.test_course,
+                questions=self.test_questions[:2]
+            )
+            self.assertRaises(InvalidQuizException, analysis.add, quiz)
+
+        with self.subTest("Test a regraded quiz is replaced"):
+            for quiz in self.test_quizzes:
+                analysis.add(quiz)
+            analysis.remove(self.test_quizzes[0])
+            self.test_teacher.regrade_quizzes(
+                self.test_quizzes[:1],
+                {3: "y"}
+            )
+            analysis.add(self.test_quizzes[0])
+
+            self.assertEqual(analysis.difficulty(3), 0)
+            self.assertEqual(analysis.discrimination(3), None)
+            self.assertEqual(
+                analysis.report(),
+                analyse_quizzes(self.test_quizzes)[0].report()
+            )
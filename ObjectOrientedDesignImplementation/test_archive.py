@@ -0,0 +1,67 @@
+import tempfile
+from unittest import TestCase
+
+from archive import Archive, write_archive
+from solution import Course, Question, Student, Teacher
+
+
+class TestArchive(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_student = Student("John", "Snow", "HB256")
+        self.test_student_two = Student("Karl", "Drago", "HB250")
+        self.test_course_one = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_course_two = Course("Science", "HBS4", 1, self.test_teacher)
+        questions = [
+            Question(1, choices=["a", "b", "c", "d"]),
+            Question(2, choices=["i", "ii", "iii"])
+        ]
+        for course in (self.test_course_two, self.test_course_one):
+            quiz = self.test_teacher.create_quiz(
+                quiz_name="Mid-term",
+                quiz_code="MT-1",
+                course=course,
+                questions=questions
+            )
+            quizzes = self.test_teacher.assign_quiz_to_cohort(
+                quiz,
+                [self.test_student, self.test_student_two]
+            )
+            for quiz, answers in zip(quizzes, ({1: "b", 2: "ii"}, {1: "a"})):
+                quiz.student.answer_quiz(quiz, answers)
+                quiz.student.submit_quiz(quiz)
+            self.test_teacher.mark_quizzes(quizzes[:1], {1: "b", 2: "ii"})
+
+        self.test_dir = tempfile.TemporaryDirectory()
+        write_archive(
+            self.test_dir.name,
+            [self.test_course_two, self.test_course_one]
+        )
+        self.test_archive = Archive(self.test_dir.name)
+
+    def tearDown(self):
+        self.test_archive.close()
+        self.test_dir.cleanup()
+
+    def test_archive(self):
+        """Test that archived quizzes are read back from the columns."""
+        with self.subTest("Test course grades are read"):
+            grades = self.test_archive.grades("HBZ5", 1)
+            self.assertEqual(grades.tolist(), [100, -1])
+            grades.release()
+            self.assertEqual(self.test_archive.grades("HBZ5", 2).tolist(), [])
+
+        with self.subTest("Test segments are read"):
+            segment, = self.test_archive.find_segments("HBS4", 1, "MT-1")
+            self.assertEqual(segment["question_numbers"], [1, 2])
+            self.assertEqual(
+                self.test_archive.student_numbers(segment),
+                ["HB256", "HB250"]
+            )
+            answers = self.test_archive.answers(segment)
+            answer_results = self.test_archive.answer_results(segment)
+            self.assertEqual(answers.tolist(), [[1, 1], [0, -1]])
+            self.assertEqual(answer_results.tolist(), [[1, 1], [0, 0]])
+            answers.release()
+            answer_results.release()
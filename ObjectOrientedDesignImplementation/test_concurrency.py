@@ -0,0 +1,194 @@
+import sys
+import threading
+from unittest import TestCase
+
+from exceptions import AlreadyEnrolledException
+from metrics import Instrumentation
+from reports import course_statistics
+from solution import Course, Question, Student, Teacher
+from validation import answer_batch
+
+
+THREADS = 8
+
+
+class TestConcurrency(TestCase):
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_course = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course,
+            questions=[
+                Question(number, choices=["a", "b", "c", "d"])
+                for number in range(1, 11)
+            ]
+        )
+        self.test_guide = {number: "a" for number in range(1, 11)}
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def run_threads(self, target, arguments):
+        """Run target once for each argument in its own thread."""
+        barrier = threading.Barrier(len(arguments))
+        errors = []
+
+        def run(argument):
+            barrier.wait()
+            try:
+                target(argument)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [
+            threading.Thread(target=run, args=(argument,))
+            for argument in arguments
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_concurrent_enrollment(self):
+        """Test that a student is enrolled once by concurrent threads."""
+        student = Student("John", "Snow", "HB256")
+        errors = self.run_threads(
+            lambda _: student.enroll_into_course(self.test_course),
+            range(THREADS)
+        )
+        self.assertEqual(len(errors), THREADS - 1)
+        for error in errors:
+            self.assertIsInstance(error, AlreadyEnrolledException)
+        self.assertEqual(list(self.test_course.roster), ["HB256"])
+
+    def test_concurrent_grading(self):
+        """Test that students can be graded from many threads."""
+        cohorts = [
+            [
+                Student("John", "Snow", "HB{}-{}".format(thread, number))
+                for number in range(50)
+            ]
+            for thread in range(THREADS)
+        ]
+
+        def grade_cohort(cohort):
+            for number, student in enumerate(cohort):
+                student.enroll_into_course(self.test_course)
+                quiz, = self.test_teacher.assign_quiz_to_cohort(
+                    self.test_quiz,
+                    [student]
+                )
+                student.answer_quiz(quiz, {
+                    question: "a" if question <= number % 10 else "b"
+                    for question in range(1, 11)
+                })
+                student.submit_quiz(quiz)
+                self.test_teacher.mark_quiz(quiz, self.test_guide)
+                self.test_teacher.grade_quiz(quiz)
+                self.test_teacher.calculate_total_grade(
+                    student,
+                    self.test_course
+                )
+                course_statistics(self.test_course)
+                self.test_teacher.calculate_total_grades(self.test_course)
+
+        errors = self.run_threads(grade_cohort, cohorts)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.test_course.roster), THREADS * 50)
+        self.assertEqual(len(self.test_course.quizzes), THREADS * 50 + 1)
+        for cohort in cohorts:
+            for number, student in enumerate(cohort):
+                self.assertEqual(
+                    self.test_course.grade_totals[student],
+                    [number % 10 * 10, 1]
+                )
+        self.assertEqual(
+            len(self.test_teacher.gradebook.export()),
+            THREADS * 50
+        )
+
+    def test_concurrent_regrading(self):
+        """Test that shared quizzes can be regraded from many threads."""
+        students = [
+            Student("John", "Snow", "HB{}".format(number))
+            for number in range(20)
+        ]
+        self.test_teacher.enroll_many(students, self.test_course)
+        quizzes = self.test_teacher.assign_quiz_to_cohort(
+            self.test_quiz,
+            students
+        )
+        for student, quiz in zip(students, quizzes):
+            student.answer_quiz(quiz, {1: "a", 2: "b"})
+            student.submit_quiz(quiz)
+        self.test_teacher.mark_quizzes(quizzes, self.test_guide)
+
+        def regrade(thread):
+            for _ in range(50):
+                self.test_teacher.regrade_quizzes(quizzes, {2: "b"})
+                self.test_teacher.mark_quizzes(quizzes, self.test_guide)
+                for quiz in quizzes:
+                    self.test_teacher.grade_quiz(quiz)
+
+        errors = self.run_threads(regrade, range(THREADS))
+
+        self.assertEqual(errors, [])
+        for student, quiz in zip(students, quizzes):
+            self.assertEqual(
+                self.test_course.grade_totals[student],
+                [quiz.grade, 1]
+            )
+
+    def test_concurrent_batch_answering(self):
+        """Test that batches of answers can be applied from many threads."""
+        students = [
+            Student("John", "Snow", "HB{}".format(number))
+            for number in range(THREADS)
+        ]
+        quizzes = self.test_teacher.assign_quiz_to_cohort(
+            self.test_quiz,
+            students
+        )
+
+        def answer(thread):
+            student, quiz = students[thread], quizzes[thread]
+            for choice in "abcd" * 25:
+                answer_batch([
+                    (student, quiz, number, choice)
+                    for number in range(1, 11)
+                ])
+                student.answer_quiz(quiz, {1: "a"})
+
+        errors = self.run_threads(answer, range(THREADS))
+
+        self.assertEqual(errors, [])
+        for quiz in quizzes:
+            self.assertEqual(quiz.submission.get_answer(10), "d")
+
+    def test_concurrent_instrumentation(self):
+        """Test that calls from many threads are all counted."""
+        instrumentation = Instrumentation(sample_size=10)
+        instrumentation.enable()
+        student = Student("John", "Snow", "HB256")
+        quiz = self.test_teacher.assign_quiz(self.test_quiz, student)
+        try:
+            errors = self.run_threads(
+                lambda _: [
+                    student.answer_quiz(quiz, {1: "a"}) for _ in range(500)
+                ],
+                range(THREADS)
+            )
+        finally:
+            instrumentation.disable()
+
+        self.assertEqual(errors, [])
+        stats = instrumentation.snapshot()["Student.answer_quiz"]
+        self.assertEqual(stats["calls"], THREADS * 500)
+        self.assertEqual(stats["items"], THREADS * 500)
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from exceptions import InvalidChoiceException, UnassignedQuizException
+from ingestion import ingest_answers, read_answer_records
+from solution import Course, Question, Student, Teacher
+
+
+class TestIngestion(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_student = Student("John", "Snow", "HB256")
+        self.test_student_two = Student("Karl", "Drago", "HB250")
+        self.test_course = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course,
+            questions=[
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+        self.test_quizzes = self.test_teacher.assign_quiz_to_cohort(
+            self.test_quiz,
+            [self.test_student, self.test_student_two]
+        )
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def write_file(self, name, content):
+        path = os.path.join(self.test_dir.name, name)
+        with open(path, "w") as answer_file:
+            answer_file.write(content)
+        return path
+
+    def test_read_answer_records(self):
+        """Test that answer records are read from CSV and JSONL files."""
+        expected = [("HB256", "MT-1", 1, "b"), ("HB250", "MT-1", 2, "iii")]
+
+        with self.subTest("Test records are read from a CSV file"):
+            path = self.write_file(
+                "answers.csv",
+                "student_number,quiz_code,question_number,choice\n"
+                "HB256,MT-1,1,b\n"
+                "HB250,MT-1,2,iii\n"
+            )
+            self.assertEqual(list(read_answer_records(path)), expected)
+
+        with self.subTest("Test records are read from a JSONL file"):
+            path = self.write_file("answers.jsonl", "\n".join(
+                json.dumps(dict(zip(
+                    ("student_number", "quiz_code", "question_number", "choice"),  # noqa: E501
+                    record
+                )))
+                for record in expected
+            ))
+            self.assertEqual(list(read_answer_records(path)), expected)
+
+    def test_ingest_answers(self):
+        """Test that answer records are streamed into quizzes."""
+        records = [
+            ("HB256", "MT-1", 1, "b"),
+            ("HB250", "MT-1", 1, "c"),
+            ("HB256", "MT-1", 2, "ii"),
+            ("HB250", "MT-1", 2, "i")
+        ]
+
+        with self.subTest("Test ingestion fails on an unassigned quiz"):
+            self.assertRaises(
+                UnassignedQuizException,
+                ingest_answers,
+                [("HB999", "MT-1", 1, "b")],
+                self.test_quizzes
+            )
+
+        with self.subTest("Test ingestion fails on an invalid choice"):
+            self.assertRaises(
+                InvalidChoiceException,
+                ingest_answers,
+                [("HB256", "MT-1", 1, "x")],
+                self.test_quizzes
+            )
+
+        with self.subTest("Test ingestion answers and submits quizzes"):
+            progress = []
+            rows, _, _ = ingest_answers(
+                iter(records),
+                self.test_quizzes,
+                chunk_size=3,
+                submit=True,
+                progress=lambda rows, rate: progress.append(rows)
+            )
+            quiz_one, quiz_two = self.test_quizzes
+
+            self.assertEqual(rows, 4)
+            self.assertEqual(progress, [3, 4])
+            self.assertEqual(quiz_one.submission.get_answer(2), "ii")
+            self.assertEqual(quiz_two.submission.get_answer(1), "c")
+            self.assertTrue(quiz_one.submitted and quiz_two.submitted)
@@ -0,0 +1,81 @@
+import asyncio
+from unittest import TestCase
+
+from exceptions import InvalidChoiceException, InvalidVerificationException
+from intake import SubmissionIntake, create_submissions, run_load
+
+
+class TestIntake(TestCase):
+
+    def test_submission_intake(self):
+        """Test that submissions are checked, queued and applied."""
+        submissions = create_submissions(3, 2)
+        (student, quiz, answers), (other_student, _, _) = submissions[:2]
+
+        async def scenario():
+            intake = SubmissionIntake(max_queue_size=2, batch_size=2)
+
+            with self.subTest("Test intake fails on another student's quiz"):
+                with self.assertRaises(InvalidVerificationException):
+                    await intake.submit(other_student, quiz, answers)
+
+            with self.subTest("Test intake fails on an invalid choice"):
+                self.assertRaises(
+                    InvalidChoiceException,
+                    intake.offer,
+                    student,
+                    quiz,
+                    {0: "x"}
+                )
+
+            with self.subTest("Test intake signals backpressure when full"):
+                for submission in submissions[:2]:
+                    self.assertTrue(intake.offer(*submission))
+                self.assertTrue(intake.full)
+                self.assertFalse(intake.offer(*submissions[2]))
+
+            with self.subTest("Test queued submissions are applied"):
+                drain = asyncio.ensure_future(intake.drain())
+                await intake.submit(*submissions[2])
+                await intake.join()
+                drain.cancel()
+                self.assertEqual(intake.applied, 3)
+                self.assertTrue(quiz.submitted)
+                self.assertEqual(
+                    quiz.submission.get_answer(0),
+                    answers[0]
+                )
+
+        asyncio.run(scenario())
+
+    def test_failed_submission(self):
+        """Test that a submission failing in the drain does not stop it."""
+        submissions = create_submissions(3, 2)
+        (student, quiz, _), (other_student, _, _) = submissions[:2]
+
+        async def scenario():
+            intake = SubmissionIntake(max_queue_size=3, batch_size=3)
+            for submission in submissions:
+                intake.offer(*submission)
+            quiz.student = other_student
+            drain = asyncio.ensure_future(intake.drain())
+            await asyncio.wait_for(intake.join(), 5)
+            drain.cancel()
+
+            self.assertEqual(intake.applied, 2)
+            self.assertEqual(len(intake.errors), 1)
+            self.assertIs(intake.errors[0][0], student)
+            self.assertIsInstance(
+                intake.errors[0][2],
+                InvalidVerificationException
+            )
+            for _, other_quiz, _ in submissions[1:]:
+                self.assertTrue(other_quiz.submitted)
+
+        asyncio.run(scenario())
+
+    def test_run_load(self):
+        """Test that the load generator reports latency and throughput."""
+        p50, p99, throughput = asyncio.run(run_load(200, 5, 10, 20))
+        self.assertLessEqual(p50, p99)
+        self.assertGreater(throughput, 0)
@@ -0,0 +1,544 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from exceptions import InvalidChoiceException, UnassignedQuizException
+from journal import Journal, read_events
+from metrics import Instrumentation
+from parallel import mark_quizzes_parallel
+from persistence import SQLiteRepository
+from solution import Course, Question, Student, Teacher
+from validation import answer_batch, assign_batch, enroll_batch
+from wrapping import original_method, unwrap_methods, wrap_method
+
+
+class TestJournal(TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.test_path = os.path.join(self.test_dir.name, "journal.bin")
+        self.test_journal = Journal(self.test_path)
+        self.test_journal.enable()
+
+    def tearDown(self):
+        self.test_journal.close()
+        self.test_dir.cleanup()
+
+    def record_term(self):
+        """Record a course whose quiz is answered, marked and graded."""
+        teacher = Teacher("John", "Doe", "TR25")
+        course = Course("Math", "HBZ5", 1, teacher)
+        quiz = teacher.create_quiz(
+            "Mid-term",
+            "MT-1",
+            course,
+            [
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+        students = [
+            Student("John", "Snow", "HB256"),
+            Student("Karl", "Drago", "HB250")
+        ]
+        teacher.enroll_many(iter(students), course)
+        quizzes = teacher.assign_quiz_to_cohort(quiz, students)
+        students[0].answer_quiz(quizzes[0], {1: "b", 2: "iii"})
+        students[1].answer_quiz(quizzes[1], {1: "b", 2: "ii"})
+        for student, student_quiz in zip(students, quizzes):
+            student.submit_quiz(student_quiz)
+        teacher.mark_quizzes(quizzes, {1: "b", 2: "iii"})
+        teacher.calculate_total_grades(course)
+        return teacher, students, quizzes
+
+    def reopen(self):
+        """Close the journal and open it again, replaying it."""
+        self.test_journal.close()
+        self.test_journal = Journal(self.test_path)
+        return self.test_journal
+
+    def test_replay(self):
+        """Test that replaying a journal rebuilds the model."""
+        self.record_term()
+        journal = self.reopen()
+        course = journal.courses[("HBZ5", 1)]
+
+        with self.subTest("Test the people and courses are rebuilt"):
+            self.assertEqual(sorted(journal.teachers), ["TR25"])
+            self.assertEqual(sorted(journal.students), ["HB250", "HB256"])
+            self.assertEqual(sorted(course.roster), ["HB250", "HB256"])
+
+        with self.subTest("Test the quizzes are rebuilt"):
+            self.assertEqual(
+                [quiz.grade for quiz in course.quizzes],
+                [None, 100, 50]
+            )
+            self.assertEqual(
+                [quiz.student.student_number for quiz in course.quizzes[1:]],
+                ["HB256", "HB250"]
+            )
+
+        with self.subTest("Test the total grades are rebuilt"):
+            self.assertEqual(
+                journal.students["HB256"].grades,
+                {("HBZ5", 1): "A"}
+            )
+            self.assertEqual(
+                journal.students["HB250"].grades,
+                {("HBZ5", 1): "D"}
+            )
+
+    def test_replay_failed_call(self):
+        """Test that a failed call is replayed up to the same failure."""
+        teacher = Teacher("John", "Doe", "TR25")
+        student = Student("John", "Snow", "HB256")
+        course = Course("Math", "HBZ5", 1, teacher)
+        student.enroll_into_course(course)
+        quiz = teacher.create_quiz(
+            "Mid-term",
+            "MT-1",
+            course,
+            [
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+        quiz = teacher.assign_quiz(quiz, student)
+        self.assertRaises(
+            InvalidChoiceException,
+            student.answer_quiz,
+            quiz,
+            {1: "b", 2: "iv"}
+        )
+        answers = quiz.submission.answers
+
+        journal = self.reopen()
+        self.assertEqual(
+            journal.courses[("HBZ5", 1)].quizzes[0].submission.answers,
+            answers
+        )
+
+    def test_replay_question_sets(self):
+        """Test that quizzes are replayed with their own question sets."""
+        teacher = Teacher("John", "Doe", "TR25")
+        student = Student("John", "Snow", "HB256")
+        course = Course("Math", "HBZ5", 1, teacher)
+        student.enroll_into_course(course)
+        questions = [
+            Question(1, choices=["a", "b", "c", "d"]),
+            Question(2, choices=["i", "ii", "iii"])
+        ]
+        teacher.create_quiz("Mid-term", "MT-1", course, questions)
+        teacher.create_quiz("Resit", "MT-2", course, questions)
+        final = teacher.create_quiz(
+            "Final",
+            "FN-1",
+            course,
+            [
+                Question(7, choices=["x", "y"]),
+                Question(8, choices=["u", "v", "w"])
+            ]
+        )
+        self.test_journal.disable()
+        mock = teacher.create_quiz("Mock", "MK-1", course, final.questions)
+        self.test_journal.enable()
+        quiz = teacher.assign_quiz(mock, student)
+        student.answer_quiz(quiz, {7: "y", 8: "w"})
+
+        journal = self.reopen()
+        quizzes = journal.courses[("HBZ5", 1)].quizzes
+
+        with self.subTest("Test a shared question set stays shared"):
+            self.assertIs(quizzes[0].questions, quizzes[1].questions)
+            self.assertEqual(
+                [question.number for question in quizzes[0].questions],
+                [1, 2]
+            )
+
+        with self.subTest("Test a separate question set stays separate"):
+            self.assertIsNot(quizzes[2].questions, quizzes[0].questions)
+            self.assertIs(quizzes[3].questions, quizzes[2].questions)
+            self.assertEqual(
+                [question.number for question in quizzes[3].questions],
+                [7, 8]
+            )
+            self.assertEqual(quizzes[3].submission.get_answer(8), "w")
+
+    def test_replay_batches(self):
+        """Test that the batch functions are journaled and replayed."""
+        teacher = Teacher("John", "Doe", "TR25")
+        course = Course("Math", "HBZ5", 1, teacher)
+        students = [
+            Student("John", "Snow", "HB256"),
+            Student("Karl", "Drago", "HB250")
+        ]
+        enroll_batch(teacher, students + students[:1], course)
+        quiz = teacher.create_quiz(
+            "Mid-term",
+            "MT-1",
+            course,
+            [
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+        quizzes = assign_batch(teacher, quiz, iter(students)).accepted
+        answer_batch([
+            (students[0], quizzes[0], 1, "b"),
+            (students[1], quizzes[1], 1, "a"),
+            (students[1], quizzes[1], 2, "iv")
+        ])
+        for student, student_quiz in zip(students, quizzes):
+            student.submit_quiz(student_quiz)
+        mark_quizzes_parallel(teacher, quizzes, {1: "b", 2: "iii"}, workers=1)
+        teacher.calculate_total_grades(course)
+
+        journal = self.reopen()
+        replayed = journal.courses[("HBZ5", 1)]
+        self.assertEqual(journal.replay_errors, [])
+        self.assertEqual(sorted(replayed.roster), ["HB250", "HB256"])
+        self.assertEqual(
+            [quiz.grade for quiz in replayed.quizzes],
+            [quiz.grade for quiz in course.quizzes]
+        )
+        self.assertEqual(
+            journal.teachers["TR25"].gradebook.course_grades(replayed),
+            teacher.gradebook.course_grades(course)
+        )
+
+    def test_existing_model(self):
+        """Test that objects first seen with state are replayed with it."""
+        self.test_journal.disable()
+        teacher, students, quizzes = self.record_term()
+        repository = SQLiteRepository(
+            os.path.join(self.test_dir.name, "term.db")
+        )
+        self.addCleanup(repository.close)
+        repository.save_term([teacher], students, [quizzes[0].course])
+        teachers, _, courses = repository.load_term()
+        course = courses[("HBZ5", 1)]
+        self.test_journal.enable()
+        Student("Mary", "Jane", "HB251").enroll_into_course(course)
+        teachers["TR25"].regrade_quizzes(course.quizzes[1:], {2: "ii"})
+
+        journal = self.reopen()
+        replayed = journal.courses[("HBZ5", 1)]
+        self.assertEqual(journal.replay_errors, [])
+
+        with self.subTest("Test the loaded state is replayed"):
+            self.assertEqual(
+                sorted(replayed.roster),
+                ["HB250", "HB251", "HB256"]
+            )
+            self.assertEqual(
+                [quiz.submission.get_answer(2) for quiz in replayed.quizzes],
+                [None, "iii", "ii"]
+            )
+
+        with self.subTest("Test the grades are replayed"):
+            self.assertEqual(
+                [quiz.grade for quiz in replayed.quizzes],
+                [None, 50, 100]
+            )
+            self.assertEqual(
+                journal.teachers["TR25"].gradebook.course_grades(replayed),
+                teachers["TR25"].gradebook.course_grades(course)
+            )
+
+    def test_replay_mismatch(self):
+        """Test that a call failing on replay is reported, not raised."""
+        teacher, students, quizzes = self.record_term()
+        template = quizzes[0].course.quizzes[0]
+        student = Student("Mary", "Jane", "HB251")
+        self.test_journal.disable()
+        teacher.assign_quiz(template, student)
+        self.test_journal.enable()
+        student.answer_quiz(template, {1: "a"})
+        students[0].answer_quiz(quizzes[0], {1: "a"})
+
+        journal = self.reopen()
+
+        with self.subTest("Test the mismatch is reported"):
+            self.assertEqual(
+                [
+                    (name, type(error))
+                    for name, _, error in journal.replay_errors
+                ],
+                [("Student.answer_quiz", UnassignedQuizException)]
+            )
+
+        with self.subTest("Test the later events are replayed"):
+            self.assertEqual(
+                journal.courses[("HBZ5", 1)].quizzes[1].submission
+                .get_answer(1),
+                "a"
+            )
+
+    def test_instrumentation_layers(self):
+        """Test that the journal and instrumentation wrap independently."""
+        instrumentation = Instrumentation()
+        original = original_method(Student, "enroll_into_course")
+        teacher = Teacher("John", "Doe", "TR25")
+        course = Course("Math", "HBZ5", 1, teacher)
+
+        with self.subTest("Test disabling instrumentation keeps journaling"):
+            instrumentation.enable()
+            instrumentation.disable()
+            Student("John", "Snow", "HB256").enroll_into_course(course)
+            self.test_journal.commit()
+            self.assertIn(
+                "Student.enroll_into_course",
+                [name for name, _ in read_events(self.test_path)]
+            )
+
+        with self.subTest("Test disabling journaling keeps instrumenting"):
+            self.test_journal.disable()
+            instrumentation.enable()
+            self.test_journal.enable()
+            self.test_journal.disable()
+            Student("Karl", "Drago", "HB250").enroll_into_course(course)
+            instrumentation.disable()
+            self.assertEqual(
+                instrumentation.stats["Student.enroll_into_course"].calls,
+                1
+            )
+            self.assertIs(vars(Student)["enroll_into_course"], original)
+
+    def test_checkpoint(self):
+        """Test that replaying starts from the last checkpoint."""
+        teacher, students, quizzes = self.record_term()
+        self.test_journal.checkpoint()
+        students[0].answer_quiz(quizzes[0], {1: "a"})
+        events = len(read_events(self.test_path))
+        journal = self.reopen()
+        course = journal.courses[("HBZ5", 1)]
+
+        with self.subTest("Test only events after the checkpoint replay"):
+            self.assertEqual(journal.replayed_events, 1)
+            self.assertEqual(len(read_events(self.test_path)), events + 1)
+
+        with self.subTest("Test the model is rebuilt"):
+            self.assertEqual(
+                [quiz.grade for quiz in course.quizzes],
+                [None, 100, 50]
+            )
+            self.assertEqual(course.quizzes[1].submission.get_answer(1), "a")
+            self.assertEqual(
+                journal.teachers["TR25"].gradebook.course_grades(course),
+                {"HB256": "A", "HB250": "D"}
+            )
+
+        with self.subTest("Test journaling continues after the checkpoint"):
+            journal.enable()
+            journal.teachers["TR25"].create_quiz(
+                "Final",
+                "FN-1",
+                course,
+                course.quizzes[0].questions
+            )
+            journal = self.reopen()
+            course = journal.courses[("HBZ5", 1)]
+            self.assertIs(
+                course.quizzes[-1].questions,
+                course.quizzes[0].questions
+            )
+
+    def test_concurrent_calls(self):
+        """Test that a running call only holds up calls on its objects."""
+        teacher, students, quizzes = self.record_term()
+        course = Course("Physics", "HBZ6", 1, teacher)
+        student = Student("Mary", "Jane", "HB251")
+        answering_locks = set(self.test_journal._ordering_locks_of(
+            1,
+            students[1],
+            (quizzes[1],),
+            {}
+        ))
+        while answering_locks & set(self.test_journal._ordering_locks_of(
+            0,
+            student,
+            (course,),
+            {}
+        )):
+            course = Course("Physics", "HBZ6", 1, teacher)
+            student = Student("Mary", "Jane", "HB251")
+        started = threading.Event()
+        release = threading.Event()
+
+        def wrap(method):
+            def enroll_into_course(student, course):
+                started.set()
+                release.wait()
+                return method(student, course)
+            return enroll_into_course
+
+        # the journal wraps the blocking layer, so the call blocks inside it
+        self.test_journal.disable()
+        wrap_method(Student, "enroll_into_course", self, wrap)
+        self.addCleanup(unwrap_methods, self)
+        self.test_journal.enable()
+        enrolling = threading.Thread(
+            target=student.enroll_into_course,
+            args=(course,)
+        )
+        enrolling.start()
+        started.wait()
+
+        def answer_and_checkpoint():
+            students[1].answer_quiz(quizzes[1], {1: "a"})
+            self.test_journal.checkpoint()
+
+        answering = threading.Thread(target=answer_and_checkpoint)
+        answering.start()
+        answering.join(5)
+        finished = not answering.is_alive()
+        release.set()
+        enrolling.join()
+        answering.join()
+
+        with self.subTest("Test the other call and checkpoint finish"):
+            self.assertTrue(finished)
+
+        with self.subTest("Test both calls are replayed"):
+            journal = self.reopen()
+            self.assertEqual(
+                sorted(journal.courses[("HBZ6", 1)].roster),
+                ["HB251"]
+            )
+            self.assertEqual(
+                journal.courses[("HBZ5", 1)].quizzes[2].submission
+                .get_answer(1),
+                "a"
+            )
+
+    def test_read_events(self):
+        """Test that the committed events are read back in order."""
+        teacher = Teacher("John", "Doe", "TR25")
+        student = Student("John", "Snow", "HB256")
+        student.enroll_into_course(Course("Math", "HBZ5", 1, teacher))
+        self.test_journal.commit()
+
+        self.assertEqual(
+            [name for name, _ in read_events(self.test_path)],
+            [
+                "define_student",
+                "define_teacher",
+                "define_course",
+                "Student.enroll_into_course"
+            ]
+        )
+
+    def test_group_commit(self):
+        """Test that events are committed in groups."""
+        self.test_journal.close()
+        self.test_journal = Journal(
+            self.test_path,
+            max_batch_events=6,
+            max_delay=60
+        )
+        self.test_journal.enable()
+        teacher = Teacher("John", "Doe", "TR25")
+        course = Course("Math", "HBZ5", 1, teacher)
+
+        with self.subTest("Test nothing is committed below the size"):
+            Student("John", "Snow", "HB256").enroll_into_course(course)
+            self.assertEqual(self.test_journal.commits, 0)
+            self.assertEqual(os.path.getsize(self.test_path), 0)
+
+        with self.subTest("Test reaching the size commits the group"):
+            Student("Karl", "Drago", "HB250").enroll_into_course(course)
+            self.assertEqual(self.test_journal.commits, 1)
+            self.assertEqual(len(read_events(self.test_path)), 6)
+
+        with self.subTest("Test the time threshold commits the group"):
+            self.test_journal.close()
+            self.test_journal = Journal(self.test_path, max_delay=0.01)
+            self.test_journal.enable()
+            Student("Mary", "Jane", "HB251").enroll_into_course(
+                self.test_journal.courses[("HBZ5", 1)]
+            )
+            time.sleep(0.2)
+            self.assertGreaterEqual(self.test_journal.commits, 1)
+            self.assertEqual(len(read_events(self.test_path)), 8)
+
+    def test_iterable_arguments(self):
+        """Test that iterable arguments are journaled as lists."""
+        teacher = Teacher("John", "Doe", "TR25")
+        course = Course("Math", "HBZ5", 1, teacher)
+        students = {
+            "HB256": Student("John", "Snow", "HB256"),
+            "HB250": Student("Karl", "Drago", "HB250")
+        }
+        teacher.enroll_many(students.values(), course)
+        self.test_journal.commit()
+
+        self.assertEqual(self.test_journal.errors, [])
+        self.assertEqual(
+            read_events(self.test_path)[-1],
+            (
+                "Teacher.enroll_many",
+                (("t", "TR25"), [[("s", "HB256"), ("s", "HB250")], ("c", 0)],
+                 None, False)
+            )
+        )
+        journal = self.reopen()
+        self.assertEqual(
+            sorted(journal.courses[("HBZ5", 1)].roster),
+            ["HB250", "HB256"]
+        )
+
+    def test_unpicklable_event(self):
+        """Test that an event that cannot be pickled is left out."""
+        teacher, students, quizzes = self.record_term()
+        self.assertRaises(
+            InvalidChoiceException,
+            students[0].answer_quiz,
+            quizzes[0],
+            {1: lambda: "b"}
+        )
+        students[0].answer_quiz(quizzes[0], {1: "a"})
+        time.sleep(0.2)
+
+        with self.subTest("Test the committer reports the event"):
+            self.assertTrue(self.test_journal._committer.is_alive())
+            self.assertEqual(
+                [name for name, _ in self.test_journal.errors],
+                ["Student.answer_quiz"]
+            )
+
+        with self.subTest("Test the other events are committed"):
+            name, (_, args, _, failed) = read_events(self.test_path)[-1]
+            self.assertEqual((name, args[1], failed), (
+                "Student.answer_quiz",
+                {1: "a"},
+                False
+            ))
+
+    def test_torn_frame(self):
+        """Test that a torn frame at the end of a journal is cut off."""
+        self.record_term()
+        self.test_journal.close()
+        size = os.path.getsize(self.test_path)
+        events = len(read_events(self.test_path))
+        with open(self.test_path, "ab") as journal:
+            journal.write(b"\x40\x00\x00\x00\x00\x00\x00\x00torn")
+
+        with self.subTest("Test reading ignores the torn frame"):
+            self.assertEqual(len(read_events(self.test_path)), events)
+
+        with self.subTest("Test replaying cuts the torn frame off"):
+            self.test_journal = Journal(self.test_path)
+            self.assertEqual(self.test_journal.replayed_events, events)
+            self.assertEqual(os.path.getsize(self.test_path), size)
+
+    def test_enable_disable(self):
+        """Test that disabling the journal puts the methods back."""
+        self.test_journal.disable()
+        self.assertFalse(self.test_journal.enabled)
+        Student("John", "Snow", "HB256").enroll_into_course(
+            Course("Math", "HBZ5", 1, Teacher("John", "Doe", "TR25"))
+        )
+        self.test_journal.commit()
+        self.assertEqual(read_events(self.test_path), [])
@@ -0,0 +1,83 @@
+from unittest import TestCase
+
+from exceptions import InvalidQuizException
+from metrics import Instrumentation
+from solution import Course, Question, Student, Teacher
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_student = Student("John", "Snow", "HB256")
+        self.test_course = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course,
+            questions=[
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+        self.test_instrumentation = Instrumentation(sample_size=2)
+
+    def tearDown(self):
+        self.test_instrumentation.disable()
+
+    def test_instrumentation(self):
+        """Test that public method calls are measured when enabled."""
+        original = Teacher.assign_quiz
+
+        with self.subTest("Test methods are wrapped only when enabled"):
+            self.test_instrumentation.enable()
+            self.assertIsNot(Teacher.assign_quiz, original)
+            self.test_instrumentation.disable()
+            self.assertIs(Teacher.assign_quiz, original)
+
+        with self.subTest("Test calls, items and failures are recorded"):
+            self.test_instrumentation.enable()
+            self.test_teacher.assign_quiz(self.test_quiz, self.test_student)
+            for _ in range(3):
+                self.test_student.answer_quiz(
+                    self.test_quiz,
+                    [{1: "b"}, {2: "ii"}]
+                )
+            self.assertRaises(
+                InvalidQuizException,
+                self.test_teacher.grade_quiz,
+                "Quiz"
+            )
+            snapshot = self.test_instrumentation.snapshot()
+
+            self.assertEqual(
+                sorted(snapshot),
+                ["Student.answer_quiz", "Teacher.assign_quiz",
+                 "Teacher.grade_quiz"]
+            )
+            self.assertEqual(snapshot["Student.answer_quiz"]["calls"], 3)
+            self.assertEqual(snapshot["Student.answer_quiz"]["items"], 6)
+            self.assertEqual(snapshot["Teacher.grade_quiz"]["calls"], 1)
+            self.assertEqual(
+                len(
+                    self.test_instrumentation.stats[
+                        "Student.answer_quiz"
+                    ].latencies
+                ),
+                2
+            )
+
+        with self.subTest("Test stats are exported"):
+            self.assertIn(
+                'submission_method_calls_total{method="Student.answer_quiz"} 3',  # noqa: E501
+                self.test_instrumentation.to_prometheus()
+            )
+            self.assertIn(
+                '"Teacher.assign_quiz"',
+                self.test_instrumentation.to_json()
+            )
+
+        with self.subTest("Test stats can be reset"):
+            self.test_instrumentation.reset()
+            self.assertEqual(self.test_instrumentation.snapshot(), {})
+            self.assertTrue(self.test_instrumentation.enabled)
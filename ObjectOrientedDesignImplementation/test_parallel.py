@@ -0,0 +1,98 @@
+import random
+from unittest import TestCase
+from unittest.mock import patch
+
+from exceptions import UnsubmittedQuizException
+from parallel import mark_quizzes_parallel
+from solution import Course, Question, Student, Teacher, _hold_quiz_locks
+
+
+class TestParallel(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_course = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_questions = [
+            Question(number, choices=["a", "b", "c", "d"])
+            for number in range(1, 11)
+        ]
+        self.test_guide = {number: "a" for number in range(1, 11)}
+
+    def create_cohort(self, size):
+        quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course,
+            questions=self.test_questions
+        )
+        students = [
+            Student("John", "Snow", "HB{}".format(number))
+            for number in range(size)
+        ]
+        quizzes = self.test_teacher.assign_quiz_to_cohort(quiz, students)
+        answers = random.Random(size)
+        for student, quiz in zip(students, quizzes):
+            student.answer_quiz(quiz, {
+                number: answers.choice("abcd") for number in range(1, 11)
+            })
+            student.submit_quiz(quiz)
+        return quizzes
+
+    def test_mark_quizzes_parallel(self):
+        """Test that parallel marking matches serial marking."""
+        with self.subTest("Test parallel marking fails on unsubmitted quiz"):
+            quiz = self.test_teacher.create_quiz(
+                quiz_name="Mid-term",
+                quiz_code="MT-1",
+                course=self.test_course,
+                questions=self.test_questions
+            )
+            self.assertRaises(
+                UnsubmittedQuizException,
+                mark_quizzes_parallel,
+                self.test_teacher,
+                [quiz],
+                self.test_guide
+            )
+
+        with self.subTest("Test parallel marking matches serial marking"):
+            serial_quizzes = self.create_cohort(50)
+            parallel_quizzes = self.create_cohort(50)
+            self.test_teacher.mark_quizzes(serial_quizzes, self.test_guide)
+            mark_quizzes_parallel(
+                self.test_teacher,
+                parallel_quizzes,
+                self.test_guide,
+                workers=2,
+                shard_size=7
+            )
+
+            for serial, parallel in zip(serial_quizzes, parallel_quizzes):
+                self.assertEqual(
+                    serial.submission.answer_results,
+                    parallel.submission.answer_results
+                )
+                self.assertEqual(serial.grade, parallel.grade)
+                self.assertTrue(parallel.marked and parallel.teacher_graded)
+
+    def test_answer_during_parallel_marking(self):
+        """Test that answers given while workers mark are not overwritten."""
+        quizzes = self.create_cohort(20)
+        holds = []
+
+        def hold_quiz_locks():
+            # answer again just before the results are written back
+            if holds:
+                quizzes[0].student.answer_quiz(quizzes[0], self.test_guide)
+            holds.append(True)
+            return _hold_quiz_locks()
+
+        with patch("parallel._hold_quiz_locks", hold_quiz_locks):
+            mark_quizzes_parallel(
+                self.test_teacher,
+                quizzes,
+                self.test_guide,
+                workers=2
+            )
+        self.assertEqual(list(quizzes[0].submission.answer_results), [1] * 10)
+        self.assertEqual(quizzes[0].grade, 100)
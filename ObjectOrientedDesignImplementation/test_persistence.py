@@ -0,0 +1,171 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from persistence import SQLiteRepository
+from solution import (
+    Course,
+    Gradebook,
+    GradingStandard,
+    Question,
+    Student,
+    Teacher
+)
+
+
+class TestPersistence(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_student = Student("John", "Snow", "HB256")
+        self.test_student_two = Student("Karl", "Drago", "HB250")
+        self.test_course_one = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_course_two = Course(
+            "Art",
+            "HBA1",
+            1,
+            self.test_teacher,
+            GradingStandard({"Pass": 50, "Fail": 0})
+        )
+        self.test_teacher.enroll_many(
+            [self.test_student, self.test_student_two],
+            self.test_course_one
+        )
+        self.test_student.enroll_into_course(self.test_course_two)
+
+        quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course_one,
+            questions=[
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+        quiz_one, quiz_two = self.test_teacher.assign_quiz_to_cohort(
+            quiz,
+            [self.test_student, self.test_student_two]
+        )
+        self.test_student.answer_quiz(quiz_one, {1: "b", 2: "ii"})
+        self.test_student.submit_quiz(quiz_one)
+        self.test_student_two.answer_quiz(quiz_two, {1: "c"})
+        self.test_teacher.mark_quizzes([quiz_one], {1: "b", 2: "iii"})
+        self.test_teacher.calculate_total_grades(self.test_course_one)
+
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.test_repository = SQLiteRepository(
+            os.path.join(self.test_dir.name, "term.db"),
+            pool_size=2
+        )
+        self.test_repository.save_term(
+            [self.test_teacher],
+            [self.test_student, self.test_student_two],
+            [self.test_course_one, self.test_course_two]
+        )
+
+    def tearDown(self):
+        self.test_repository.close()
+        self.test_dir.cleanup()
+
+    def test_load_term(self):
+        """Test that a saved term is loaded back."""
+        teachers, students, courses = self.test_repository.load_term()
+        student = students["HB256"]
+        student_two = students["HB250"]
+        course = courses[("HBZ5", 1)]
+
+        with self.subTest("Test enrollments are loaded"):
+            self.assertEqual(list(course.roster), ["HB256", "HB250"])
+            self.assertEqual(
+                sorted(student.enrolled_courses),
+                [("HBA1", 1), ("HBZ5", 1)]
+            )
+
+        with self.subTest("Test custom grading standards are loaded"):
+            self.assertEqual(
+                courses[("HBA1", 1)].grading_standard.bands,
+                {"Pass": 50, "Fail": 0}
+            )
+
+        with self.subTest("Test quizzes and answers are loaded"):
+            template, quiz_one, quiz_two = course.quizzes
+            self.assertEqual(template.student, None)
+            self.assertIs(quiz_one.student, student)
+            self.assertIs(quiz_one.questions, quiz_two.questions)
+            self.assertEqual(quiz_one.submission.get_answer(2), "ii")
+            self.assertTrue(quiz_one.submission.get_answer_result(1))
+            self.assertEqual(quiz_two.submission.get_answer(1), "c")
+            self.assertFalse(quiz_two.submitted)
+
+        with self.subTest("Test grades are loaded"):
+            self.assertEqual(quiz_one.grade, 50)
+            self.assertEqual(course.grade_totals[student], [50, 1])
+            self.assertEqual(course.current_grade(student_two), None)
+            self.assertEqual(
+                teachers["TR25"].gradebook.get(student, course),
+                "D"
+            )
+            self.assertEqual(student.grades, {("HBZ5", 1): "D"})
+
+    def test_grades_follow_course_teacher(self):
+        """Test that saved grades stay with the course teacher."""
+        substitute = Teacher("Jane", "Roe", "TR26")
+        quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course_two,
+            questions=[
+                Question(1, choices=["a", "b"]),
+                Question(2, choices=["a", "b"])
+            ]
+        )
+        quiz = self.test_teacher.assign_quiz(quiz, self.test_student)
+        self.test_student.answer_quiz(quiz, {1: "a", 2: "a"})
+        self.test_student.submit_quiz(quiz)
+        substitute.mark_quizzes([quiz], {1: "a", 2: "a"})
+        substitute.calculate_total_grade(
+            self.test_student,
+            self.test_course_two
+        )
+        self.test_repository.save_term(
+            [self.test_teacher, substitute],
+            [self.test_student, self.test_student_two],
+            [self.test_course_one, self.test_course_two]
+        )
+
+        with self.subTest("Test grades load into the course teacher"):
+            teachers, students, _ = self.test_repository.load_term()
+            self.assertEqual(
+                sorted(teachers["TR25"].gradebook.export()),
+                sorted(self.test_teacher.gradebook.export())
+            )
+            self.assertEqual(teachers["TR26"].gradebook.export(), [])
+
+        with self.subTest("Test loaded teachers can share a gradebook"):
+            gradebook = Gradebook()
+            teachers, students, _ = self.test_repository.load_term(gradebook)
+            self.assertIs(teachers["TR26"].gradebook, gradebook)
+            self.assertEqual(
+                gradebook.student_grades(students["HB256"]),
+                {("HBZ5", 1): "D", ("HBA1", 1): "Pass"}
+            )
+
+    def test_lookups(self):
+        """Test stored rows are looked up by student number and course."""
+        self.assertEqual(
+            self.test_repository.find_student("HB250"),
+            ("HB250", "Karl", "Drago")
+        )
+        self.assertEqual(
+            self.test_repository.find_course("HBZ5", 1),
+            ("HBZ5", 1, "Math", "TR25")
+        )
+        self.assertEqual(self.test_repository.find_student("HB999"), None)
+        self.assertEqual(
+            self.test_repository.find_student_grades("HB256"),
+            {("HBZ5", 1): "D"}
+        )
+        self.assertEqual(
+            self.test_repository.find_course_grades("HBZ5", 1),
+            {"HB256": "D"}
+        )
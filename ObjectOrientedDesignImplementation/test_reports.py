@@ -0,0 +1,97 @@
+import statistics
+from unittest import TestCase
+
+from exceptions import InvalidCourseException
+from reports import GradeHistogram, course_statistics, grade_statistics
+from solution import Course, GradingStandard, Question, Student, Teacher
+
+
+class TestReports(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_course_one = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_course_two = Course(
+            "Science",
+            "HBS4",
+            1,
+            self.test_teacher,
+            GradingStandard({"Pass": 50, "Fail": 0})
+        )
+        self.test_questions = [
+            Question(number, choices=["a", "b"])
+            for number in range(1, 5)
+        ]
+        for course, sheets in (
+            (self.test_course_one, ["aaaa", "aaab", "abbb", "aabb"]),
+            (self.test_course_two, ["aaaa", "bbbb"])
+        ):
+            quiz = self.test_teacher.create_quiz(
+                quiz_name="Mid-term",
+                quiz_code="MT-1",
+                course=course,
+                questions=self.test_questions
+            )
+            students = [
+                Student("John", "Snow", "HB{}".format(number))
+                for number in range(len(sheets))
+            ]
+            quizzes = self.test_teacher.assign_quiz_to_cohort(
+                quiz,
+                students
+            )
+            for quiz, sheet in zip(quizzes, sheets):
+                quiz.student.answer_quiz(quiz, dict(enumerate(sheet, 1)))
+                quiz.student.submit_quiz(quiz)
+            self.test_teacher.mark_quizzes(
+                quizzes,
+                {number: "a" for number in range(1, 5)}
+            )
+
+    def test_grade_histogram(self):
+        """Test that histogram summaries match the statistics module."""
+        grades = [0, 20, 20, 35, 50, 50, 50, 71, 90, 100]
+        histogram = GradeHistogram({
+            grade: grades.count(grade) for grade in set(grades)
+        })
+        self.assertEqual(histogram.count, 10)
+        self.assertEqual(histogram.mean(), statistics.mean(grades))
+        self.assertAlmostEqual(histogram.stdev(), statistics.pstdev(grades))
+        self.assertEqual(histogram.percentile(50), statistics.median(grades))
+        self.assertEqual(histogram.percentile(0), 0)
+        self.assertEqual(histogram.percentile(100), 100)
+        self.assertEqual(histogram.percentile(25), 23.75)
+        self.assertEqual(GradeHistogram({}).mean(), None)
+
+    def test_course_statistics(self):
+        """Test that course grades are summarised."""
+        with self.subTest("Test statistics fail with invalid course"):
+            self.assertRaises(
+                InvalidCourseException,
+                course_statistics,
+                "Course"
+            )
+
+        with self.subTest("Test a course is summarised"):
+            report = course_statistics(self.test_course_one, (25, 75))
+            self.assertEqual(report["courses"], [("HBZ5", 1)])
+            self.assertEqual(report["students"], 4)
+            self.assertEqual(report["quizzes"], 4)
+            self.assertEqual(report["mean"], 62.5)
+            self.assertEqual(report["median"], 62.5)
+            self.assertEqual(report["percentiles"], {25: 43.75, 75: 81.25})
+            self.assertEqual(
+                report["bands"],
+                {"A": 1, "B": 1, "C": 0, "D": 1, "E": 0, "F": 1}
+            )
+
+        with self.subTest("Test many courses are summarised together"):
+            report = grade_statistics([
+                self.test_course_one,
+                self.test_course_two
+            ])
+            self.assertEqual(report["quizzes"], 6)
+            self.assertEqual(report["bands"]["A"], 1)
+            self.assertEqual(report["bands"]["F"], 1)
+            self.assertEqual(report["bands"]["Pass"], 1)
+            self.assertEqual(report["bands"]["Fail"], 1)
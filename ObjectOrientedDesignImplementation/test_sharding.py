@@ -0,0 +1,133 @@
+import tempfile
+from unittest import TestCase
+
+from exceptions import (
+    InvalidCourseException,
+    InvalidQuizException,
+    UnassignedQuizException
+)
+from sharding import ShardRouter
+from solution import Course, Question, Student, Teacher
+
+
+def count_graded_quizzes(shard):
+    """Return the number of graded quizzes of a shard."""
+    return len(shard.course.quiz_grades())
+
+
+class TestSharding(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_student = Student("John", "Snow", "HB256")
+        self.test_student_two = Student("Karl", "Drago", "HB250")
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.test_router = ShardRouter(
+            self.test_dir.name,
+            max_loaded_shards=1
+        )
+        for semester in (1, 2):
+            shard = self.test_router.add_course(
+                Course("Math", "HBZ5", semester, self.test_teacher)
+            )
+            shard.enroll([self.test_student, self.test_student_two])
+            shard.create_quiz(
+                "Mid-term",
+                "MT-1",
+                [
+                    Question(1, choices=["a", "b", "c", "d"]),
+                    Question(2, choices=["i", "ii", "iii"])
+                ]
+            )
+            shard.assign_quiz("MT-1")
+
+    def tearDown(self):
+        self.test_router.close()
+        self.test_dir.cleanup()
+
+    def grade_semester(self, semester):
+        """Answer, mark and grade the quizzes of a semester."""
+        for student_number, answers in (
+            ("HB256", {1: "b", 2: "ii"}),
+            ("HB250", {1: "b", 2: "iii"})
+        ):
+            shard = self.test_router.shard("HBZ5", semester)
+            shard.answer_quiz(student_number, "MT-1", answers)
+            shard.submit_quiz(student_number, "MT-1")
+        shard = self.test_router.shard("HBZ5", semester)
+        shard.mark_quizzes("MT-1", {1: "b", 2: "iii"})
+        return shard.calculate_total_grades()
+
+    def test_routing(self):
+        """Test that operations are routed to the shard of the course."""
+        with self.subTest("Test routing fails for an unknown course"):
+            self.assertRaises(
+                InvalidCourseException,
+                self.test_router.shard,
+                "HBS4",
+                1
+            )
+
+        with self.subTest("Test adding a course twice fails"):
+            self.assertRaises(
+                InvalidCourseException,
+                self.test_router.add_course,
+                Course("Math", "HBZ5", 1, self.test_teacher)
+            )
+
+        with self.subTest("Test unknown quizzes are rejected"):
+            shard = self.test_router.shard("HBZ5", 1)
+            self.assertRaises(
+                UnassignedQuizException,
+                shard.answer_quiz,
+                "HB256",
+                "MT-2",
+                {1: "a"}
+            )
+            self.assertRaises(InvalidQuizException, shard.assign_quiz, "MT-2")
+
+        with self.subTest("Test shards are graded separately"):
+            self.assertEqual(
+                self.grade_semester(1),
+                {"HB256": "D", "HB250": "A"}
+            )
+            self.assertEqual(
+                self.test_router.shard_keys,
+                [(1, "HBZ5"), (2, "HBZ5")]
+            )
+            self.assertEqual(
+                self.test_router.shard("HBZ5", 2).calculate_total_grades(),
+                {}
+            )
+            self.assertEqual(
+                self.test_router.student_grades("HB256"),
+                {("HBZ5", 1): "D"}
+            )
+
+    def test_reopening(self):
+        """Test that shards are stored and loaded again."""
+        self.grade_semester(2)
+        self.test_router.close()
+
+        router = ShardRouter(self.test_dir.name)
+        shard = router.shard("HBZ5", 2)
+        self.assertEqual(
+            shard.find_quiz("HB250", "MT-1").submission.get_answer(2),
+            "iii"
+        )
+        self.assertEqual(shard.course.current_grade(
+            shard.course.roster["HB256"]
+        ), "D")
+        self.assertEqual(
+            router.student_grades("HB250"),
+            {("HBZ5", 2): "A"}
+        )
+        router.close()
+
+    def test_process_shards(self):
+        """Test that shards can be processed by worker processes."""
+        self.grade_semester(1)
+        self.assertEqual(
+            self.test_router.process_shards(count_graded_quizzes, workers=2),
+            {(1, "HBZ5"): 2, (2, "HBZ5"): 0}
+        )
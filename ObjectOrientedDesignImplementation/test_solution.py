@@ -1,3 +1,5 @@
+from array import array
+import gc
 from unittest import TestCase
 
 from exceptions import (
@@ -5,12 +7,14 @@ from exceptions import (
     InvalidChoiceException,
     InvalidCourseException,
     InvalidCourseTeacherException,
+    InvalidGradingStandardException,
     InvalidNumberOfQuestionsException,
     InvalidQuestionException,
     InvalidQuizException,
     InvalidVerificationException,
     InvalidStudentException,
     MultipleChoicesException,
+    TooManyChoicesException,
     UnassignedQuizException,
     UnEnrolledCourseException,
     UnmarkedQuizException,
@@ -19,7 +23,11 @@ from exceptions import (
 
 
 from solution import (
+    _CHOICES,
+    _QUESTION_SETS,
+    COURSE_GRADING_STANDARD,
     Course,
+    GradingStandard,
     Question,
     Student,
     Teacher
@@ -115,9 +123,13 @@ class TestSolution(TestCase):
         """Test if a student can enrol into a course(class)."""
         with self.subTest("Test that a student enrols sucessfully"):
             self.assertEqual(
-                self.test_student.enrolled_courses[0].course_name,
+                self.test_student.enrolled_courses[("HBZ5", 1)].course_name,
                 "Math"
             )
+            self.assertIs(
+                self.test_course_one.roster["HB256"],
+                self.test_student
+            )
 
         with self.subTest("Test that a enrollment fails with invalid Course"):
             self.assertRaises(
@@ -133,13 +145,74 @@ class TestSolution(TestCase):
                 self.test_course_one
             )
 
+    def test_enroll_many(self):
+        """Test that a teacher can enrol many students into a course."""
+        with self.subTest("Test enrolling fails with invalid Course"):
+            self.assertRaises(
+                InvalidCourseException,
+                self.test_teacher.enroll_many,
+                [self.test_student_two],
+                "Course"
+            )
+
+        with self.subTest("Test enrolling fails with invalid Student"):
+            self.assertRaises(
+                InvalidStudentException,
+                self.test_teacher.enroll_many,
+                [self.test_student_two, "Student"],
+                self.test_course_two
+            )
+            self.assertEqual(self.test_course_two.roster, {})
+
+        with self.subTest("Test enrolling fails if already enrolled"):
+            self.assertRaises(
+                AlreadyEnrolledException,
+                self.test_teacher.enroll_many,
+                [self.test_student_two, self.test_student],
+                self.test_course_one
+            )
+            self.assertEqual(list(self.test_course_one.roster), ["HB256"])
+
+        with self.subTest("Test enrolling many students is successful"):
+            self.test_teacher.enroll_many(
+                [self.test_student, self.test_student_two],
+                self.test_course_two
+            )
+            self.assertEqual(
+                list(self.test_course_two.roster),
+                ["HB256", "HB250"]
+            )
+            self.assertIn(("HBS4", 2), self.test_student_two.enrolled_courses)
+
     def test_question_creation(self):
         """Test the creation of a question."""
         with self.subTest("Test question creation is successful"):
             self.assertTrue(isinstance(self.test_question_one, Question))
             self.assertEqual(
                 self.test_question_one.choices,
-                ["a", "b", "c", "d"]
+                ("a", "b", "c", "d")
+            )
+
+        with self.subTest("Test questions share identical choices"):
+            question = Question(3, choices=["a", "b", "c", "d"])
+            self.assertIs(question.choices, self.test_question_one.choices)
+            self.assertIs(
+                question.choice_codes,
+                self.test_question_one.choice_codes
+            )
+
+        with self.subTest("Test choices are compiled into answer codes"):
+            self.assertEqual(
+                self.test_question_two.choice_codes,
+                {"i": 0, "ii": 1, "iii": 2}
+            )
+
+        with self.subTest("Test creation fails with too many choices"):
+            self.assertRaises(
+                TooManyChoicesException,
+                Question,
+                5,
+                [str(choice) for choice in range(128)]
             )
 
         with self.subTest("Test creation fails when choices are less than 2"):
@@ -150,6 +223,27 @@ class TestSolution(TestCase):
         with self.subTest("Test quiz is created successfully"):
             self.assertEqual(self.test_quiz.quiz_name, "Mid-term")
 
+        with self.subTest("Test interned questions are freed with quizzes"):
+            gc.collect()
+            question_sets = len(_QUESTION_SETS)
+            choices = len(_CHOICES)
+            quiz = self.test_teacher.create_quiz(
+                "Mid-term",
+                "MT-2",
+                self.test_course_two,
+                [
+                    Question(1, choices=["yes", "no"]),
+                    Question(2, choices=["yes", "no", "maybe"])
+                ]
+            )
+            self.assertEqual(len(_QUESTION_SETS), question_sets + 1)
+            self.assertEqual(len(_CHOICES), choices + 2)
+            self.test_course_two.quizzes.remove(quiz)
+            del quiz
+            gc.collect()
+            self.assertEqual(len(_QUESTION_SETS), question_sets)
+            self.assertEqual(len(_CHOICES), choices)
+
         with self.subTest("Test quiz creation fails on missing paramater"):
             self.assertRaises(
                 TypeError,
@@ -188,6 +282,31 @@ class TestSolution(TestCase):
                 ["question1", "question2", "question3"]
             )
 
+    def test_find_invalid_answers(self):
+        """Test that a matrix of answer codes is validated in bulk."""
+        with self.subTest("Test valid answer codes are accepted"):
+            self.assertEqual(
+                self.test_quiz.find_invalid_answers(
+                    bytes([0, 2, 3, 0]) + bytes([255, 255])
+                ),
+                []
+            )
+
+        with self.subTest("Test invalid answer codes are found"):
+            self.assertEqual(
+                self.test_quiz.find_invalid_answers(
+                    array("b", [4, 0, 1, 3, -2, -1])
+                ),
+                [(0, 1), (1, 2), (2, 1)]
+            )
+
+        with self.subTest("Test a partial row of answer codes fails"):
+            self.assertRaises(
+                InvalidNumberOfQuestionsException,
+                self.test_quiz.find_invalid_answers,
+                bytes([0, 2, 9])
+            )
+
     def test_assigning_quiz(self):
         """Test that a student can be assigned a quiz by a teacher."""
         with self.subTest("Test Assigning a quiz fails with invalid Quiz"):
@@ -220,6 +339,45 @@ class TestSolution(TestCase):
                 self.test_student.last_name
             )
 
+    def test_assigning_quiz_to_cohort(self):
+        """Test that a quiz can be assigned to a cohort of students."""
+        with self.subTest("Test cohort assigning fails with invalid Quiz"):
+            self.assertRaises(
+                InvalidQuizException,
+                self.test_teacher.assign_quiz_to_cohort,
+                "Quiz",
+                [self.test_student]
+            )
+
+        with self.subTest("Test cohort assigning fails with invalid Student"):
+            self.assertRaises(
+                InvalidStudentException,
+                self.test_teacher.assign_quiz_to_cohort,
+                self.test_quiz,
+                [self.test_student, "Student"]
+            )
+            self.assertEqual(len(self.test_course_one.quizzes), 3)
+
+        with self.subTest("Test cohort assigning is successful"):
+            quiz_one, quiz_two = self.test_teacher.assign_quiz_to_cohort(
+                self.test_quiz,
+                [self.test_student, self.test_student_two]
+            )
+            self.assertIs(quiz_one.student, self.test_student)
+            self.assertIs(quiz_two.student, self.test_student_two)
+            self.assertIs(quiz_one.questions, self.test_quiz.questions)
+            self.assertEqual(self.test_quiz.student, None)
+            self.assertEqual(self.test_course_one.quizzes[-2:], [
+                quiz_one,
+                quiz_two
+            ])
+
+        with self.subTest("Test cohort quizzes are answered separately"):
+            self.test_student.answer_quiz(quiz_one, {1: "a", 2: "i"})
+            self.test_student_two.answer_quiz(quiz_two, {1: "b", 2: "ii"})
+            self.assertEqual(quiz_one.submission.get_answer(1), "a")
+            self.assertEqual(quiz_two.submission.get_answer(1), "b")
+
     def test_answer_quiz(self):
         """Test that a stdudent can answer a quiz."""
         with self.subTest("Test answering fails when quiz is invalid"):
@@ -261,8 +419,14 @@ class TestSolution(TestCase):
                 self.test_quiz,
                 [{1: "II"}, {2: "x"}]
             )
-            self.assertEqual(self.test_question_one.answer, None)
-            self.assertEqual(self.test_question_two.answer, None)
+            self.assertRaises(
+                InvalidChoiceException,
+                self.test_student.answer_quiz,
+                self.test_quiz,
+                {1: ["b"]}
+            )
+            self.assertEqual(self.test_quiz.submission.get_answer(1), None)
+            self.assertEqual(self.test_quiz.submission.get_answer(2), None)
 
         with self.subTest("Test that answering is successful"):
             self.test_student.answer_quiz(
@@ -270,8 +434,26 @@ class TestSolution(TestCase):
                 [{1: "b"}, {2: "ii"}]
             )
 
-            self.assertEqual(self.test_question_one.answer, "b")
-            self.assertEqual(self.test_question_two.answer, "ii")
+            self.assertEqual(self.test_quiz.submission.get_answer(1), "b")
+            self.assertEqual(self.test_quiz.submission.get_answer(2), "ii")
+
+        with self.subTest("Test answering accepts a mapping of answers"):
+            self.test_student.answer_quiz(
+                self.test_quiz,
+                {1: "c", 2: "iii"}
+            )
+
+            self.assertEqual(self.test_quiz.submission.get_answer(1), "c")
+            self.assertEqual(self.test_quiz.submission.get_answer(2), "iii")
+
+        with self.subTest("Test answers are kept apart for shared questions"):
+            self.test_student_two.answer_quiz(
+                self.test_quiz_two,
+                {1: "a", 2: "i"}
+            )
+
+            self.assertEqual(self.test_quiz.submission.get_answer(1), "c")
+            self.assertEqual(self.test_quiz_two.submission.get_answer(1), "a")
 
     def test_submit_quiz(self):
         """Test that a student can submit a quiz."""
@@ -343,10 +525,37 @@ class TestSolution(TestCase):
                 self.test_quiz,
                 [{1: "b"}, {2: "iii"}]
             )
-            self.assertEqual(self.test_quiz.questions[0].answer_result, True)
-            self.assertEqual(self.test_quiz.questions[1].answer_result, False)
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(1),
+                True
+            )
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(2),
+                False
+            )
             self.assertEqual(self.test_quiz.marked, True)
 
+        with self.subTest("Test that quiz can be marked with a mapping"):
+            self.test_teacher.mark_quiz(
+                self.test_quiz,
+                {1: "a", 2: "ii"}
+            )
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(2),
+                True
+            )
+
+        with self.subTest("Test that remarking resets wrong answers"):
+            self.test_teacher.mark_quiz(self.test_quiz, {1: "a"})
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(1),
+                False
+            )
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(2),
+                True
+            )
+
     def test_grade_quiz(self):
         """Test that a teacher can grade a quiz."""
         with self.subTest("Test grading fails on invalid quiz"):
@@ -437,4 +646,377 @@ class TestSolution(TestCase):
                 self.test_student,
                 self.test_course_one
             )
-            self.assertEqual(self.test_course_one.course_grade, "D")
+            self.assertEqual(
+                self.test_teacher.gradebook.get(
+                    self.test_student,
+                    self.test_course_one
+                ),
+                "D"
+            )
+            self.assertEqual(self.test_student.grades, {("HBZ5", 1): "D"})
+
+        with self.subTest("Test grades go to the course teacher gradebook"):
+            substitute = Teacher("Jane", "Roe", "TR26")
+            substitute.calculate_total_grade(
+                self.test_student,
+                self.test_course_one
+            )
+            self.assertEqual(substitute.gradebook.export(), [])
+            self.assertEqual(
+                self.test_teacher.gradebook.export(),
+                [("HB256", "HBZ5", 1, "D")]
+            )
+
+        with self.subTest("Test teachers can share one gradebook"):
+            colleague = Teacher(
+                "Jane",
+                "Roe",
+                "TR26",
+                self.test_teacher.gradebook
+            )
+            self.assertIs(colleague.gradebook, self.test_teacher.gradebook)
+
+    def test_mark_quizzes(self):
+        """Test that a teacher can mark and grade quizzes in a batch."""
+        with self.subTest("Test batch marking fails on invalid quiz"):
+            self.assertRaises(
+                InvalidQuizException,
+                self.test_teacher.mark_quizzes,
+                ["Quiz"],
+                {1: "b", 2: "iii"}
+            )
+
+        with self.subTest("Test batch marking fails on unsubmitted quiz"):
+            self.assertRaises(
+                UnsubmittedQuizException,
+                self.test_teacher.mark_quizzes,
+                [self.test_quiz],
+                {1: "b", 2: "iii"}
+            )
+
+        with self.subTest("Test batch marking matches per quiz marking"):
+            self.test_teacher.assign_quiz(
+                self.test_quiz,
+                self.test_student
+            )
+            self.test_student.answer_quiz(
+                self.test_quiz,
+                [{1: "b"}, {2: "ii"}]
+            )
+            self.test_student.submit_quiz(self.test_quiz)
+            self.test_teacher.mark_quizzes(
+                [self.test_quiz],
+                [{1: "b"}, {2: "iii"}]
+            )
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(1),
+                True
+            )
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(2),
+                False
+            )
+            self.assertEqual(self.test_quiz.marked, True)
+            self.assertEqual(self.test_quiz.grade, 50)
+            self.assertEqual(self.test_quiz.teacher_graded, True)
+
+        with self.subTest("Test batch remarking resets wrong answers"):
+            self.test_teacher.mark_quizzes([self.test_quiz], {1: "a"})
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(1),
+                False
+            )
+            self.assertEqual(self.test_quiz.grade, 0)
+
+        with self.subTest("Test batch marking mixed questions and courses"):
+            science_quiz = self.test_teacher.create_quiz(
+                quiz_name="Mid-term",
+                quiz_code="MT-2",
+                course=self.test_course_two,
+                questions=[self.test_question_two, self.test_question_one]
+            )
+            self.test_teacher.assign_quiz(science_quiz, self.test_student)
+            self.test_student.answer_quiz(science_quiz, {1: "a", 2: "iii"})
+            self.test_student.submit_quiz(science_quiz)
+            self.test_student_two.answer_quiz(self.test_quiz_two, {1: "a"})
+            self.test_student_two.submit_quiz(self.test_quiz_two)
+            self.test_teacher.mark_quizzes(
+                [self.test_quiz, science_quiz, self.test_quiz_two],
+                {1: "a", 2: "iii"}
+            )
+            self.assertEqual(
+                [
+                    quiz.grade
+                    for quiz in (
+                        self.test_quiz,
+                        science_quiz,
+                        self.test_quiz_two
+                    )
+                ],
+                [0, 100, 50]
+            )
+            self.assertEqual(
+                self.test_course_one.average_grade(self.test_student),
+                0
+            )
+            self.assertEqual(
+                self.test_course_two.average_grade(self.test_student),
+                100
+            )
+
+        with self.subTest("Test batch marking with the sentinel as a choice"):
+            quiz = self.test_teacher.create_quiz(
+                quiz_name="Signs",
+                quiz_code="SG-1",
+                course=self.test_course_one,
+                questions=[
+                    Question(1, choices=[-2, 5]),
+                    Question(2, choices=[-2, 5])
+                ]
+            )
+            quizzes = self.test_teacher.assign_quiz_to_cohort(
+                quiz,
+                [self.test_student, self.test_student]
+            )
+            for student_quiz in quizzes:
+                self.test_student.answer_quiz(student_quiz, {1: -2, 2: -2})
+                self.test_student.submit_quiz(student_quiz)
+            self.test_teacher.mark_quiz(quizzes[0], {1: 5})
+            self.test_teacher.grade_quiz(quizzes[0])
+            self.test_teacher.mark_quizzes(quizzes[1:], {1: 5})
+            self.assertEqual(
+                [
+                    list(student_quiz.submission.answer_results)
+                    for student_quiz in quizzes
+                ],
+                [[0, 0], [0, 0]]
+            )
+            self.assertEqual(
+                [student_quiz.grade for student_quiz in quizzes],
+                [0, 0]
+            )
+
+    def test_grading_standard(self):
+        """Test that averages are matched to the course grading standard."""
+        with self.subTest("Test whole number averages are graded"):
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(100), "A")
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(80), "A")
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(79), "B")
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(0), "F")
+
+        with self.subTest("Test fractional averages are graded"):
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(79.9), "B")
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(39.5), "F")
+
+        with self.subTest("Test out of range averages have no grade"):
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(-1), None)
+            self.assertEqual(COURSE_GRADING_STANDARD.grade(100.5), None)
+
+        with self.subTest("Test a batch of averages is graded"):
+            self.assertEqual(
+                COURSE_GRADING_STANDARD.grades([95, 72.5, 50, 12]),
+                ["A", "B", "D", "F"]
+            )
+
+        with self.subTest("Test a course can use custom boundaries"):
+            pass_fail = GradingStandard({"Pass": 50, "Fail": 0})
+            course = Course("Art", "HBA1", 1, self.test_teacher, pass_fail)
+            self.assertEqual(course.grading_standard.grade(49.9), "Fail")
+            self.assertEqual(course.grading_standard.grade(50), "Pass")
+
+        with self.subTest("Test invalid grading standards fail"):
+            self.assertRaises(
+                InvalidGradingStandardException,
+                GradingStandard,
+                {}
+            )
+            self.assertRaises(
+                InvalidGradingStandardException,
+                GradingStandard,
+                {"A": 120}
+            )
+            self.assertRaises(
+                InvalidGradingStandardException,
+                Course,
+                "Art",
+                "HBA1",
+                1,
+                self.test_teacher,
+                {"Pass": 50}
+            )
+
+    def test_calculate_total_grades_unenrolled(self):
+        """Test that no total grade is recorded if a student is unenrolled."""
+        self.test_teacher.assign_quiz(
+            self.test_quiz_three,
+            self.test_student
+        )
+        for quiz, student in (
+            (self.test_quiz_three, self.test_student),
+            (self.test_quiz_two, self.test_student_two)
+        ):
+            student.submit_quiz(quiz)
+        self.test_teacher.mark_quizzes(
+            [self.test_quiz_three, self.test_quiz_two],
+            {1: "b", 2: "iii"}
+        )
+        self.assertRaises(
+            UnEnrolledCourseException,
+            self.test_teacher.calculate_total_grades,
+            self.test_course_one
+        )
+        self.assertEqual(self.test_student.grades, {})
+        self.assertEqual(self.test_teacher.gradebook.export(), [])
+
+    def test_calculate_total_grades(self):
+        """Test that a teacher can calculate the total grades of a course."""
+        with self.subTest("Test calculation fails with invalid course"):
+            self.assertRaises(
+                InvalidCourseException,
+                self.test_teacher.calculate_total_grades,
+                "Course"
+            )
+
+        with self.subTest("Test total grades are calculated for a course"):
+            self.test_student_two.enroll_into_course(self.test_course_one)
+            self.test_teacher.assign_quiz(
+                self.test_quiz,
+                self.test_student
+            )
+            for quiz, student, answers in (
+                (self.test_quiz, self.test_student, {1: "b", 2: "ii"}),
+                (self.test_quiz_two, self.test_student_two, {1: "b", 2: "iii"})
+            ):
+                student.answer_quiz(quiz, answers)
+                student.submit_quiz(quiz)
+            self.test_teacher.mark_quizzes(
+                [self.test_quiz, self.test_quiz_two],
+                {1: "b", 2: "iii"}
+            )
+            self.test_teacher.grade_quiz(self.test_quiz)
+
+            self.assertEqual(
+                self.test_course_one.graded_quizzes[self.test_student],
+                [self.test_quiz]
+            )
+            self.assertEqual(
+                self.test_teacher.calculate_total_grades(self.test_course_one),
+                {self.test_student: "D", self.test_student_two: "A"}
+            )
+            self.assertEqual(
+                self.test_teacher.gradebook.course_grades(
+                    self.test_course_one
+                ),
+                {"HB256": "D", "HB250": "A"}
+            )
+            self.assertEqual(
+                self.test_teacher.gradebook.student_grades(
+                    self.test_student_two
+                ),
+                {("HBZ5", 1): "A"}
+            )
+            self.assertEqual(
+                sorted(self.test_teacher.gradebook.export()),
+                [("HB250", "HBZ5", 1, "A"), ("HB256", "HBZ5", 1, "D")]
+            )
+
+        with self.subTest("Test running grades follow a regraded quiz"):
+            self.assertEqual(
+                self.test_course_one.average_grade(self.test_student),
+                50
+            )
+            self.test_teacher.mark_quiz(self.test_quiz, {2: "ii"})
+            self.test_teacher.grade_quiz(self.test_quiz)
+
+            self.assertEqual(
+                self.test_course_one.grade_totals[self.test_student],
+                [100, 1]
+            )
+            self.assertEqual(
+                self.test_course_one.current_grade(self.test_student),
+                "A"
+            )
+            self.assertEqual(
+                self.test_course_one.current_grade(self.test_student_two),
+                "A"
+            )
+            self.assertEqual(
+                self.test_course_three.current_grade(self.test_student),
+                None
+            )
+
+    def test_regrade_quizzes(self):
+        """Test that a teacher can regrade quizzes with a corrected guide."""
+        with self.subTest("Test regrading fails on invalid quiz"):
+            self.assertRaises(
+                InvalidQuizException,
+                self.test_teacher.regrade_quizzes,
+                ["Quiz"],
+                {2: "ii"}
+            )
+
+        with self.subTest("Test regrading fails on unmarked quiz"):
+            self.assertRaises(
+                UnmarkedQuizException,
+                self.test_teacher.regrade_quizzes,
+                [self.test_quiz_two],
+                {2: "ii"}
+            )
+
+        with self.subTest("Test corrected questions are regraded"):
+            self.test_student_two.enroll_into_course(self.test_course_one)
+            self.test_teacher.assign_quiz(
+                self.test_quiz,
+                self.test_student
+            )
+            for quiz, student, answers in (
+                (self.test_quiz, self.test_student, {1: "b", 2: "ii"}),
+                (self.test_quiz_two, self.test_student_two, {1: "b", 2: "iii"})
+            ):
+                student.answer_quiz(quiz, answers)
+                student.submit_quiz(quiz)
+            self.test_teacher.mark_quizzes(
+                [self.test_quiz, self.test_quiz_two],
+                {1: "b", 2: "iii"}
+            )
+            self.test_teacher.calculate_total_grades(self.test_course_one)
+
+            regraded_quizzes = self.test_teacher.regrade_quizzes(
+                [self.test_quiz, self.test_quiz_two],
+                [{2: "ii"}, {3: "a"}]
+            )
+
+            self.assertEqual(
+                regraded_quizzes,
+                [self.test_quiz, self.test_quiz_two]
+            )
+            self.assertEqual(
+                self.test_quiz.submission.get_answer_result(2),
+                True
+            )
+            self.assertEqual(
+                self.test_quiz_two.submission.get_answer_result(2),
+                False
+            )
+            self.assertEqual(self.test_quiz.grade, 100)
+            self.assertEqual(self.test_quiz_two.grade, 50)
+            self.assertEqual(
+                self.test_course_one.grade_totals[self.test_student_two],
+                [50, 1]
+            )
+            self.assertEqual(
+                self.test_teacher.gradebook.course_grades(
+                    self.test_course_one
+                ),
+                {"HB256": "A", "HB250": "D"}
+            )
+            self.assertEqual(self.test_student_two.grades[("HBZ5", 1)], "D")
+
+        with self.subTest("Test unchanged quizzes are not regraded"):
+            self.assertEqual(
+                self.test_teacher.regrade_quizzes(
+                    [self.test_quiz, self.test_quiz_two],
+                    {2: "ii"}
+                ),
+                []
+            )
@@ -0,0 +1,121 @@
+from unittest import TestCase
+
+from exceptions import (
+    AlreadyEnrolledException,
+    InvalidChoiceException,
+    InvalidCourseException,
+    InvalidQuestionException,
+    InvalidQuizException,
+    InvalidStudentException,
+    InvalidVerificationException
+)
+from solution import Course, Question, Student, Teacher
+from validation import answer_batch, assign_batch, enroll_batch
+
+
+class TestValidation(TestCase):
+
+    def setUp(self):
+        self.test_teacher = Teacher("John", "Doe", "TR25")
+        self.test_student = Student("John", "Snow", "HB256")
+        self.test_student_two = Student("Karl", "Drago", "HB250")
+        self.test_course = Course("Math", "HBZ5", 1, self.test_teacher)
+        self.test_quiz = self.test_teacher.create_quiz(
+            quiz_name="Mid-term",
+            quiz_code="MT-1",
+            course=self.test_course,
+            questions=[
+                Question(1, choices=["a", "b", "c", "d"]),
+                Question(2, choices=["i", "ii", "iii"])
+            ]
+        )
+
+    def test_enroll_batch(self):
+        """Test that valid enrollments are applied and errors reported."""
+        with self.subTest("Test every row fails with an invalid course"):
+            report = enroll_batch(
+                self.test_teacher,
+                [self.test_student],
+                "Course"
+            )
+            self.assertEqual(report.errors, [
+                (0, InvalidCourseException, "Please provide valid Course")
+            ])
+
+        with self.subTest("Test invalid rows are reported"):
+            self.test_student_two.enroll_into_course(self.test_course)
+            report = enroll_batch(
+                self.test_teacher,
+                [
+                    self.test_student,
+                    "Student",
+                    self.test_student_two,
+                    self.test_student
+                ],
+                self.test_course
+            )
+            self.assertFalse(report.ok)
+            self.assertEqual(report.accepted, [self.test_student])
+            self.assertEqual(
+                [(row, error) for row, error, _ in report.errors],
+                [
+                    (1, InvalidStudentException),
+                    (2, AlreadyEnrolledException),
+                    (3, AlreadyEnrolledException)
+                ]
+            )
+            self.assertIn("HB256", self.test_course.roster)
+
+    def test_assign_batch(self):
+        """Test that valid assignments are applied and errors reported."""
+        with self.subTest("Test every row fails with an invalid quiz"):
+            report = assign_batch(
+                self.test_teacher,
+                "Quiz",
+                [self.test_student]
+            )
+            self.assertEqual(report.errors[0][:2], (0, InvalidQuizException))
+
+        with self.subTest("Test invalid rows are reported"):
+            report = assign_batch(
+                self.test_teacher,
+                self.test_quiz,
+                ["Student", self.test_student]
+            )
+            self.assertEqual(
+                report.errors[0][:2],
+                (0, InvalidStudentException)
+            )
+            self.assertIs(report.accepted[0].student, self.test_student)
+            self.assertIs(self.test_course.quizzes[-1], report.accepted[0])
+
+    def test_answer_batch(self):
+        """Test that valid answers are applied and errors reported."""
+        quiz, = assign_batch(
+            self.test_teacher,
+            self.test_quiz,
+            [self.test_student]
+        ).accepted
+        report = answer_batch([
+            (self.test_student, quiz, 1, "b"),
+            (self.test_student, quiz, 2, "x"),
+            (self.test_student, quiz, 3, "a"),
+            (self.test_student_two, quiz, 2, "ii"),
+            ("Student", quiz, 2, "ii"),
+            (self.test_student, quiz, 2, "iii"),
+            (self.test_student, quiz, 1, ["a"])
+        ])
+
+        self.assertEqual(report.accepted, [(quiz, 1), (quiz, 2)])
+        self.assertEqual(
+            [(row, error) for row, error, _ in report.errors],
+            [
+                (1, InvalidChoiceException),
+                (2, InvalidQuestionException),
+                (3, InvalidVerificationException),
+                (4, InvalidStudentException),
+                (6, InvalidChoiceException)
+            ]
+        )
+        self.assertEqual(quiz.submission.get_answer(1), "b")
+        self.assertEqual(quiz.submission.get_answer(2), "iii")
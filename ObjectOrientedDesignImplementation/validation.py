@@ -0,0 +1,143 @@
+"""
+Module for validating batches of enrollments, assignments and answers.
+
+Each batch function checks every row without raising, applies the valid
+rows and returns a ValidationReport listing the rows it rejected.
+"""
+from exceptions import (
+    AlreadyEnrolledException,
+    InvalidQuestionException,
+    InvalidStudentException
+)
+from solution import _quiz_lock, Student
+from wrapping import wrappable
+
+
+class ValidationReport(object):
+    __slots__ = ("accepted", "errors")
+
+    def __init__(self):
+        """
+        Initialize a validation report object.
+
+        accepted holds what was applied for each valid row and errors holds
+        a (row, exception class, message) tuple for each rejected row.
+        """
+        self.accepted = []
+        self.errors = []
+
+    @property
+    def ok(self):
+        """Return whether every row was valid."""
+        return not self.errors
+
+    def add_error(self, row, error):
+        """Record the (exception class, message) error of a row."""
+        self.errors.append((row, error[0], error[1]))
+
+
+@wrappable
+def enroll_batch(teacher, students, course):
+    """
+    Enrol the valid students of a batch into a course.
+
+    params:
+        - teacher
+        - students
+        - course
+
+    Rows are rejected for invalid students, students already enrolled into
+    the course and students repeated in the batch. The enrolled students
+    are the accepted rows.
+    """
+    report = ValidationReport()
+    course_error = teacher._check_course(course)
+    enrolled = set()
+    for row, student in enumerate(students):
+        error = course_error or teacher._check_student(student)
+        if error is None:
+            with course.lock:
+                error = student._check_course(course)
+                if error is None and student.student_number in enrolled:
+                    error = (
+                        AlreadyEnrolledException,
+                        "The student has already enrolled into this course."
+                    )
+                if error is None:
+                    enrolled.add(student.student_number)
+                    student.enrolled_courses[course.course_key] = course
+                    course.roster[student.student_number] = student
+        if error is None:
+            report.accepted.append(student)
+        else:
+            report.add_error(row, error)
+    return report
+
+
+@wrappable
+def assign_batch(teacher, quiz, students):
+    """
+    Assign a quiz to the valid students of a batch.
+
+    params:
+        - teacher
+        - quiz
+        - students
+
+    Each valid student gets their own copy of the quiz as
+    Teacher.assign_quiz_to_cohort does. The copies are the accepted rows.
+    """
+    report = ValidationReport()
+    quiz_error = teacher._check_quiz(quiz)
+    for row, student in enumerate(students):
+        error = quiz_error or teacher._check_student(student)
+        if error is None:
+            report.accepted.append(quiz.assignment_for(student))
+        else:
+            report.add_error(row, error)
+    if quiz_error is None:
+        quiz.course.quizzes.extend(report.accepted)
+    return report
+
+
+@wrappable
+def answer_batch(rows):
+    """
+    Apply the valid answers of a batch.
+
+    params:
+        - rows
+
+    rows holds (student, quiz, question number, choice) tuples. A row is
+    rejected if the quiz is not assigned to the student, the question is not
+    part of the quiz or the choice is not one of the question choices. The
+    (quiz, question number) of each applied answer are the accepted rows.
+    Answers are written under the quiz lock as Student.answer_quiz writes
+    them.
+    """
+    report = ValidationReport()
+    for row, (student, quiz, number, choice) in enumerate(rows):
+        if not isinstance(student, Student):
+            report.add_error(
+                row,
+                (InvalidStudentException, "Please provide valid Student")
+            )
+            continue
+        error = student._check_quiz(quiz)
+        if error is None:
+            index = quiz.question_index.get(number)
+            if index is None:
+                error = (
+                    InvalidQuestionException,
+                    "The question is not part of this quiz."
+                )
+            else:
+                question = quiz.questions[index]
+                error = student._check_choice(choice, question)
+        if error is None:
+            with _quiz_lock(quiz):
+                quiz.submission.answers[index] = question.choice_codes[choice]
+            report.accepted.append((quiz, number))
+        else:
+            report.add_error(row, error)
+    return report
@@ -0,0 +1,109 @@
+"""
+Module for wrapping methods in layers that can be removed in any order.
+
+Instrumentation and Journal both wrap methods of Student and Teacher. Each
+wraps a method by adding a layer here rather than setting the attribute
+itself, and the method is rebuilt from its original function whenever a
+layer is added or removed, so removing one layer leaves the others in place.
+
+Module functions are imported by name, so setting the module attribute
+would not reach the copies already imported. A function decorated with
+wrappable stays in place instead and calls its layered function, which is
+what gets rebuilt.
+"""
+from functools import wraps
+from threading import Lock
+
+
+# Layers of each wrapped method keyed by (class, method name), innermost
+# first, as (owner, wrap) pairs
+_LAYERS = {}
+
+# Original function of each wrapped method keyed by (class, method name)
+_ORIGINALS = {}
+
+_lock = Lock()
+
+
+def wrappable(function):
+    """
+    Return a function whose layers can be added by wrap_method.
+
+    params:
+        - function
+
+    The returned function calls function through its layers, and is
+    wrapped by passing its module and name to wrap_method.
+    """
+    @wraps(function)
+    def dispatcher(*args, **kwargs):
+        return dispatcher.layered(*args, **kwargs)
+    dispatcher.layered = function
+    return dispatcher
+
+
+def original_method(cls, name):
+    """Return the method of cls as defined, without any layer."""
+    with _lock:
+        method = _ORIGINALS.get((cls, name)) or vars(cls)[name]
+    if hasattr(method, "layered"):
+        return method.__wrapped__
+    return method
+
+
+def wrap_method(cls, name, owner, wrap):
+    """
+    Wrap a method of cls in a new outermost layer.
+
+    params:
+        - cls
+        - name
+        - owner
+        - wrap
+
+    wrap is called with the method the layer wraps and returns the wrapped
+    method. It may be called again whenever the layers of the method are
+    rebuilt. The layer is removed by unwrap_methods(owner).
+    """
+    with _lock:
+        key = (cls, name)
+        _ORIGINALS.setdefault(key, vars(cls)[name])
+        _LAYERS.setdefault(key, []).append((owner, wrap))
+        _rebuild(key)
+
+
+def unwrap_methods(owner):
+    """Remove every layer of owner, keeping the layers of other owners."""
+    with _lock:
+        for key, layers in list(_LAYERS.items()):
+            remaining = [layer for layer in layers if layer[0] is not owner]
+            if len(remaining) == len(layers):
+                continue
+            _LAYERS[key] = remaining
+            _rebuild(key)
+
+
+def _rebuild(key):
+    """
+    Set a method to its original function wrapped in its layers.
+
+    params:
+        - key
+
+    A method left without layers gets its original function back and is
+    forgotten. A wrappable function gets its layered function rebuilt
+    instead. The module lock must be held.
+    """
+    cls, name = key
+    original = _ORIGINALS[key]
+    dispatching = hasattr(original, "layered")
+    method = original.__wrapped__ if dispatching else original
+    for _, wrap in _LAYERS[key]:
+        method = wrap(method)
+    if dispatching:
+        original.layered = method
+    else:
+        setattr(cls, name, method)
+    if not _LAYERS[key]:
+        del _LAYERS[key]
+        del _ORIGINALS[key]